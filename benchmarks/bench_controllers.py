@@ -0,0 +1,244 @@
+"""
+Mede os caminhos quentes dos controllers em tenants gerados de três tamanhos.
+
+Uso:
+    python benchmarks/bench_controllers.py [--tamanhos pequeno medio grande]
+                                           [--filtro listar_vendas]
+                                           [--rodadas 5] [--tempo-max 1.0]
+                                           [--saida resultado.json]
+                                           [--comparar base.json] [--tolerancia 0.10]
+
+Cada tamanho (TAMANHOS) é gerado uma vez por benchmarks/gerar_tenant.py e
+guardado em --pasta-tenants (padrão: na pasta temporária do sistema); as
+medições rodam numa cópia, porque cadastrar_venda grava no banco. Como no
+pytest-benchmark, cada caso roda uma vez para aquecer e depois pelo menos
+--rodadas vezes, repetindo até --tempo-max segundos; são exibidos mínimo,
+mediana, média e desvio.
+
+--saida grava os resultados em JSON (máquina, versão do SQLite, commit e
+estatísticas por caso). --comparar lê um JSON anterior, exibe a variação
+de cada caso e termina com código 1 se algum ficou mais lento que a
+tolerância (pela mediana), para barrar regressões antes do deploy.
+
+Os mesmos casos rodam no pytest por benchmarks/test_bench_controllers.py,
+com o fixture `benchmark` do pytest-benchmark quando ele está instalado.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(AQUI, "..", "src"))
+
+from bench_registrar_venda import gerar_vendas  # noqa: E402
+from database.conexao import fechar_pool  # noqa: E402
+from database.migracoes import migrar_banco  # noqa: E402
+from database.vendas_controller import VendasController  # noqa: E402
+from database.estoque_controller import EstoqueController  # noqa: E402
+from database.clientes_controller import ClientesController  # noqa: E402
+from database.produtos_controller import ProdutosController  # noqa: E402
+from database.fornecedores_controller import FornecedoresController  # noqa: E402
+from database.funcionarios_controller import FuncionariosController  # noqa: E402
+from database.relatorios_controller import RelatoriosController  # noqa: E402
+
+# Parâmetros de gerar_tenant.py para cada tamanho de tenant
+TAMANHOS = {
+    "pequeno": {"vendas": 5000, "produtos": 200, "clientes": 500, "fornecedores": 20, "funcionarios": 5},
+    "medio": {"vendas": 100000, "produtos": 2000, "clientes": 10000, "fornecedores": 100, "funcionarios": 20},
+    "grande": {"vendas": 1000000, "produtos": 5000, "clientes": 50000, "fornecedores": 200, "funcionarios": 40},
+}
+
+# Tenants gerados ficam fora do repositório e são reaproveitados entre execuções
+PASTA_TENANTS = os.path.join(tempfile.gettempdir(), "bench_tenants")
+
+# Vendas diferentes gravadas em rodízio pelo caso cadastrar_venda
+VENDAS_CADASTRO = 500
+
+
+def preparar_tenant(tamanho, pasta):
+    """Caminho do tenant do tamanho informado, gerando-o se ainda não existir."""
+    parametros = TAMANHOS[tamanho]
+    nome = "user_bench_" + "_".join(f"{valor}{chave[:3]}" for chave, valor in parametros.items()) + ".db"
+    caminho = os.path.join(pasta, nome)
+    if not os.path.exists(caminho):
+        os.makedirs(pasta, exist_ok=True)
+        print(f"Gerando o tenant {tamanho} ({caminho})...")
+        argumentos = [sys.executable, os.path.join(AQUI, "gerar_tenant.py"), caminho + ".tmp", "--substituir"]
+        for chave, valor in parametros.items():
+            argumentos += [f"--{chave}", str(valor)]
+        subprocess.run(argumentos, check=True, stdout=subprocess.DEVNULL)
+        os.replace(caminho + ".tmp", caminho)
+    return caminho
+
+
+def casos(caminho):
+    """Casos medidos: (nome, função sem argumentos)."""
+    vendas = VendasController(caminho)
+    estoque = EstoqueController(caminho)
+    clientes = ClientesController(caminho)
+    produtos = ProdutosController(caminho)
+    fornecedores = FornecedoresController(caminho)
+    funcionarios = FuncionariosController(caminho)
+    relatorios = RelatoriosController(caminho)
+
+    conn = vendas.conn
+    total_vendas, ultima = conn.execute("SELECT COUNT(*), MAX(data_venda) FROM vendas").fetchone()
+    venda_id = conn.execute("SELECT id FROM vendas ORDER BY id LIMIT 1 OFFSET ?",
+                            (total_vendas // 2,)).fetchone()[0]
+    referencia = datetime.date.fromisoformat(ultima[:10])
+    # Cursor (data_venda, id) de uma página no meio da listagem
+    meio = tuple(conn.execute("SELECT data_venda, id FROM vendas ORDER BY data_venda DESC, id DESC "
+                              "LIMIT 1 OFFSET ?", (total_vendas // 2,)).fetchone())
+    codigo = conn.execute("SELECT codigo_barras FROM produtos WHERE codigo_barras IS NOT NULL "
+                          "LIMIT 1").fetchone()[0]
+    quantidade_produtos = conn.execute("SELECT COUNT(*) FROM produtos").fetchone()[0]
+
+    # Cópia descartável: estoque de sobra para as vendas gravadas nas rodadas
+    conn.execute("UPDATE produtos SET estoque_atual = estoque_atual + 1000000")
+    conn.commit()
+    novas = gerar_vendas(VENDAS_CADASTRO, min(5, quantidade_produtos), "Concluída", quantidade_produtos)
+    proxima = iter(range(10 ** 9))
+
+    return [
+        ("vendas.listar_vendas", vendas.listar_vendas),
+        ("vendas.listar_vendas_paginado", lambda: vendas.listar_vendas_paginado()),
+        ("vendas.listar_vendas_paginado (meio)", lambda: vendas.listar_vendas_paginado(apos=meio)),
+        ("vendas.listar_vendas_por_periodo (mês)", lambda: vendas.listar_vendas_por_periodo("mes", referencia)),
+        ("vendas.buscar_venda_por_id", lambda: vendas.buscar_venda_por_id(venda_id)),
+        ("vendas.listar_itens_venda", vendas.listar_itens_venda),
+        ("vendas.cadastrar_venda", lambda: vendas.cadastrar_venda(novas[next(proxima) % len(novas)])),
+        ("estoque.listar_movimentacoes", estoque.listar_movimentacoes),
+        ("estoque.listar_movimentacoes_paginado", lambda: estoque.listar_movimentacoes_paginado()),
+        ("clientes.listar_clientes", clientes.listar_clientes),
+        ("clientes.listar_clientes_paginado (nome)", lambda: clientes.listar_clientes_paginado(ordenar_por="nome")),
+        ("relatorios.gerar_relatorios", relatorios.gerar_relatorios),
+        ("relatorios.obter_indicadores", relatorios.obter_indicadores),
+        ("clientes.buscar", lambda: clientes.buscar("ana sil")),
+        ("produtos.buscar", lambda: produtos.buscar("caf")),
+        ("produtos.buscar_por_codigo_barras", lambda: produtos.buscar_por_codigo_barras(codigo)),
+        ("fornecedores.buscar", lambda: fornecedores.buscar("distribuidora")),
+        ("funcionarios.buscar", lambda: funcionarios.buscar("vend")),
+    ]
+
+
+def medir(funcao, rodadas, tempo_max):
+    """Aquece uma vez e mede pelo menos `rodadas` vezes, até `tempo_max` segundos."""
+    funcao()
+    tempos = []
+    inicio = time.perf_counter()
+    while len(tempos) < rodadas or (time.perf_counter() - inicio < tempo_max and len(tempos) < 1000):
+        antes = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - antes)
+    return {
+        "min": min(tempos),
+        "max": max(tempos),
+        "mean": statistics.fmean(tempos),
+        "stddev": statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+        "median": statistics.median(tempos),
+        "rounds": len(tempos),
+        "ops": len(tempos) / sum(tempos),
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=AQUI,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def comparar(base, atual, tolerancia):
+    """Exibe a variação da mediana de cada caso; devolve os que regrediram."""
+    anteriores = {(b["group"], b["name"]): b["stats"] for b in base["benchmarks"]}
+    regressoes = []
+    print(f"\nComparação com {base.get('commit') or 'base'} ({base.get('datetime', '')}), "
+          f"tolerância {tolerancia:.0%}\n")
+    print(f"{'tamanho':<8} {'caso':<44} {'base (ms)':>10} {'atual (ms)':>11} {'variação':>9}")
+    for resultado in atual["benchmarks"]:
+        chave = (resultado["group"], resultado["name"])
+        anterior = anteriores.get(chave)
+        if anterior is None:
+            continue
+        variacao = resultado["stats"]["median"] / anterior["median"] - 1
+        marca = "  REGRESSÃO" if variacao > tolerancia else ""
+        if marca:
+            regressoes.append(chave)
+        print(f"{chave[0]:<8} {chave[1]:<44} {anterior['median'] * 1000:>10.2f} "
+              f"{resultado['stats']['median'] * 1000:>11.2f} {variacao:>+9.1%}{marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanhos", nargs="+", choices=list(TAMANHOS), default=["pequeno", "medio"])
+    parser.add_argument("--filtro", help="mede só os casos cujo nome contém o texto")
+    parser.add_argument("--rodadas", type=int, default=5, help="mínimo de rodadas por caso")
+    parser.add_argument("--tempo-max", type=float, default=1.0, help="segundos por caso")
+    parser.add_argument("--pasta-tenants", default=PASTA_TENANTS)
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="piora aceita na mediana (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    resultado = {
+        "datetime": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "machine_info": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "benchmarks": [],
+    }
+
+    for tamanho in args.tamanhos:
+        origem = preparar_tenant(tamanho, args.pasta_tenants)
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, os.path.basename(origem))
+            shutil.copyfile(origem, caminho)
+            # Tenant gerado por uma versão anterior: aplica as migrações novas, como no login
+            migrar_banco(caminho)
+            print(f"\n{tamanho}: {TAMANHOS[tamanho]}\n")
+            print(f"{'caso':<44} {'mín (ms)':>10} {'mediana':>10} {'média':>10} {'desvio':>9} {'rodadas':>8}")
+            for nome, funcao in casos(caminho):
+                if args.filtro and args.filtro not in nome:
+                    continue
+                estatisticas = medir(funcao, args.rodadas, args.tempo_max)
+                resultado["benchmarks"].append({
+                    "group": tamanho, "name": nome,
+                    "params": TAMANHOS[tamanho], "stats": estatisticas,
+                })
+                print(f"{nome:<44} {estatisticas['min'] * 1000:>10.2f} {estatisticas['median'] * 1000:>10.2f} "
+                      f"{estatisticas['mean'] * 1000:>10.2f} {estatisticas['stddev'] * 1000:>9.2f} "
+                      f"{estatisticas['rounds']:>8}")
+            fechar_pool(caminho)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(base, resultado, args.tolerancia)
+        if regressoes:
+            print(f"\nFALHA: {len(regressoes)} caso(s) acima da tolerância")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
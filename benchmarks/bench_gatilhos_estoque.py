@@ -0,0 +1,84 @@
+"""
+Mede o custo, por venda, dos gatilhos de estoque em catálogos grandes.
+
+Uso:
+    python benchmarks/bench_gatilhos_estoque.py [--produtos 1000 10000 100000]
+                                                [--vendas 500] [--itens 5]
+
+Para cada tamanho de catálogo cria um banco temporário e percorre o ciclo
+de vida de cada venda (gravar como pendente, concluir, cancelar, reativar)
+duas vezes: com os gatilhos de estoque (GATILHOS_ESTOQUE) e sem eles. A
+diferença entre as duas colunas é o custo dos gatilhos por venda.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_registrar_venda import preparar_banco, gerar_vendas  # noqa: E402
+from database.conexao import obter_conexao, fechar_pool  # noqa: E402
+from database.migracoes import remover_gatilhos_estoque, criar_gatilhos_estoque  # noqa: E402
+from database.vendas_controller import VendasController  # noqa: E402
+
+TRANSICOES = ("Concluída", "Cancelada", "Pendente")
+
+
+def ciclo_de_vida(controller, vendas):
+    """Milissegundos por venda para gravar e passar pelas transições de status."""
+    conn = controller.conn
+    inicio = time.perf_counter()
+    for venda in vendas:
+        venda_id = controller.registrar_venda(venda)["id"]
+        for status in TRANSICOES:
+            conn.execute("UPDATE vendas SET status = ? WHERE id = ?", (status, venda_id))
+            conn.commit()
+    return (time.perf_counter() - inicio) * 1000 / len(vendas)
+
+
+def medir(produtos, quantidade, itens):
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        preparar_banco(caminho, produtos)
+        conn = obter_conexao(caminho)
+        controller = VendasController(caminho)
+        vendas = gerar_vendas(quantidade, itens, "Pendente", produtos)
+
+        com_gatilhos = ciclo_de_vida(controller, vendas)
+
+        remover_gatilhos_estoque(conn)
+        conn.commit()
+        sem_gatilhos = ciclo_de_vida(controller, vendas)
+        criar_gatilhos_estoque(conn)
+        conn.commit()
+
+        movimentacoes = conn.execute(
+            "SELECT COUNT(*) FROM movimentacao_estoque WHERE referencia_tipo = 'VENDA'"
+        ).fetchone()[0]
+        fechar_pool(caminho)
+    return com_gatilhos, sem_gatilhos, movimentacoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--produtos", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--vendas", type=int, default=500)
+    parser.add_argument("--itens", type=int, default=5, help="itens por venda")
+    args = parser.parse_args()
+
+    linhas = []
+    for produtos in args.produtos:
+        linhas.append((produtos, *medir(produtos, args.vendas, min(args.itens, produtos))))
+
+    print(f"\n{args.vendas} vendas, {args.itens} itens cada, ciclo: Pendente -> {' -> '.join(TRANSICOES)}\n")
+    print(f"{'produtos':>10} {'com gatilhos (ms/venda)':>24} {'sem gatilhos (ms/venda)':>24} "
+          f"{'custo dos gatilhos':>19} {'movimentações':>14}")
+    for produtos, com_gatilhos, sem_gatilhos, movimentacoes in linhas:
+        print(f"{produtos:>10} {com_gatilhos:>24.3f} {sem_gatilhos:>24.3f} "
+              f"{com_gatilhos - sem_gatilhos:>19.3f} {movimentacoes:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Mede o tempo de importação até a tela de login (partida a frio).
+
+Uso:
+    python benchmarks/bench_importacao.py [--orcamento-ms 1500] [--top 15]
+
+Roda, num interpretador novo com `python -X importtime`, o mesmo caminho
+da abertura do app: importa main.py (com ft.app neutralizado, para a
+janela não abrir) e carrega a view de /login pela tabela de rotas. Exibe
+os módulos mais caros e falha (código de saída 1) se o total passar do
+orçamento ou se algum módulo que só outras telas usam for importado.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Orçamento, em milissegundos, da importação de main.py até a view de login
+ORCAMENTO_MS = 1500
+
+# Módulos que não podem ser carregados antes da primeira navegação
+MODULOS_TARDIOS = (
+    "pandas",
+    "requests",
+    "utils",
+    "database.vendas_controller",
+    "database.produtos_controller",
+    "database.relatorios_controller",
+)
+
+PARTIDA = """
+import sys, time
+sys.path.insert(0, {src!r})
+inicio = time.perf_counter()
+import flet
+flet.app = lambda *args, **kwargs: None
+import main
+main.carregar_rota("/login")
+print(time.perf_counter() - inicio)
+"""
+
+_LINHA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def importar(codigo):
+    """Executa o código com -X importtime e devolve (stdout, [(self, acumulado, nível, módulo)])."""
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        capture_output=True, text=True, cwd=SRC
+    )
+    if processo.returncode != 0:
+        sys.exit(processo.stderr)
+    modulos = []
+    for linha in processo.stderr.splitlines():
+        encontrado = _LINHA.match(linha)
+        if encontrado:
+            proprio, acumulado, recuo, nome = encontrado.groups()
+            modulos.append((int(proprio), int(acumulado), len(recuo) // 2, nome))
+    return processo.stdout, modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orcamento-ms", type=float, default=ORCAMENTO_MS)
+    parser.add_argument("--top", type=int, default=15, help="módulos exibidos")
+    args = parser.parse_args()
+
+    # Módulos da inicialização do interpretador ficam fora da conta
+    _, inicializacao = importar("pass")
+    ja_carregados = {nome for *_, nome in inicializacao}
+
+    saida, modulos = importar(PARTIDA.format(src=os.path.abspath(SRC)))
+    novos = [m for m in modulos if m[3] not in ja_carregados]
+    total_ms = sum(acumulado for _, acumulado, nivel, _ in novos if nivel == 0) / 1000
+    relogio_ms = float(saida.strip().splitlines()[-1]) * 1000
+
+    print(f"{'próprio (ms)':>13} {'acumulado (ms)':>15}  módulo")
+    for proprio, acumulado, nivel, nome in sorted(novos, key=lambda m: m[1], reverse=True)[:args.top]:
+        print(f"{proprio / 1000:>13.1f} {acumulado / 1000:>15.1f}  {'  ' * nivel}{nome}")
+    print(f"\n{len(novos)} módulos importados, {total_ms:.1f} ms "
+          f"(relógio: {relogio_ms:.1f} ms), orçamento {args.orcamento_ms:.0f} ms")
+
+    falhas = []
+    if total_ms > args.orcamento_ms:
+        falhas.append(f"importação acima do orçamento ({total_ms:.1f} ms)")
+    nomes = {nome for *_, nome in novos}
+    for tardio in MODULOS_TARDIOS:
+        if any(nome == tardio or nome.startswith(tardio + ".") for nome in nomes):
+            falhas.append(f"{tardio} importado antes da primeira navegação")
+    carregadas = sorted(nome for nome in nomes if nome.startswith("routes.") and nome != "routes.login")
+    if carregadas:
+        falhas.append(f"rotas importadas na partida: {', '.join(carregadas)}")
+
+    for falha in falhas:
+        print(f"FALHA: {falha}")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compara a memória por registro e o tempo de leitura de dict(zip(...)) e Linha.
+
+Uso:
+    python benchmarks/bench_linhas.py [--produtos 100000] [--repeticoes 5]
+
+Cria um banco temporário com os produtos e lê a tabela inteira
+(SELECT * FROM produtos) de três formas: como os listar_* faziam, com
+dict(zip(...)) e a lista de colunas refeita a cada linha; com dict(zip(...))
+e as colunas lidas uma vez; e com database.linhas.ler_linhas. Para cada uma
+exibe o melhor tempo entre as repetições e a memória que a lista de
+registros retém, medida com tracemalloc.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_registrar_venda import preparar_banco  # noqa: E402
+from database.conexao import obter_conexao, fechar_pool  # noqa: E402
+from database.linhas import ler_linhas  # noqa: E402
+
+SQL = "SELECT * FROM produtos"
+
+
+def dict_por_linha(cursor):
+    """Caminho antigo: a lista de colunas é montada de novo para cada linha."""
+    linhas = cursor.fetchall()
+    return [dict(zip([column[0] for column in cursor.description], row)) for row in linhas]
+
+
+def dict_colunas_uma_vez(cursor):
+    colunas = [column[0] for column in cursor.description]
+    return [dict(zip(colunas, row)) for row in cursor.fetchall()]
+
+
+def ler(conn, converter):
+    cursor = conn.cursor()
+    cursor.execute(SQL)
+    return converter(cursor)
+
+
+def medir_tempo(conn, converter, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        ler(conn, converter)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def medir_memoria(conn, converter):
+    """Bytes retidos pela lista de registros (tuplas lidas incluídas)."""
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    registros = ler(conn, converter)
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return registros, depois - antes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--produtos", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    formas = (
+        ("dict(zip) por linha (antigo)", dict_por_linha),
+        ("dict(zip) colunas uma vez", dict_colunas_uma_vez),
+        ("ler_linhas", ler_linhas),
+    )
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        preparar_banco(caminho, args.produtos)
+        conn = obter_conexao(caminho)
+
+        print(f"{args.produtos} produtos, melhor de {args.repeticoes}\n")
+        print(f"{'forma':<30} {'tempo (ms)':>11} {'µs/registro':>12} {'bytes/registro':>15}")
+        for nome, converter in formas:
+            segundos = medir_tempo(conn, converter, args.repeticoes)
+            registros, retidos = medir_memoria(conn, converter)
+            quantidade = len(registros)
+            del registros
+            print(f"{nome:<30} {segundos * 1000:>11.1f} {segundos / quantidade * 1e6:>12.2f} "
+                  f"{retidos / quantidade:>15.0f}")
+        fechar_pool(caminho)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Mede o custo do PBKDF2 usado no login para escolher o fator de trabalho.
+
+Uso:
+    python benchmarks/bench_pbkdf2.py [--iteracoes 100000 200000 600000]
+                                      [--alvo-ms 250] [--logins 8]
+
+Para cada fator informado mostra o tempo de um hash e a vazão de logins
+simultâneos no pool do serviço de autenticação. No fim sugere o maior fator
+cujo hash cabe no tempo alvo; configure-o com a variável PBKDF2_ITERACOES.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storage_manager import hash_password, ITERACOES_PBKDF2  # noqa: E402
+from autenticacao import MAX_TRABALHADORES  # noqa: E402
+
+
+def tempo_hash(iteracoes, repeticoes):
+    """Mediana, em milissegundos, do tempo de um hash."""
+    salt = os.urandom(16)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        hash_password("senha-de-teste", salt, iteracoes)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def vazao(iteracoes, logins, trabalhadores):
+    """Logins por segundo com `logins` hashes simultâneos no pool."""
+    with ThreadPoolExecutor(max_workers=trabalhadores) as executor:
+        inicio = time.perf_counter()
+        list(executor.map(lambda _: hash_password("senha-de-teste", None, iteracoes), range(logins)))
+        return logins / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iteracoes", type=int, nargs="+",
+                        default=sorted({100000, 200000, 310000, 600000, ITERACOES_PBKDF2}))
+    parser.add_argument("--alvo-ms", type=float, default=250.0,
+                        help="tempo máximo aceitável de um hash no login")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--logins", type=int, default=2 * MAX_TRABALHADORES,
+                        help="logins simultâneos na medição de vazão")
+    args = parser.parse_args()
+
+    print(f"Fator atual (PBKDF2_ITERACOES): {ITERACOES_PBKDF2}")
+    print(f"Trabalhadores do pool: {MAX_TRABALHADORES}\n")
+    print(f"{'iterações':>10} {'hash (ms)':>10} {'logins/s (1 thread)':>20} {'logins/s (pool)':>16}")
+
+    ms_por_iteracao = []
+    for iteracoes in args.iteracoes:
+        ms = tempo_hash(iteracoes, args.repeticoes)
+        ms_por_iteracao.append(ms / iteracoes)
+        serial = vazao(iteracoes, args.logins, 1)
+        paralelo = vazao(iteracoes, args.logins, MAX_TRABALHADORES)
+        print(f"{iteracoes:>10} {ms:>10.1f} {serial:>20.1f} {paralelo:>16.1f}")
+
+    sugerido = int(args.alvo_ms / statistics.median(ms_por_iteracao)) // 10000 * 10000
+    print(f"\nMaior fator com hash em até {args.alvo_ms:.0f} ms: ~{sugerido}")
+
+
+if __name__ == "__main__":
+    main()
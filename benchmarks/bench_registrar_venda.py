@@ -0,0 +1,118 @@
+"""
+Mede a vazão (vendas por segundo) da gravação de vendas no banco do tenant.
+
+Uso:
+    python benchmarks/bench_registrar_venda.py [--vendas 2000] [--itens 5]
+                                               [--status Concluída]
+
+Cria um banco temporário com o esquema completo (gatilhos e migrações) e
+grava o mesmo lote de vendas de duas formas: item a item, com um execute
+por item como o caminho antigo de cadastrar_venda, e com
+VendasController.registrar_venda (uma transação e executemany).
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storage_manager import init_user_db  # noqa: E402
+from database.conexao import obter_conexao, fechar_pool  # noqa: E402
+from database.vendas_controller import (  # noqa: E402
+    VendasController, SQL_INSERIR_VENDA, SQL_INSERIR_ITEM, agora_data_venda
+)
+
+PRODUTOS = 500
+ESTOQUE_INICIAL = 10 ** 9
+
+
+def preparar_banco(caminho, produtos=PRODUTOS):
+    """Cria o banco com um fornecedor, um cliente, um funcionário e os produtos."""
+    init_user_db(caminho)
+    conn = obter_conexao(caminho)
+    conn.execute("INSERT INTO fornecedores (nome_fantasia, razao_social, cnpj, telefone) "
+                 "VALUES ('Fornecedor', 'Fornecedor LTDA', '00000000000100', '0')")
+    conn.execute("INSERT INTO clientes (nome, cpf_cnpj) VALUES ('Cliente', '00000000000')")
+    conn.execute("INSERT INTO funcionarios (nome, cargo, data_admissao) "
+                 "VALUES ('Vendedor', 'Vendedor', '2024-01-01')")
+    conn.executemany(
+        "INSERT INTO produtos (nome, preco, custo_unitario, estoque_atual, fornecedor_id) "
+        "VALUES (?, 10, 5, ?, 1)",
+        [(f"Produto {i}", ESTOQUE_INICIAL) for i in range(produtos)]
+    )
+    conn.commit()
+
+
+def gerar_vendas(quantidade, itens, status, produtos=PRODUTOS):
+    aleatorio = random.Random(42)
+    vendas = []
+    for _ in range(quantidade):
+        escolhidos = aleatorio.sample(range(1, produtos + 1), itens)
+        vendas.append({
+            "cliente_id": 1,
+            "funcionario_id": 1,
+            "desconto": 0.0,
+            "status": status,
+            "total": 10.0 * itens,
+            "data_venda": agora_data_venda(),
+            "itens": [{
+                "produto_id": produto_id,
+                "quantidade": 1,
+                "preco_unitario": 10.0,
+                "desconto": 0.0,
+                "subtotal": 10.0,
+            } for produto_id in escolhidos],
+        })
+    return vendas
+
+
+def gravar_item_a_item(conn, venda):
+    """Caminho antigo: cabeçalho e um execute por item, com commit ao final."""
+    cursor = conn.cursor()
+    cursor.execute(SQL_INSERIR_VENDA, (
+        venda["cliente_id"], venda["funcionario_id"], venda["desconto"],
+        venda["status"], venda["total"], venda["data_venda"]
+    ))
+    venda_id = cursor.lastrowid
+    for item in venda["itens"]:
+        cursor.execute(SQL_INSERIR_ITEM, (
+            venda_id, item["produto_id"], item["quantidade"],
+            item["preco_unitario"], item["desconto"], item["subtotal"]
+        ))
+    conn.commit()
+
+
+def medir(nome, vendas, gravar):
+    inicio = time.perf_counter()
+    for venda in vendas:
+        gravar(venda)
+    segundos = time.perf_counter() - inicio
+    print(f"{nome:<28} {len(vendas) / segundos:>10.1f} vendas/s  ({segundos:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vendas", type=int, default=2000)
+    parser.add_argument("--itens", type=int, default=5, help="itens por venda")
+    parser.add_argument("--status", default="Concluída",
+                        choices=["Concluída", "Pendente", "Cancelada"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.db")
+        preparar_banco(caminho)
+        conn = obter_conexao(caminho)
+        controller = VendasController(caminho)
+        vendas = gerar_vendas(args.vendas, min(args.itens, PRODUTOS), args.status)
+
+        print(f"{args.vendas} vendas, {args.itens} itens cada, status {args.status}\n")
+        medir("item a item (antigo)", vendas, lambda venda: gravar_item_a_item(conn, venda))
+        medir("registrar_venda", vendas, controller.registrar_venda)
+        fechar_pool(caminho)
+
+
+if __name__ == "__main__":
+    main()
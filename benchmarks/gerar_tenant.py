@@ -0,0 +1,444 @@
+"""
+Gera um banco de tenant (user_*.db) sintético, com volume de produção.
+
+Uso:
+    python benchmarks/gerar_tenant.py DESTINO [--vendas 1000000] [--itens 5]
+                                      [--produtos 5000] [--clientes 50000]
+                                      [--fornecedores 200] [--funcionarios 40]
+                                      [--dias 730] [--semente 42] [--substituir]
+
+O esquema é criado por storage_manager.init_user_db (tabelas, gatilhos e
+migrações), como no cadastro de uma empresa. A carga em seguida:
+
+- grava fornecedores, funcionários, clientes e produtos;
+- distribui as vendas pelos dias do período com sazonalidade (dia da
+  semana, mês do ano e crescimento ao longo do período), em horário
+  comercial e em ordem cronológica, como o caixa as gravaria;
+- escolhe produtos e clientes com popularidade desigual (lei de Zipf):
+  poucos produtos aparecem na maior parte dos itens;
+- deixa pendentes só vendas dos últimos dias e cancela uma fração pequena.
+
+Para caber em minutos com milhões de itens, gatilhos e índices
+secundários são retirados durante a carga e recriados no fim, as linhas
+entram por executemany em lotes, e o que os gatilhos manteriam é refeito
+em SQL de conjunto: o histórico de movimentacao_estoque (entrada inicial
+de cada produto e uma saída por item de venda ativa, com os saldos), os
+resumos do painel e os índices de busca (FTS5). O estoque final de cada
+produto fica entre 0 e ESTOQUE_RESERVA unidades.
+
+Para abrir o banco no app, aponte o db_name de um usuário de users.db
+para o arquivo gerado.
+"""
+import argparse
+import datetime
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storage_manager import init_user_db  # noqa: E402
+from database.migracoes import recalcular_resumos  # noqa: E402
+from database.vendas_controller import FORMATO_DATA_VENDA  # noqa: E402
+
+# Vendas (com os seus itens) gravadas por executemany
+TAMANHO_LOTE = 20000
+
+# Estoque que sobra em cada produto depois de todas as vendas (máximo)
+ESTOQUE_RESERVA = 300
+
+# Expoentes da lei de Zipf: quanto maior, mais concentrada a popularidade
+ZIPF_PRODUTOS = 1.1
+ZIPF_CLIENTES = 0.7
+
+# Peso das vendas por dia da semana (segunda a domingo) e por mês
+PESO_DIA_SEMANA = (0.9, 0.85, 0.9, 1.0, 1.2, 1.4, 0.6)
+PESO_MES = (0.85, 0.8, 0.95, 0.95, 1.05, 1.0, 1.0, 1.0, 0.95, 1.0, 1.25, 1.5)
+
+# Crescimento das vendas do primeiro ao último dia do período
+CRESCIMENTO = 0.3
+
+# Fração de vendas canceladas; pendentes só nos últimos DIAS_PENDENTES dias
+FRACAO_CANCELADAS = 0.04
+FRACAO_PENDENTES = 0.3
+DIAS_PENDENTES = 3
+
+CATEGORIAS = ("Alimentos", "Bebidas", "Limpeza", "Higiene",
+              "Eletrônicos", "Vestuário", "Papelaria", "Outros")
+PRODUTOS_POR_CATEGORIA = {
+    "Alimentos": ("Arroz", "Feijão", "Macarrão", "Café", "Açúcar", "Biscoito", "Farinha", "Óleo"),
+    "Bebidas": ("Refrigerante", "Suco", "Água Mineral", "Cerveja", "Chá", "Energético"),
+    "Limpeza": ("Detergente", "Sabão em Pó", "Desinfetante", "Esponja", "Amaciante"),
+    "Higiene": ("Sabonete", "Shampoo", "Creme Dental", "Desodorante", "Papel Higiênico"),
+    "Eletrônicos": ("Pilha", "Carregador", "Fone de Ouvido", "Cabo USB", "Lâmpada LED"),
+    "Vestuário": ("Camiseta", "Meia", "Boné", "Chinelo", "Bermuda"),
+    "Papelaria": ("Caderno", "Caneta", "Lápis", "Borracha", "Cola", "Pasta"),
+    "Outros": ("Vela", "Fósforo", "Guarda-chuva", "Pregador", "Saco de Lixo"),
+}
+MARCAS = ("Aurora", "Bom Dia", "Central", "Delta", "Estrela", "Fortaleza", "Ipê",
+          "Jequitibá", "Lumiar", "Marajó", "Norte", "Pampa", "Serrana", "Tropical")
+NOMES = ("Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique",
+         "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael",
+         "Sofia", "Thiago", "Vitória", "Wagner", "Yasmin", "Lucas", "Mariana", "Pedro")
+SOBRENOMES = ("Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves",
+              "Pereira", "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho",
+              "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa")
+CIDADES = (("São Paulo", "SP", "01"), ("Rio de Janeiro", "RJ", "20"), ("Belo Horizonte", "MG", "30"),
+           ("Curitiba", "PR", "80"), ("Porto Alegre", "RS", "90"), ("Salvador", "BA", "40"),
+           ("Recife", "PE", "50"), ("Fortaleza", "CE", "60"), ("Goiânia", "GO", "74"),
+           ("Campinas", "SP", "13"))
+BAIRROS = ("Centro", "Jardim América", "Vila Nova", "Boa Vista", "Santa Cruz", "Industrial")
+CARGOS = (("Vendedor", 6), ("Caixa", 3), ("Gerente", 1))
+
+
+def _data_br(data):
+    # Formato das datas de cadastro gravadas pelos formulários
+    return data.strftime("%d/%m/%Y")
+
+
+def _ean13(numero):
+    """Código EAN-13 com prefixo do Brasil (789) e dígito verificador."""
+    corpo = f"789{numero:09d}"
+    soma = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(corpo))
+    return corpo + str((10 - soma % 10) % 10)
+
+
+def popularidade(quantidade, expoente, aleatorio):
+    """
+    Ids de 1 a `quantidade` em ordem aleatória e os pesos acumulados da lei
+    de Zipf, para random.choices(ids, cum_weights=acumulados).
+    """
+    ids = list(range(1, quantidade + 1))
+    aleatorio.shuffle(ids)
+    acumulados = []
+    total = 0.0
+    for posicao in range(1, quantidade + 1):
+        total += 1 / posicao ** expoente
+        acumulados.append(total)
+    return ids, acumulados
+
+
+def _telefone(aleatorio):
+    return f"({aleatorio.randint(11, 99)}) 9{aleatorio.randint(1000, 9999)}-{aleatorio.randint(1000, 9999)}"
+
+
+def gerar_fornecedores(conn, quantidade, aleatorio):
+    linhas = []
+    for i in range(1, quantidade + 1):
+        marca = MARCAS[i % len(MARCAS)]
+        nome = f"{marca} Distribuidora {i}"
+        linhas.append((
+            i, nome, f"{nome} LTDA", f"{i:08d}0001{i % 97:02d}", _telefone(aleatorio),
+            f"contato{i}@{marca.lower().replace(' ', '')}.com.br", None
+        ))
+    conn.executemany(
+        "INSERT INTO fornecedores (id, nome_fantasia, razao_social, cnpj, telefone, email, observacoes) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", linhas
+    )
+
+
+def gerar_funcionarios(conn, quantidade, aleatorio, inicio):
+    cargos = [cargo for cargo, peso in CARGOS for _ in range(peso)]
+    linhas = []
+    for i in range(1, quantidade + 1):
+        nome = f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)}"
+        admissao = inicio - datetime.timedelta(days=aleatorio.randint(0, 1500))
+        linhas.append((
+            i, nome, cargos[i % len(cargos)], _telefone(aleatorio),
+            f"{nome.split()[0].lower()}.{i}@empresa.com.br", _data_br(admissao), None
+        ))
+    conn.executemany(
+        "INSERT INTO funcionarios (id, nome, cargo, telefone, email, data_admissao, observacoes) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", linhas
+    )
+
+
+def gerar_clientes(conn, quantidade, aleatorio, inicio, dias):
+    for primeiro in range(1, quantidade + 1, TAMANHO_LOTE):
+        linhas = []
+        for i in range(primeiro, min(primeiro + TAMANHO_LOTE, quantidade + 1)):
+            nome = f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {aleatorio.choice(SOBRENOMES)}"
+            cidade, estado, prefixo_cep = aleatorio.choice(CIDADES)
+            cadastro = inicio + datetime.timedelta(days=aleatorio.randrange(dias))
+            linhas.append((
+                i, nome, f"{i:011d}", _telefone(aleatorio),
+                f"{nome.split()[0].lower()}{i}@email.com",
+                f"{prefixo_cep}{aleatorio.randint(0, 999999):06d}", cidade, estado,
+                aleatorio.choice(BAIRROS), f"Rua {aleatorio.choice(SOBRENOMES)}",
+                str(aleatorio.randint(1, 3000)), None, _data_br(cadastro)
+            ))
+        conn.executemany(
+            "INSERT INTO clientes (id, nome, cpf_cnpj, telefone, email, cep, cidade, estado, "
+            "bairro, endereco, numero, complemento, data_cadastro) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", linhas
+        )
+
+
+def gerar_produtos(conn, quantidade, fornecedores, aleatorio, inicio):
+    """Grava os produtos e devolve os preços, indexados por id - 1."""
+    precos = []
+    linhas = []
+    for i in range(1, quantidade + 1):
+        categoria = CATEGORIAS[i % len(CATEGORIAS)]
+        tipo = aleatorio.choice(PRODUTOS_POR_CATEGORIA[categoria])
+        # Preços com distribuição log-normal: muitos baratos, poucos caros
+        preco = round(math.exp(aleatorio.gauss(3.0, 0.9)), 2) or 0.5
+        precos.append(preco)
+        linhas.append((
+            i, f"{tipo} {aleatorio.choice(MARCAS)} {i}", f"{tipo} da categoria {categoria}",
+            preco, None, round(preco * aleatorio.uniform(0.4, 0.75), 2),
+            aleatorio.randint(0, ESTOQUE_RESERVA), aleatorio.randint(5, 30),
+            aleatorio.randint(1, fornecedores), categoria, _data_br(inicio),
+            # Alguns produtos (feira, granel) não têm código de barras
+            _ean13(i) if aleatorio.random() < 0.9 else None
+        ))
+    conn.executemany(
+        "INSERT INTO produtos (id, nome, descricao, preco, preco_promocional, custo_unitario, "
+        "estoque_atual, estoque_minimo, fornecedor_id, categoria, data_cadastro, codigo_barras) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", linhas
+    )
+    return precos
+
+
+def vendas_por_dia(total, inicio, dias, aleatorio):
+    """Distribui `total` vendas pelos dias do período, com sazonalidade."""
+    pesos = []
+    for n in range(dias):
+        dia = inicio + datetime.timedelta(days=n)
+        pesos.append(
+            PESO_DIA_SEMANA[dia.weekday()] * PESO_MES[dia.month - 1]
+            * (1 + CRESCIMENTO * n / max(dias - 1, 1)) * aleatorio.uniform(0.85, 1.15)
+        )
+    soma = sum(pesos)
+    acumulado = 0.0
+    distribuidas = 0
+    for n, peso in enumerate(pesos):
+        acumulado += peso
+        ate_aqui = round(total * acumulado / soma)
+        yield inicio + datetime.timedelta(days=n), ate_aqui - distribuidas
+        distribuidas = ate_aqui
+
+
+def gerar_vendas(conn, args, precos, inicio, aleatorio):
+    """Grava vendas e itens em lotes; devolve a quantidade de itens."""
+    ids_produtos, pesos_produtos = popularidade(len(precos), ZIPF_PRODUTOS, aleatorio)
+    ids_clientes, pesos_clientes = popularidade(args.clientes, ZIPF_CLIENTES, aleatorio)
+    escolher = aleatorio.choices
+    acaso = aleatorio.random
+    sorteio = aleatorio.randint
+    # Itens por venda: 1 + geométrica, com média args.itens (antes de juntar repetidos)
+    media_extra = max(args.itens - 1, 0)
+    taxa = math.log(1 + 1 / media_extra) if media_extra else 0
+    maximo_itens = min(50, len(precos))
+    inicio_pendentes = inicio + datetime.timedelta(days=args.dias - DIAS_PENDENTES)
+
+    vendas = []
+    itens = []
+    venda_id = 0
+    item_id = 0
+
+    def gravar():
+        conn.executemany(
+            "INSERT INTO vendas (id, cliente_id, funcionario_id, desconto, status, total, data_venda) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", vendas
+        )
+        conn.executemany(
+            "INSERT INTO itens_venda (id, venda_id, produto_id, quantidade, desconto, preco_unitario, subtotal) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", itens
+        )
+        vendas.clear()
+        itens.clear()
+
+    for dia, quantidade in vendas_por_dia(args.vendas, inicio, args.dias, aleatorio):
+        meia_noite = datetime.datetime.combine(dia, datetime.time())
+        # Horário comercial, das 8h às 22h, em ordem
+        segundos = sorted(aleatorio.randrange(8 * 3600, 22 * 3600) for _ in range(quantidade))
+        pendentes = FRACAO_PENDENTES if dia >= inicio_pendentes else 0.0
+        for segundo in segundos:
+            venda_id += 1
+            data_venda = (meia_noite + datetime.timedelta(seconds=segundo)).strftime(FORMATO_DATA_VENDA)
+            sorteado = acaso()
+            if sorteado < FRACAO_CANCELADAS:
+                status = "Cancelada"
+            elif sorteado < FRACAO_CANCELADAS + pendentes:
+                status = "Pendente"
+            else:
+                status = "Concluída"
+
+            n_itens = 1
+            if media_extra:
+                n_itens = min(1 + int(aleatorio.expovariate(taxa)), maximo_itens)
+            # O carrinho tem uma linha por produto: sorteios repetidos somam quantidade
+            carrinho = {}
+            for produto_id in escolher(ids_produtos, cum_weights=pesos_produtos, k=n_itens):
+                quantidade_item = 1 if acaso() < 0.75 else sorteio(2, 6)
+                carrinho[produto_id] = carrinho.get(produto_id, 0) + quantidade_item
+
+            total = 0.0
+            for produto_id, quantidade_item in carrinho.items():
+                preco = precos[produto_id - 1]
+                bruto = preco * quantidade_item
+                desconto = round(bruto * 0.05, 2) if acaso() < 0.05 else 0.0
+                subtotal = round(bruto - desconto, 2)
+                total += subtotal
+                item_id += 1
+                itens.append((item_id, venda_id, produto_id, quantidade_item, desconto, preco, subtotal))
+
+            desconto_venda = round(total * 0.05, 2) if acaso() < 0.03 else 0.0
+            cliente_id = escolher(ids_clientes, cum_weights=pesos_clientes)[0]
+            vendas.append((
+                venda_id, cliente_id, sorteio(1, args.funcionarios), desconto_venda, status,
+                round(total - desconto_venda, 2), data_venda
+            ))
+            if len(vendas) >= TAMANHO_LOTE:
+                gravar()
+    if vendas:
+        gravar()
+    return item_id
+
+
+def suspender_gatilhos_e_indices(conn):
+    """Remove gatilhos e índices secundários; devolve o DDL para recriá-los."""
+    objetos = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE type IN ('trigger', 'index') AND sql IS NOT NULL"
+    ).fetchall()
+    for tipo, nome, _ in objetos:
+        conn.execute(f"DROP {'TRIGGER' if tipo == 'trigger' else 'INDEX'} IF EXISTS {nome}")
+    return [sql for _, _, sql in objetos]
+
+
+def gerar_movimentacoes(conn, inicio):
+    """
+    Refaz o histórico que os gatilhos gravariam: a entrada inicial de cada
+    produto (estoque final mais o que vendeu) e uma saída por item de venda
+    ativa, com os saldos calculados por funções de janela.
+    """
+    conn.execute(
+        """INSERT INTO movimentacao_estoque (
+               produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual,
+               motivo, referencia_id, referencia_tipo, funcionario_id, data_movimentacao, observacoes
+           )
+           SELECT p.id, 'ENTRADA', p.estoque_atual + COALESCE(v.quantidade, 0), 0,
+                  p.estoque_atual + COALESCE(v.quantidade, 0), 'Estoque inicial do produto',
+                  p.id, 'PRODUTO_NOVO', NULL, ?,
+                  'Produto cadastrado: ' || p.nome || ' - Estoque inicial: '
+                      || CAST(p.estoque_atual + COALESCE(v.quantidade, 0) AS INTEGER)
+           FROM produtos p
+           LEFT JOIN (SELECT iv.produto_id, SUM(iv.quantidade) AS quantidade
+                      FROM itens_venda iv JOIN vendas ve ON ve.id = iv.venda_id
+                      WHERE ve.status IN ('Pendente', 'Concluída')
+                      GROUP BY iv.produto_id) v ON v.produto_id = p.id
+           ORDER BY p.id""",
+        (datetime.datetime.combine(inicio, datetime.time()).strftime(FORMATO_DATA_VENDA),)
+    )
+    conn.execute(
+        """INSERT INTO movimentacao_estoque (
+               produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual,
+               motivo, referencia_id, referencia_tipo, funcionario_id, data_movimentacao, observacoes
+           )
+           SELECT produto_id, 'SAIDA', quantidade, saldo + quantidade, saldo,
+                  'Venda de produto', venda_id, 'VENDA', funcionario_id, data_venda, NULL
+           FROM (SELECT iv.produto_id, iv.quantidade, iv.venda_id, iv.id AS item_id,
+                        ve.funcionario_id, ve.data_venda,
+                        p.estoque_atual
+                            + SUM(iv.quantidade) OVER (PARTITION BY iv.produto_id)
+                            - SUM(iv.quantidade) OVER (PARTITION BY iv.produto_id
+                                                       ORDER BY iv.venda_id, iv.id) AS saldo
+                 FROM itens_venda iv
+                 JOIN vendas ve ON ve.id = iv.venda_id
+                 JOIN produtos p ON p.id = iv.produto_id
+                 WHERE ve.status IN ('Pendente', 'Concluída'))
+           ORDER BY venda_id, item_id"""
+    )
+
+
+def reconstruir_busca(conn):
+    """Recarrega os índices FTS5 a partir das tabelas de conteúdo."""
+    tabelas = [nome for (nome,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%fts5%'"
+    )]
+    for fts in tabelas:
+        conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+class Etapas:
+    """Exibe o tempo de cada etapa da geração."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+
+    def __call__(self, descricao, funcao, *args):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        print(f"  {descricao:<36} {time.perf_counter() - inicio:>8.1f}s")
+        return resultado
+
+    def total(self):
+        return time.perf_counter() - self.inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("destino", help="arquivo do banco a criar (ex.: user_carga.db)")
+    parser.add_argument("--vendas", type=int, default=1000000)
+    parser.add_argument("--itens", type=float, default=5, help="média de itens por venda")
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--clientes", type=int, default=50000)
+    parser.add_argument("--fornecedores", type=int, default=200)
+    parser.add_argument("--funcionarios", type=int, default=40)
+    parser.add_argument("--dias", type=int, default=730, help="período das vendas, até ontem")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--substituir", action="store_true", help="apaga o destino se existir")
+    args = parser.parse_args()
+
+    for nome in ("produtos", "clientes", "fornecedores", "funcionarios", "dias"):
+        if getattr(args, nome) < 1:
+            parser.error(f"--{nome} deve ser pelo menos 1")
+    if os.path.exists(args.destino):
+        if not args.substituir:
+            parser.error(f"{args.destino} já existe (use --substituir)")
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(args.destino + sufixo):
+                os.remove(args.destino + sufixo)
+
+    aleatorio = random.Random(args.semente)
+    inicio = datetime.date.today() - datetime.timedelta(days=args.dias)
+    etapas = Etapas()
+
+    init_user_db(args.destino)
+    conn = sqlite3.connect(args.destino, isolation_level=None)
+    # Arquivo novo e descartável: sem diário nem fsync durante a carga
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("BEGIN")
+
+    print(f"\nGerando {args.destino}:")
+    ddl = etapas("gatilhos e índices suspensos", suspender_gatilhos_e_indices, conn)
+    etapas(f"{args.fornecedores} fornecedores", gerar_fornecedores, conn, args.fornecedores, aleatorio)
+    etapas(f"{args.funcionarios} funcionários", gerar_funcionarios, conn, args.funcionarios, aleatorio, inicio)
+    etapas(f"{args.clientes} clientes", gerar_clientes, conn, args.clientes, aleatorio, inicio, args.dias)
+    precos = etapas(f"{args.produtos} produtos", gerar_produtos, conn, args.produtos,
+                    args.fornecedores, aleatorio, inicio)
+    itens = etapas(f"{args.vendas} vendas", gerar_vendas, conn, args, precos, inicio, aleatorio)
+    etapas("movimentações de estoque", gerar_movimentacoes, conn, inicio)
+    etapas("índices e gatilhos recriados", lambda: [conn.execute(sql) for sql in ddl])
+    etapas("resumos do painel", recalcular_resumos, conn)
+    etapas("índices de busca (FTS5)", reconstruir_busca, conn)
+    conn.execute("COMMIT")
+    # O app abre os bancos em WAL (database/conexao.py)
+    conn.execute("PRAGMA journal_mode=WAL")
+    movimentacoes = conn.execute("SELECT COUNT(*) FROM movimentacao_estoque").fetchone()[0]
+    conn.close()
+
+    tamanho = os.path.getsize(args.destino) / 1024 ** 2
+    print(f"\n{args.vendas} vendas, {itens} itens, {movimentacoes} movimentações; "
+          f"{tamanho:.0f} MB em {etapas.total():.1f}s")
+
+
+if __name__ == "__main__":
+    main()
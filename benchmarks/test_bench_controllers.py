@@ -0,0 +1,74 @@
+"""
+Os casos de bench_controllers.py como testes do pytest, um por caso.
+
+Uso:
+    BENCH_TAMANHO=pequeno python -m pytest benchmarks/test_bench_controllers.py
+                                           [--benchmark-json resultado.json]
+
+Fica fora de testpaths (pyproject.toml), então não roda com o pytest
+comum: o primeiro uso gera o tenant do tamanho pedido (padrão: pequeno),
+como bench_controllers.py. Com o pytest-benchmark instalado cada caso usa o
+fixture `benchmark` do plugin, com as opções dele (--benchmark-json,
+--benchmark-compare...). Sem o plugin, o caso é medido por
+bench_controllers.medir e as estatísticas são exibidas com -s e gravadas
+em user_properties (saem no --junitxml).
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_controllers as bench  # noqa: E402
+
+TAMANHO = os.environ.get("BENCH_TAMANHO", "pequeno")
+
+# Tenant copiado e casos montados uma vez, na coleta, para parametrizar os testes
+_preparado = {}
+
+
+def _casos():
+    if not _preparado:
+        origem = bench.preparar_tenant(TAMANHO, bench.PASTA_TENANTS)
+        pasta = tempfile.mkdtemp()
+        caminho = os.path.join(pasta, os.path.basename(origem))
+        shutil.copyfile(origem, caminho)
+        bench.migrar_banco(caminho)
+        _preparado.update(pasta=pasta, caminho=caminho, casos=dict(bench.casos(caminho)))
+    return _preparado["casos"]
+
+
+def pytest_generate_tests(metafunc):
+    if "caso" in metafunc.fixturenames:
+        metafunc.parametrize("caso", list(_casos()))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _descartar_tenant():
+    yield
+    if _preparado:
+        bench.fechar_pool(_preparado["caminho"])
+        shutil.rmtree(_preparado["pasta"], ignore_errors=True)
+        _preparado.clear()
+
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    @pytest.fixture
+    def benchmark(request):
+        """Substituto do fixture do pytest-benchmark quando o plugin não está instalado."""
+        def medir(funcao):
+            estatisticas = bench.medir(funcao, 5, 1.0)
+            request.node.user_properties.append(("stats", estatisticas))
+            print(f"\n{request.node.name}: mediana {estatisticas['median'] * 1000:.2f} ms "
+                  f"em {estatisticas['rounds']} rodadas")
+            return estatisticas
+        return medir
+
+
+def test_caso(caso, benchmark):
+    benchmark(_casos()[caso])
@@ -0,0 +1,91 @@
+import asyncio
+import atexit
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from storage_manager import init_db, verify_user, create_user, get_user_data
+from database.migracoes import migrar_banco
+
+# Quantidade máxima de hashes PBKDF2 calculados ao mesmo tempo. O hashlib
+# libera o GIL durante o cálculo, então cada trabalhador ocupa um núcleo.
+MAX_TRABALHADORES = min(4, os.cpu_count() or 1)
+
+
+class ServicoAutenticacao:
+    """
+    Login e cadastro de usuários sem bloquear o loop de eventos do Flet.
+
+    O PBKDF2 e os acessos ao users.db rodam num pool limitado de threads;
+    as views apenas aguardam (`await`) o resultado. O pool é compartilhado
+    por todas as sessões, de modo que logins simultâneos no modo web rodam
+    em paralelo até o limite de trabalhadores, e os excedentes esperam na fila.
+    """
+
+    def __init__(self, max_trabalhadores: int = MAX_TRABALHADORES):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(max_trabalhadores, 1),
+            thread_name_prefix="autenticacao"
+        )
+        # Garante a tabela de usuários (e a coluna de iterações) antes do primeiro login
+        init_db()
+
+    async def _executar(self, funcao, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(funcao, *args))
+
+    def _entrar(self, usuario, senha):
+        db_name = verify_user(usuario, senha)
+        if not db_name:
+            return None
+        # Atualiza o esquema do banco do usuário (índices, novas colunas etc.)
+        migrar_banco(db_name)
+        user_data = get_user_data(usuario)
+        if not user_data:
+            return None
+        nome, email, empresa = user_data
+        return {
+            "usuario": usuario,
+            "nome": nome,
+            "email": email,
+            "empresa": empresa,
+            "db_name": db_name,
+        }
+
+    async def entrar(self, usuario: str, senha: str):
+        """
+        Verifica as credenciais e prepara o banco do usuário.
+
+        Returns:
+            dict: usuario, nome, email, empresa e db_name, ou None se inválido
+        """
+        return await self._executar(self._entrar, usuario, senha)
+
+    async def cadastrar(self, nome: str, email: str, empresa: str, usuario: str, senha: str) -> bool:
+        """Cria o usuário e o seu banco. Retorna False se ele já existir."""
+        return await self._executar(create_user, nome, email, empresa, usuario, senha)
+
+    def fechar(self):
+        """Encerra o pool de trabalhadores."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_servico = None
+_servico_lock = threading.Lock()
+
+
+def obter_servico() -> ServicoAutenticacao:
+    """Retorna o serviço de autenticação do processo, criando-o na primeira chamada."""
+    global _servico
+    with _servico_lock:
+        if _servico is None:
+            _servico = ServicoAutenticacao()
+        return _servico
+
+
+def _encerrar():
+    if _servico is not None:
+        _servico.fechar()
+
+
+atexit.register(_encerrar)
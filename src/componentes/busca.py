@@ -0,0 +1,66 @@
+import asyncio
+import flet as ft
+
+# Tempo (em segundos) sem novas teclas antes de a pesquisa ser executada
+ATRASO_BUSCA = 0.3
+
+
+class BuscaAdiada:
+    """
+    Executa a pesquisa de um campo de texto só depois que o usuário para de
+    digitar, descartando consultas que ficaram velhas.
+
+    `consultar(texto)` roda numa thread, fora do loop de eventos, e devolve
+    o resultado; se acessar o banco, deve usar uma conexão emprestada do
+    pool (como os buscar() dos controllers), nunca o cursor compartilhado.
+    `aplicar(texto, resultado)` atualiza a tela e só é chamado para o texto
+    mais recente. A view liga `ao_digitar` ao on_change do campo de pesquisa.
+    """
+
+    def __init__(self, page: ft.Page, consultar, aplicar, atraso=ATRASO_BUSCA):
+        self.page = page
+        self.consultar = consultar
+        self.aplicar = aplicar
+        self.atraso = atraso
+        self._geracao = 0
+        self._tarefa = None
+
+    def ao_digitar(self, e: ft.ControlEvent):
+        """Handler de on_change: agenda a pesquisa do valor atual do campo."""
+        self.agendar(e.control.value or "")
+
+    def agendar(self, texto):
+        """Cancela a pesquisa pendente e agenda uma nova para `texto`."""
+        self._geracao += 1
+        self.cancelar_pendente()
+        self._tarefa = self.page.run_task(self._executar, texto, self._geracao)
+
+    def cancelar_pendente(self):
+        """Cancela a pesquisa ainda em espera ou em andamento, se houver."""
+        if self._tarefa is not None and not self._tarefa.done():
+            self._tarefa.cancel()
+        self._tarefa = None
+
+    async def _executar(self, texto, geracao):
+        try:
+            await asyncio.sleep(self.atraso)
+            resultado = await asyncio.to_thread(self.consultar, texto)
+        except asyncio.CancelledError:
+            return
+        # Uma tecla posterior pode ter chegado enquanto a consulta rodava
+        if geracao != self._geracao:
+            return
+        self.aplicar(texto, resultado)
+
+
+def avisar_truncamento(campo: ft.TextField, resultado):
+    """
+    Mostra abaixo do campo de pesquisa que só os primeiros resultados de um
+    buscar() estão na tela (resultado["truncado"]); None limpa o aviso.
+    """
+    if resultado and resultado["truncado"]:
+        campo.helper_text = (f"Mostrando os {len(resultado['itens'])} primeiros resultados; "
+                             "refine a pesquisa para ver os demais")
+    else:
+        campo.helper_text = None
+    campo.update()
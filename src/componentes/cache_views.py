@@ -0,0 +1,203 @@
+import threading
+import flet as ft
+from componentes.relogio import obter_relogio
+from database import eventos
+
+
+class _Entrada:
+    __slots__ = ("view", "tabelas", "overlays", "valida")
+
+    def __init__(self, view, tabelas):
+        self.view = view
+        self.tabelas = frozenset(tabelas)
+        self.overlays = []
+        self.valida = True
+
+
+class _Repasse:
+    # Segura o callback da view; o barramento guarda só uma referência fraca
+    # ao método, então as assinaturas somem junto com o cache da sessão
+    __slots__ = ("page", "callback", "lock", "__weakref__")
+
+    def __init__(self, page, callback, lock):
+        self.page = page
+        self.callback = callback
+        self.lock = lock
+
+    def entregar(self, alteracao):
+        # O barramento chama na thread de quem gravou, que pode ser outra
+        # sessão do mesmo tenant: o callback roda numa thread desta sessão,
+        # um por vez, para não disputar a view com a gravação alheia
+        self.page.run_thread(self._executar, alteracao)
+
+    def _executar(self, alteracao):
+        with self.lock:
+            self.callback(alteracao)
+
+
+class CacheViews:
+    """
+    Views já montadas de uma sessão, reaproveitadas ao voltar para a rota.
+
+    `abrir(rota, construir, tabelas)` devolve a view guardada da rota ou
+    monta uma nova com `construir()`. Só são guardadas as rotas que
+    informam `tabelas` (as tabelas do banco cujos dados a view exibe).
+
+    O cache assina o barramento de eventos do banco da sessão: uma
+    alteração numa tabela marca para reconstrução, na próxima visita,
+    apenas as views que dependem dela. A view que acompanha uma tabela por
+    conta própria (`assinar`) não é reconstruída, a menos que a alteração
+    não informe as linhas afetadas. As assinaturas feitas pela view são
+    canceladas quando ela é descartada.
+
+    Os controles que uma view acrescenta a `page.overlay` (diálogos,
+    seletores de arquivo, menus), na montagem ou depois, ficam anotados
+    na entrada: saem do overlay quando a rota deixa a tela e voltam com
+    ela, e são descartados junto com a view. Assim o overlay só contém os
+    controles da tela atual, em vez de crescer a cada navegação.
+    """
+
+    def __init__(self, page: ft.Page, ao_descartar=None):
+        self.page = page
+        # Chamado com a rota cuja view foi descartada (ex.: para soltar o relógio)
+        self.ao_descartar = ao_descartar
+        self.banco = None
+        self._entradas = {}
+        self._rota = None
+        self._overlay_inicial = set()
+        # Assinaturas e tabelas acompanhadas pelas views, por rota
+        self._assinaturas = {}
+        self._acompanhadas = {}
+        # Os callbacks das views desta sessão rodam um de cada vez
+        self._lock_repasses = threading.Lock()
+        self._assinatura = eventos.assinar(self._ao_alterar)
+
+    def __contains__(self, rota):
+        return rota in self._entradas
+
+    def abrir(self, rota: str, construir, tabelas=None):
+        """
+        Devolve a view da rota, montando-a se não estiver guardada ou válida.
+
+        Args:
+            rota (str): Rota que vai para a tela
+            construir (callable): Monta a view; None para rotas sem view
+            tabelas (iterable, opcional): Tabelas das quais a view depende;
+                sem elas a view é montada a cada visita e não fica guardada
+
+        Returns:
+            ft.View: View da rota, ou None
+        """
+        self._encerrar_visita()
+
+        entrada = self._entradas.get(rota)
+        if entrada is not None and not entrada.valida:
+            self._descartar(rota)
+            entrada = None
+
+        if entrada is not None:
+            self.page.overlay.extend(entrada.overlays)
+            self._iniciar_visita(rota)
+            return entrada.view
+
+        self._iniciar_visita(rota)
+        view = construir() if construir is not None else None
+        if view is not None and tabelas is not None:
+            self._entradas[rota] = _Entrada(view, tabelas)
+        return view
+
+    def entrar(self, banco: str):
+        """Passa a guardar views do banco do usuário que acabou de entrar."""
+        self.limpar()
+        self.banco = banco
+
+    def assinar(self, tabelas, callback):
+        """
+        Entrega à view em construção as alterações nas tabelas, no banco da sessão.
+
+        O callback roda numa thread desta sessão (page.run_thread), e não na
+        de quem gravou; se ler o banco, deve usar uma conexão emprestada do
+        pool (como os buscar_por_ids dos controllers).
+
+        Args:
+            tabelas (iterable): Tabelas que a view atualiza sozinha
+            callback (callable): Recebe cada Alteracao
+        """
+        tabelas = frozenset(tabelas)
+        repasse = _Repasse(self.page, callback, self._lock_repasses)
+        assinatura = eventos.assinar(repasse.entregar, tabelas, self.banco)
+        self._assinaturas.setdefault(self._rota, []).append((assinatura, repasse))
+        self._acompanhadas[self._rota] = self._acompanhadas.get(self._rota, frozenset()) | tabelas
+
+    def invalidar(self, *tabelas):
+        """Marca para reconstrução as views que dependem de alguma das tabelas."""
+        alteradas = set(tabelas)
+        for entrada in list(self._entradas.values()):
+            if entrada.tabelas & alteradas:
+                entrada.valida = False
+
+    def _ao_alterar(self, alteracao):
+        if alteracao.banco != self.banco:
+            return
+        for rota, entrada in list(self._entradas.items()):
+            if alteracao.tabela not in entrada.tabelas:
+                continue
+            if alteracao.ids and alteracao.tabela in self._acompanhadas.get(rota, ()):
+                continue
+            entrada.valida = False
+
+    def limpar(self):
+        """Descarta todas as views guardadas (ex.: ao sair da conta)."""
+        self.banco = None
+        for rota in list(self._entradas):
+            if rota != self._rota:
+                self._descartar(rota)
+        # A view da tela atual continua em uso até a próxima navegação
+        atual = self._entradas.get(self._rota)
+        if atual is not None:
+            atual.valida = False
+
+    def _iniciar_visita(self, rota):
+        self._rota = rota
+        self._overlay_inicial = {id(controle) for controle in self.page.overlay}
+
+    def _encerrar_visita(self):
+        if self._rota is None:
+            return
+        rota, self._rota = self._rota, None
+        novos = [c for c in self.page.overlay if id(c) not in self._overlay_inicial]
+        entrada = self._entradas.get(rota)
+        if entrada is not None:
+            entrada.overlays.extend(novos)
+            self._retirar_do_overlay(entrada.overlays)
+        else:
+            # Rota não guardada: a view e os seus controles não voltam mais
+            self._retirar_do_overlay(novos)
+            self._soltar(rota)
+
+    def _descartar(self, rota):
+        entrada = self._entradas.pop(rota)
+        self._retirar_do_overlay(entrada.overlays)
+        self._soltar(rota)
+
+    def _soltar(self, rota):
+        for assinatura, _ in self._assinaturas.pop(rota, ()):
+            assinatura.cancelar()
+        self._acompanhadas.pop(rota, None)
+        if self.ao_descartar is not None:
+            self.ao_descartar(rota)
+
+    def _retirar_do_overlay(self, controles):
+        if not controles:
+            return
+        retirar = {id(controle) for controle in controles}
+        self.page.overlay[:] = [c for c in self.page.overlay if id(c) not in retirar]
+
+
+def obter_cache_views(page: ft.Page) -> CacheViews:
+    """Retorna o cache de views da sessão, criando-o no primeiro uso."""
+    cache = page.session.get("cache_views")
+    if cache is None:
+        cache = CacheViews(page, ao_descartar=obter_relogio(page).descartar)
+        page.session.set("cache_views", cache)
+    return cache
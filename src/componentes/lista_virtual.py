@@ -0,0 +1,87 @@
+import bisect
+import flet as ft
+
+# Itens extras montados acima e abaixo da área visível, para a rolagem não piscar
+BUFFER_ITENS = 10
+
+# Altura (em pixels) assumida para a área visível antes do primeiro evento de rolagem
+ALTURA_JANELA = 900
+
+
+class ListaVirtual:
+    """
+    Lista rolável que só monta os controles da janela visível.
+
+    Cada entrada tem altura fixa conhecida (`altura_item(entrada)`), então a
+    posição de qualquer item sai de um índice de deslocamentos acumulados.
+    A coluna recebe dois espaçadores com a altura de tudo que está acima e
+    abaixo da janela, e `criar_item(entrada)` é chamado apenas para as
+    entradas visíveis mais um buffer. A view liga `ao_rolar` ao on_scroll
+    da coluna, que deve ter spacing=0.
+    """
+
+    def __init__(self, coluna: ft.Column, criar_item, altura_item, buffer=BUFFER_ITENS):
+        self.coluna = coluna
+        self.criar_item = criar_item
+        self.altura_item = altura_item
+        self.buffer = buffer
+        self.entradas = []
+        self._inicios = [0]
+        self._pixels = 0
+        self._altura = ALTURA_JANELA
+        self._janela = None
+        self._montados = {}
+        self._acima = ft.Container(height=0)
+        self._abaixo = ft.Container(height=0)
+
+    def definir(self, entradas, manter_posicao=True):
+        """
+        Troca as entradas exibidas, recalculando o índice de alturas.
+
+        Args:
+            entradas (list): Entradas na ordem de exibição
+            manter_posicao (bool): Mantém a rolagem atual (ex.: ao acrescentar
+                uma página); se False, volta para o topo
+        """
+        self.entradas = list(entradas)
+        inicios = [0]
+        for entrada in self.entradas:
+            inicios.append(inicios[-1] + self.altura_item(entrada))
+        self._inicios = inicios
+        if not manter_posicao:
+            self._pixels = 0
+        self._montados = {}
+        self._janela = None
+        self._renderizar()
+
+    def ao_rolar(self, e: ft.OnScrollEvent):
+        """Handler de on_scroll: remonta a janela se ela mudou."""
+        if e.pixels is not None:
+            self._pixels = e.pixels
+        if e.viewport_dimension:
+            self._altura = e.viewport_dimension
+        self._renderizar()
+
+    def _renderizar(self):
+        total = len(self.entradas)
+        topo = max(self._pixels, 0)
+        primeiro = bisect.bisect_right(self._inicios, topo) - 1
+        ultimo = bisect.bisect_left(self._inicios, topo + self._altura)
+        inicio = max(min(primeiro, total) - self.buffer, 0)
+        fim = min(ultimo + self.buffer, total)
+        if (inicio, fim) == self._janela:
+            return
+        self._janela = (inicio, fim)
+
+        # Reaproveita os controles que continuam na janela
+        montados = {}
+        for i in range(inicio, fim):
+            controle = self._montados.get(i)
+            montados[i] = controle if controle is not None else self.criar_item(self.entradas[i])
+        self._montados = montados
+
+        self._acima.height = self._inicios[inicio]
+        self._abaixo.height = self._inicios[total] - self._inicios[fim]
+        self.coluna.controls = [self._acima, *montados.values(), self._abaixo]
+        if self.coluna.page is not None:
+            self.coluna.update()
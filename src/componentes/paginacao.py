@@ -0,0 +1,61 @@
+import threading
+import flet as ft
+from database.paginacao import TAMANHO_PAGINA
+
+# Distância (em pixels) do fim da rolagem a partir da qual a próxima página é carregada
+LIMIAR_ROLAGEM = 300
+
+
+class CarregadorPaginas:
+    """
+    Carrega sob demanda as páginas de um método listar_*_paginado dos controllers.
+
+    A view informa como exibir cada página recebida (`ao_carregar`) e liga
+    `ao_rolar` ao evento on_scroll da coluna rolável que contém a lista.
+    """
+
+    def __init__(self, listar_pagina, ao_carregar, limite=TAMANHO_PAGINA, **ordenacao):
+        self.listar_pagina = listar_pagina
+        self.ao_carregar = ao_carregar
+        self.limite = limite
+        self.ordenacao = ordenacao
+        self.proximo = None
+        self.esgotado = False
+        self._lock = threading.Lock()
+
+    def reiniciar(self):
+        """Volta para a primeira página e a carrega. Retorna os itens carregados."""
+        with self._lock:
+            self.proximo = None
+            self.esgotado = False
+        return self.carregar_mais()
+
+    def continuar(self, pagina):
+        """Segue a partir de uma página carregada por fora (ex.: a primeira de uma pesquisa)."""
+        with self._lock:
+            self.proximo = pagina["proximo"]
+            self.esgotado = self.proximo is None
+
+    def carregar_mais(self):
+        """Carrega a próxima página, se houver. Retorna os itens carregados."""
+        # Ignora o pedido se outra página já estiver sendo carregada
+        if not self._lock.acquire(blocking=False):
+            return []
+        try:
+            if self.esgotado:
+                return []
+            pagina = self.listar_pagina(apos=self.proximo, limite=self.limite, **self.ordenacao)
+            self.proximo = pagina["proximo"]
+            self.esgotado = self.proximo is None
+        finally:
+            self._lock.release()
+        if pagina["itens"]:
+            self.ao_carregar(pagina["itens"])
+        return pagina["itens"]
+
+    def ao_rolar(self, e: ft.OnScrollEvent):
+        """Handler de on_scroll: carrega a próxima página perto do fim da lista."""
+        if e.max_scroll_extent is None or e.pixels is None:
+            return
+        if e.pixels >= e.max_scroll_extent - LIMIAR_ROLAGEM:
+            self.carregar_mais()
@@ -0,0 +1,96 @@
+import asyncio
+import datetime
+import threading
+import time
+import flet as ft
+
+FORMATO_RELOGIO = "Hoje: %d/%m/%Y %H:%M:%S"
+
+
+def texto_relogio() -> str:
+    """Texto exibido pelos relógios das views."""
+    return datetime.datetime.now().strftime(FORMATO_RELOGIO)
+
+
+class Relogio:
+    """
+    Relógio compartilhado por todas as views de uma sessão.
+
+    Uma única tarefa por sessão atualiza, a cada segundo, apenas os `ft.Text`
+    registrados (`controle.update()`), sem re-enviar a página inteira. Cada
+    controle fica associado à rota que o registrou e só é atualizado
+    enquanto ela está na tela (`ao_mudar_rota`); as views guardadas em
+    cache mantêm o seu controle até a rota ser descartada (`descartar`).
+    Sem controles na rota atual a tarefa termina, e o próximo registro ou
+    troca de rota a inicia de novo.
+    """
+
+    def __init__(self, page: ft.Page):
+        self.page = page
+        self._controles = {}
+        self._rota = page.route
+        self._tarefa = None
+        self._lock = threading.Lock()
+
+    def registrar(self, controle: ft.Text, rota: str = None):
+        """
+        Passa a atualizar o controle enquanto a rota estiver ativa.
+
+        Args:
+            controle (ft.Text): Texto que exibirá a data e a hora
+            rota (str, opcional): Rota dona do controle; padrão é page.route
+        """
+        controle.value = texto_relogio()
+        with self._lock:
+            self._controles.setdefault(rota or self.page.route, {})[id(controle)] = controle
+            self._iniciar()
+
+    def remover(self, controle: ft.Text):
+        """Deixa de atualizar o controle."""
+        with self._lock:
+            for controles in self._controles.values():
+                controles.pop(id(controle), None)
+
+    def descartar(self, rota: str):
+        """Esquece os controles registrados pela rota (a view não será mais exibida)."""
+        with self._lock:
+            self._controles.pop(rota, None)
+
+    def ao_mudar_rota(self, rota: str):
+        """Passa a atualizar apenas os controles da rota que foi para a tela."""
+        agora = texto_relogio()
+        with self._lock:
+            self._rota = rota
+            # Views reaproveitadas voltam já com a hora certa
+            for controle in self._controles.get(rota, {}).values():
+                controle.value = agora
+            self._iniciar()
+
+    def _iniciar(self):
+        if self._tarefa is None and self._controles.get(self._rota):
+            self._tarefa = self.page.run_task(self._executar)
+
+    async def _executar(self):
+        while True:
+            with self._lock:
+                controles = list(self._controles.get(self._rota, {}).values())
+                if not controles:
+                    self._tarefa = None
+                    return
+            agora = texto_relogio()
+            for controle in controles:
+                # Controles ainda não montados recebem o valor no próximo envio da view
+                controle.value = agora
+                if controle.page is not None:
+                    controle.update()
+            # Dorme até a virada do próximo segundo, para o relógio não atrasar
+            await asyncio.sleep(1 - time.time() % 1)
+
+
+def obter_relogio(page: ft.Page) -> Relogio:
+    """Retorna o relógio da sessão, criando-o no primeiro uso."""
+    relogio = page.session.get("relogio")
+    if relogio is None:
+        relogio = Relogio(page)
+        page.session.set("relogio", relogio)
+    return relogio
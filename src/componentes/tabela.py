@@ -0,0 +1,152 @@
+import flet as ft
+from database.eventos import INSERCAO, EXCLUSAO
+
+
+class TabelaChaveada:
+    """
+    Mantém as linhas de um ft.DataTable indexadas pela chave do registro.
+
+    Depois de um cadastro, edição ou exclusão a view altera só a linha
+    afetada e envia apenas a tabela (`tabela.update()`), em vez de limpar
+    e recriar todas as linhas. `criar_linha(registro)` monta o DataRow de
+    um registro; os handlers da linha devem usar a chave, não a posição.
+    """
+
+    def __init__(self, tabela: ft.DataTable, criar_linha, chave="id"):
+        self.tabela = tabela
+        self.criar_linha = criar_linha
+        self.chave = chave
+        self.registros = {}
+        self._linhas = {}
+
+    def __len__(self):
+        return len(self.registros)
+
+    def __contains__(self, chave):
+        return chave in self.registros
+
+    def get(self, chave, padrao=None):
+        """Retorna o registro exibido com a chave informada."""
+        return self.registros.get(chave, padrao)
+
+    def _enviar(self):
+        # Antes de a view ser montada não há o que enviar ao cliente
+        if self.tabela.page is not None:
+            self.tabela.update()
+
+    def limpar(self):
+        """Remove todas as linhas (sem enviar; a próxima alteração envia)."""
+        self.registros.clear()
+        self._linhas.clear()
+        self.tabela.rows.clear()
+
+    def acrescentar(self, registros):
+        """Acrescenta registros no fim da tabela (ex.: uma nova página)."""
+        for registro in registros:
+            chave = registro[self.chave]
+            if chave in self.registros:
+                self._substituir(registro)
+                continue
+            linha = self.criar_linha(registro)
+            self.registros[chave] = registro
+            self._linhas[chave] = linha
+            self.tabela.rows.append(linha)
+        self._enviar()
+
+    def inserir(self, registro, posicao=None):
+        """
+        Insere a linha de um registro recém-cadastrado.
+
+        Args:
+            registro (dict): Registro com a chave preenchida
+            posicao (int, opcional): Posição na tabela; padrão é o fim
+        """
+        chave = registro[self.chave]
+        if chave in self.registros:
+            self.atualizar(registro)
+            return
+        linha = self.criar_linha(registro)
+        self.registros[chave] = registro
+        self._linhas[chave] = linha
+        if posicao is None:
+            self.tabela.rows.append(linha)
+        else:
+            self.tabela.rows.insert(posicao, linha)
+        self._enviar()
+
+    def atualizar(self, registro):
+        """Troca, na mesma posição, a linha de um registro editado."""
+        if registro[self.chave] not in self.registros:
+            return False
+        self._substituir(registro)
+        self._enviar()
+        return True
+
+    def remover(self, chave):
+        """Remove a linha do registro excluído."""
+        linha = self._linhas.pop(chave, None)
+        if linha is None:
+            return False
+        del self.registros[chave]
+        self.tabela.rows.remove(linha)
+        self._enviar()
+        return True
+
+    def aplicar(self, alteracao, buscar, posicao=None):
+        """
+        Reflete na tabela uma Alteracao publicada no barramento de eventos.
+
+        Exclusões removem as linhas; para inserções e edições os registros
+        são relidos com `buscar(ids)`. Edições de registros que não estão na
+        tabela (ex.: ainda em outra página) são ignoradas.
+
+        Args:
+            alteracao (Alteracao): Alteração na tabela exibida
+            buscar (callable): Recebe os ids e devolve os registros atuais
+            posicao (int, opcional): Onde entram os registros inseridos
+
+        Returns:
+            bool: False se a alteração não informa as linhas (é preciso recarregar)
+        """
+        if not alteracao.ids:
+            return False
+        if alteracao.operacao == EXCLUSAO:
+            for chave in alteracao.ids:
+                self.remover(chave)
+            return True
+        ids = alteracao.ids
+        if alteracao.operacao != INSERCAO:
+            ids = [chave for chave in ids if chave in self.registros]
+        for registro in buscar(ids) if ids else ():
+            if alteracao.operacao == INSERCAO:
+                self.inserir(registro, posicao)
+            else:
+                self.atualizar(registro)
+        return True
+
+    def sincronizar(self, registros):
+        """
+        Faz a tabela exibir exatamente `registros`, nessa ordem, reaproveitando
+        as linhas de registros que não mudaram e recriando só as alteradas.
+        """
+        novos = {}
+        linhas = {}
+        for registro in registros:
+            chave = registro[self.chave]
+            linha = self._linhas.get(chave)
+            if linha is None or self.registros[chave] != registro:
+                linha = self.criar_linha(registro)
+            novos[chave] = registro
+            linhas[chave] = linha
+        self.registros = novos
+        self._linhas = linhas
+        self.tabela.rows[:] = list(linhas.values())
+        self._enviar()
+
+    def _substituir(self, registro):
+        chave = registro[self.chave]
+        antiga = self._linhas[chave]
+        nova = self.criar_linha(registro)
+        self.registros[chave] = registro
+        self._linhas[chave] = nova
+        self.tabela.rows[self.tabela.rows.index(antiga)] = nova
@@ -0,0 +1,122 @@
+import re
+from database.conexao import obter_pool
+from database.linhas import ler_linhas
+
+# Quantidade padrão de resultados devolvidos pelos métodos buscar()
+LIMITE_BUSCA = 50
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_NAO_DIGITO = re.compile(r"\D")
+
+
+def padrao_like(texto):
+    """
+    Padrão de LIKE que encontra o texto em qualquer posição, com % e _
+    tratados como caracteres comuns (use com ESCAPE '\\').
+    """
+    texto = texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{texto}%"
+
+
+def consulta_fts(texto):
+    """
+    Converte o texto digitado em uma expressão MATCH do FTS5
+
+    Cada palavra vira um prefixo entre aspas ("pal"*), e todas precisam
+    aparecer no registro: "jo sil" encontra "João da Silva", já que o
+    tokenizador ignora acentos e maiúsculas. Aspas, hífens e outros operadores do FTS5 são
+    descartados, então o texto do usuário nunca gera erro de sintaxe.
+
+    Args:
+        texto (str): Texto do campo de pesquisa
+
+    Returns:
+        str: Expressão para o MATCH ou None se não houver palavras
+    """
+    tokens = _TOKEN.findall(texto or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def consulta_trigrama(texto):
+    """
+    Converte o texto digitado em uma expressão MATCH para o índice trigram
+
+    Cada palavra com 3 ou mais letras vira um trecho entre aspas que pode
+    aparecer em qualquer posição ("ilva" encontra "Silva"); se alguma for
+    menor, o texto inteiro é procurado como um trecho só. Um texto com
+    números e pontuação também é procurado só pelos números, que a coluna
+    `digitos` guarda sem pontuação ("123.456" ou "123456" encontram
+    "123.456.789-00").
+
+    Args:
+        texto (str): Texto do campo de pesquisa
+
+    Returns:
+        str: Expressão para o MATCH ou None se o texto for curto demais
+    """
+    texto = (texto or "").strip()
+    partes = texto.split()
+    if partes and all(len(parte) >= 3 for parte in partes):
+        expressao = " ".join(_trecho(parte) for parte in partes)
+    elif len(texto) >= 3:
+        expressao = _trecho(texto)
+    else:
+        expressao = None
+    numeros = _NAO_DIGITO.sub("", texto)
+    if len(numeros) >= 3 and numeros != texto:
+        expressao = f"({expressao}) OR {_trecho(numeros)}" if expressao else _trecho(numeros)
+    return expressao
+
+
+def _trecho(texto):
+    return '"' + texto.replace('"', '""') + '"'
+
+
+def buscar_fts(db_name, sql, tabela, texto, limite=LIMITE_BUSCA, chave="id"):
+    """
+    Executa a busca textual de uma tabela com índices FTS5
+
+    Os resultados vêm em três grupos, sem repetição: o registro cujo ID é
+    o número digitado; os encontrados por prefixo de palavra no índice
+    {tabela}_fts, por relevância (rank); e os encontrados por trecho no
+    índice {tabela}_trigrama (ver consulta_trigrama).
+
+    A pesquisa roda numa conexão emprestada do pool, e não no cursor do
+    controller: BuscaAdiada a chama numa thread, ao mesmo tempo em que a
+    interface pagina e grava pela conexão principal.
+
+    Args:
+        db_name (str): Banco do tenant
+        sql (str): SELECT ... FROM da tabela (e seus JOINs), sem WHERE
+        tabela (str): Nome da tabela, que dá nome aos índices
+        texto (str): Texto do campo de pesquisa
+        limite (int): Quantidade máxima de resultados
+        chave (str): Coluna do ID no SELECT (ex.: "c.id")
+
+    Returns:
+        dict: {"itens": lista de Linha, "truncado": True se havia mais que `limite`}
+    """
+    limite = max(int(limite), 1)
+    texto = (texto or "").strip()
+    consultas = []
+    if texto.isdecimal():
+        consultas.append((f"{sql} WHERE {chave} = ?", (int(texto),)))
+    for indice, expressao, ordem in (
+        (f"{tabela}_fts", consulta_fts(texto), f" ORDER BY {tabela}_fts.rank"),
+        (f"{tabela}_trigrama", consulta_trigrama(texto), ""),
+    ):
+        if expressao is not None:
+            # Um a mais que o limite, para saber se a lista foi cortada
+            consultas.append((f"{sql} JOIN {indice} ON {indice}.rowid = {chave} "
+                              f"WHERE {indice} MATCH ?{ordem} LIMIT ?", (expressao, limite + 1)))
+    encontrados = {}
+    with obter_pool(db_name).emprestar() as conn:
+        for consulta, parametros in consultas:
+            if len(encontrados) > limite:
+                break
+            for linha in ler_linhas(conn.execute(consulta, parametros)):
+                encontrados.setdefault(linha["id"], linha)
+    itens = list(encontrados.values())
+    return {"itens": itens[:limite], "truncado": len(itens) > limite}
@@ -0,0 +1,216 @@
+import bisect
+import re
+import unicodedata
+
+# Quantidade máxima de sugestões devolvidas por IndiceCatalogo.buscar
+LIMITE_SUGESTOES = 10
+
+# Na busca por trecho, para de coletar candidatos depois desta quantidade
+LIMITE_VARREDURA = 1000
+
+# Separador entre os nomes no texto usado pela busca por trecho
+_SEPARADOR = "\x00"
+
+
+def normalizar(texto) -> str:
+    """Nome em minúsculas, sem acentos e sem espaços nas pontas, para comparação."""
+    if texto is None:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", str(texto).strip().casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def _palavras(nome):
+    return set(re.findall(r"\w+", nome))
+
+
+class IndiceCatalogo:
+    """
+    Índice em memória de um cadastro (produtos, clientes, funcionários).
+
+    Montado uma vez por view a partir dos registros já carregados, responde
+    sem percorrer a lista:
+
+    - `obter(id)`: dicionário id → registro;
+    - `id_por_nome(nome)`: nome exato (sem diferenciar maiúsculas e acentos);
+    - `obter_por_codigo(codigo)`: código de barras, quando `campo_codigo` é
+      informado;
+    - `buscar(texto)`: id exato, depois nomes que começam com o texto,
+      nomes com alguma palavra que começa com o texto (busca binária em
+      listas ordenadas) e, se faltar, nomes que contêm o texto em qualquer
+      posição.
+
+    Os nomes são normalizados só na carga; `atualizar` e `remover` mantêm o
+    índice em dia quando um registro muda, sem reconstruí-lo.
+    """
+
+    def __init__(self, registros=(), campo_nome="nome", chave="id", campo_codigo=None):
+        self.campo_nome = campo_nome
+        self.chave = chave
+        self.campo_codigo = campo_codigo
+        self.carregar(registros)
+
+    def __len__(self):
+        return len(self.por_id)
+
+    def __contains__(self, chave):
+        return chave in self.por_id
+
+    def carregar(self, registros):
+        """Reconstrói o índice com os registros informados."""
+        self.por_id = {}
+        self.por_nome = {}
+        self.por_codigo = {}
+        pares = []
+        palavras = []
+        for registro in registros:
+            chave = registro[self.chave]
+            nome = normalizar(registro[self.campo_nome])
+            self.por_id[chave] = registro
+            self.por_nome.setdefault(nome, chave)
+            self._indexar_codigo(registro)
+            pares.append((nome, chave))
+            palavras.extend((palavra, chave) for palavra in _palavras(nome))
+        pares.sort()
+        palavras.sort()
+        self._nomes = [nome for nome, _ in pares]
+        self._chaves = [chave for _, chave in pares]
+        self._palavras = palavras
+        self._montar_texto()
+
+    def obter(self, chave):
+        """Retorna o registro com a chave informada, ou None."""
+        return self.por_id.get(chave)
+
+    def id_por_nome(self, nome):
+        """Retorna a chave do registro com exatamente esse nome, ou None."""
+        return self.por_nome.get(normalizar(nome))
+
+    def obter_por_codigo(self, codigo):
+        """Retorna o registro com o código de barras informado, ou None."""
+        return self.por_codigo.get(str(codigo).strip())
+
+    def _indexar_codigo(self, registro):
+        if self.campo_codigo and registro.get(self.campo_codigo):
+            self.por_codigo[registro[self.campo_codigo]] = registro
+
+    def atualizar(self, registro):
+        """Inclui um registro novo ou troca um já indexado."""
+        chave = registro[self.chave]
+        if chave in self.por_id:
+            self._retirar(chave)
+        nome = normalizar(registro[self.campo_nome])
+        self.por_id[chave] = registro
+        self.por_nome.setdefault(nome, chave)
+        self._indexar_codigo(registro)
+        posicao = bisect.bisect_left(self._nomes, nome)
+        self._nomes.insert(posicao, nome)
+        self._chaves.insert(posicao, chave)
+        for palavra in _palavras(nome):
+            bisect.insort(self._palavras, (palavra, chave))
+        self._texto = None
+
+    def remover(self, chave):
+        """Retira um registro do índice."""
+        if chave in self.por_id:
+            self._retirar(chave)
+            self._texto = None
+
+    def _retirar(self, chave):
+        antigo = self.por_id.pop(chave)
+        if self.campo_codigo and self.por_codigo.get(antigo.get(self.campo_codigo)) is antigo:
+            del self.por_codigo[antigo[self.campo_codigo]]
+        nome = normalizar(antigo[self.campo_nome])
+        posicao = bisect.bisect_left(self._nomes, nome)
+        while self._chaves[posicao] != chave:
+            posicao += 1
+        del self._nomes[posicao]
+        del self._chaves[posicao]
+        for palavra in _palavras(nome):
+            indice = bisect.bisect_left(self._palavras, (palavra, chave))
+            del self._palavras[indice]
+        if self.por_nome.get(nome) == chave:
+            del self.por_nome[nome]
+            # Outro registro com o mesmo nome passa a responder por ele; o
+            # removido pode não ser o primeiro da sequência de nomes iguais
+            primeiro = bisect.bisect_left(self._nomes, nome)
+            if primeiro < len(self._nomes) and self._nomes[primeiro] == nome:
+                self.por_nome[nome] = self._chaves[primeiro]
+
+    def _por_prefixo(self, texto, limite):
+        inicio = bisect.bisect_left(self._nomes, texto)
+        fim = bisect.bisect_right(self._nomes, texto + "\U0010ffff", inicio)
+        return self._chaves[inicio:min(fim, inicio + limite)]
+
+    def _por_palavra(self, texto, limite):
+        inicio = bisect.bisect_left(self._palavras, (texto,))
+        fim = bisect.bisect_left(self._palavras, (texto + "\U0010ffff",), inicio)
+        chaves = []
+        for _, chave in self._palavras[inicio:fim]:
+            if chave not in chaves:
+                chaves.append(chave)
+                if len(chaves) >= limite:
+                    break
+        return chaves
+
+    def _montar_texto(self):
+        # Um único texto com todos os nomes permite procurar um trecho com
+        # str.find, que varre em C, em vez de testar nome a nome
+        self._texto = _SEPARADOR.join(self._nomes)
+        inicios = []
+        posicao = 0
+        for nome in self._nomes:
+            inicios.append(posicao)
+            posicao += len(nome) + 1
+        self._inicios = inicios
+
+    def _por_trecho(self, texto, limite):
+        if self._texto is None:
+            self._montar_texto()
+
+        candidatos = []
+        posicao = self._texto.find(texto)
+        while posicao != -1 and len(candidatos) < LIMITE_VARREDURA:
+            indice = bisect.bisect_right(self._inicios, posicao) - 1
+            nome = self._nomes[indice]
+            deslocamento = posicao - self._inicios[indice]
+            # Trechos no início de uma palavra vêm antes dos do meio
+            inicio_palavra = deslocamento == 0 or not nome[deslocamento - 1].isalnum()
+            candidatos.append((not inicio_palavra, deslocamento, len(nome), indice))
+            proximo = self._inicios[indice] + len(nome) + 1
+            posicao = self._texto.find(texto, proximo)
+        candidatos.sort()
+        return [self._chaves[indice] for *_, indice in candidatos[:limite]]
+
+    def buscar(self, texto, limite=LIMITE_SUGESTOES):
+        """
+        Procura registros pelo nome ou pelo id.
+
+        Args:
+            texto (str): Id ou trecho do nome digitado
+            limite (int): Quantidade máxima de registros
+
+        Returns:
+            list: Registros, do mais ao menos relevante
+        """
+        texto = normalizar(texto)
+        if not texto:
+            return []
+        chaves = []
+        if texto.isdigit() and int(texto) in self.por_id:
+            chaves.append(int(texto))
+        etapas = (self._por_prefixo, self._por_palavra, self._por_trecho)
+        for etapa in etapas:
+            if len(chaves) >= limite:
+                break
+            if etapa is self._por_trecho and _SEPARADOR in texto:
+                break
+            for chave in etapa(texto, limite):
+                if chave not in chaves:
+                    chaves.append(chave)
+        return [self.por_id[chave] for chave in chaves[:limite]]
+
+    def primeiro(self, texto):
+        """Retorna o registro mais relevante para o texto, ou None."""
+        resultado = self.buscar(texto, limite=1)
+        return resultado[0] if resultado else None
@@ -1,8 +1,21 @@
 import sqlite3
+from database.conexao import obter_conexao, obter_pool, transacao
+from database.linhas import ler_linhas
+from database.eventos import publicar, INSERCAO, ATUALIZACAO, EXCLUSAO
+from database.paginacao import listar_pagina, TAMANHO_PAGINA
+from database.busca import buscar_fts, LIMITE_BUSCA
 
 class ClientesController:
+    # Colunas aceitas na ordenação da listagem paginada (todas indexadas)
+    COLUNAS_ORDENACAO = {
+        'id': 'id',
+        'nome': 'nome',
+        'cpf_cnpj': 'cpf_cnpj',
+    }
+
     def __init__(self, db_name:str):
-        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.db_name = db_name
+        self.conn = obter_conexao(db_name)
         self.cursor = self.conn.cursor()
 
     def cadastrar_cliente(self, cliente_data):
@@ -44,33 +57,33 @@ class ClientesController:
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
         
         try:
-            self.cursor.execute(sql, (
-                cliente_data['nome'],
-                cliente_data['cpf_cnpj'],
-                cliente_data.get('telefone'),
-                cliente_data.get('email'),
-                cliente_data.get('cep'),
-                cliente_data.get('cidade'),
-                cliente_data.get('estado'),
-                cliente_data.get('bairro'),
-                cliente_data.get('endereco'),
-                cliente_data.get('numero'),
-                cliente_data.get('complemento'),
-                cliente_data.get('data_cadastro')
-            ))
-            self.conn.commit()
+            with transacao(self.db_name) as conn:
+                cursor = conn.execute(sql, (
+                    cliente_data['nome'],
+                    cliente_data['cpf_cnpj'],
+                    cliente_data.get('telefone'),
+                    cliente_data.get('email'),
+                    cliente_data.get('cep'),
+                    cliente_data.get('cidade'),
+                    cliente_data.get('estado'),
+                    cliente_data.get('bairro'),
+                    cliente_data.get('endereco'),
+                    cliente_data.get('numero'),
+                    cliente_data.get('complemento'),
+                    cliente_data.get('data_cadastro')
+                ))
+            cliente_id = cursor.lastrowid
             print(f"Cliente {cliente_data['nome']} cadastrado com sucesso!")
-            return self.cursor.lastrowid
+            publicar(self.db_name, 'clientes', (cliente_id,), INSERCAO)
+            return cliente_id
         except sqlite3.IntegrityError as e:
             if "UNIQUE constraint failed" in str(e):
                 print(f"Erro: CPF/CNPJ {cliente_data['cpf_cnpj']} já cadastrado!")
             else:
                 print(f"Erro de integridade ao cadastrar cliente: {e}")
-            self.conn.rollback()
             return None
         except Exception as e:
             print(f"Erro inesperado ao cadastrar cliente: {e}")
-            self.conn.rollback()
             return None
         
     def listar_clientes(self):
@@ -84,12 +97,99 @@ class ClientesController:
         try:
             self.cursor.execute(sql)
             clientes = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in clientes]
+            return ler_linhas(self.cursor, clientes)
         except Exception as e:
             print(f"Erro ao listar clientes: {e}")
             self.conn.rollback()
             return []
         
+    def listar_clientes_paginado(self, apos=None, limite=TAMANHO_PAGINA, ordenar_por='id', decrescente=False):
+        """
+        Lista uma página de clientes usando paginação por keyset
+
+        Args:
+            apos (tuple, opcional): Cursor 'proximo' devolvido pela página anterior
+            limite (int): Quantidade de registros por página
+            ordenar_por (str): Uma de 'id', 'nome', 'cpf_cnpj'
+            decrescente (bool): Ordena do maior para o menor
+
+        Returns:
+            dict: {'itens': lista de dicionários, 'proximo': cursor da próxima página ou None}
+        """
+        sql = """SELECT * FROM clientes"""
+        try:
+            return listar_pagina(self.cursor, sql, self.COLUNAS_ORDENACAO, ordenar_por,
+                                 apos, limite, decrescente)
+        except sqlite3.Error as e:
+            print(f"Erro ao listar clientes: {e}")
+            return {'itens': [], 'proximo': None}
+
+    def buscar_cliente_por_id(self, cliente_id):
+        """
+        Busca um cliente pelo ID, com as mesmas colunas da listagem
+
+        Args:
+            cliente_id (int): ID do cliente
+
+        Returns:
+            dict: Dados do cliente ou None se não encontrado
+        """
+        sql = """SELECT * FROM clientes WHERE id = ?"""
+        try:
+            self.cursor.execute(sql, (cliente_id,))
+            row = self.cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in self.cursor.description], row))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar cliente: {e}")
+            return None
+
+    def buscar_por_ids(self, ids):
+        """
+        Busca vários clientes pelo ID numa única consulta (ex.: os ids de uma Alteracao)
+
+        Usa uma conexão emprestada do pool: roda na thread que entrega a
+        Alteracao, enquanto a interface pode estar usando o cursor do controller
+
+        Args:
+            ids (iterable): IDs dos clientes
+
+        Returns:
+            list: Dicionários com as mesmas colunas da listagem; ids inexistentes são ignorados
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        marcadores = ", ".join("?" * len(ids))
+        sql = f"SELECT * FROM clientes WHERE id IN ({marcadores})"
+        try:
+            with obter_pool(self.db_name).emprestar() as conn:
+                return ler_linhas(conn.execute(sql, ids))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar clientes: {e}")
+            return []
+
+    def buscar(self, texto, limite=LIMITE_BUSCA):
+        """
+        Busca clientes por ID, por prefixo de palavra e por trecho (nome, CPF/CNPJ e telefone)
+
+        Args:
+            texto (str): Texto digitado no campo de pesquisa
+            limite (int): Quantidade máxima de resultados
+
+        Returns:
+            dict: {"itens": clientes encontrados, do mais ao menos relevante,
+                   "truncado": True se havia mais que `limite`}
+        """
+        sql = """SELECT c.*
+                 FROM clientes c"""
+        try:
+            return buscar_fts(self.db_name, sql, "clientes", texto, limite, chave="c.id")
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar clientes: {e}")
+            return {"itens": [], "truncado": False}
+
     def atualizar_cliente(self, cliente_id, cliente_data):
         """
         Atualiza os dados de um cliente existente
@@ -116,33 +216,32 @@ class ClientesController:
                 WHERE id = ?"""
         
         try:
-            self.cursor.execute(sql, (
-                cliente_data['nome'],
-                cliente_data['cpf_cnpj'],
-                cliente_data.get('telefone'),
-                cliente_data.get('email'),
-                cliente_data.get('cep'),
-                cliente_data.get('cidade'),
-                cliente_data.get('estado'),
-                cliente_data.get('bairro'),
-                cliente_data.get('endereco'),
-                cliente_data.get('numero'),
-                cliente_data.get('complemento'),
-                cliente_id
-            ))
-            self.conn.commit()
+            with transacao(self.db_name) as conn:
+                conn.execute(sql, (
+                    cliente_data['nome'],
+                    cliente_data['cpf_cnpj'],
+                    cliente_data.get('telefone'),
+                    cliente_data.get('email'),
+                    cliente_data.get('cep'),
+                    cliente_data.get('cidade'),
+                    cliente_data.get('estado'),
+                    cliente_data.get('bairro'),
+                    cliente_data.get('endereco'),
+                    cliente_data.get('numero'),
+                    cliente_data.get('complemento'),
+                    cliente_id
+                ))
             print(f"Cliente ID {cliente_id} atualizado com sucesso!")
+            publicar(self.db_name, 'clientes', (cliente_id,), ATUALIZACAO)
             return True
         except sqlite3.IntegrityError as e:
             if "UNIQUE constraint failed" in str(e):
                 print(f"Erro: CPF/CNPJ {cliente_data['cpf_cnpj']} já cadastrado!")
             else:
                 print(f"Erro de integridade ao atualizar cliente: {e}")
-            self.conn.rollback()
             return False
         except Exception as e:
             print(f"Erro inesperado ao atualizar cliente: {e}")
-            self.conn.rollback()
             return False
     
     def excluir_cliente(self, cliente_id):
@@ -158,17 +257,17 @@ class ClientesController:
         sql = "DELETE FROM clientes WHERE id = ?"
         
         try:
-            self.cursor.execute(sql, (cliente_id,))
-            self.conn.commit()
-            if self.cursor.rowcount > 0:
+            with transacao(self.db_name) as conn:
+                cursor = conn.execute(sql, (cliente_id,))
+            if cursor.rowcount > 0:
                 print(f"Cliente ID {cliente_id} excluído com sucesso!")
+                publicar(self.db_name, 'clientes', (cliente_id,), EXCLUSAO)
                 return True
             else:
                 print(f"Nenhum cliente encontrado com ID {cliente_id}.")
                 return False
         except Exception as e:
             print(f"Erro ao excluir cliente: {e}")
-            self.conn.rollback()
             return False
     
 
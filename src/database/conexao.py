@@ -0,0 +1,226 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Quantidade máxima de conexões abertas por banco de tenant (inclui a principal)
+TAMANHO_POOL = 4
+
+# Tempo máximo (em segundos) que um empréstimo espera por uma conexão livre
+TEMPO_ESPERA = 10
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class PoolConexoes:
+    """
+    Pool limitado de conexões SQLite de um único banco de tenant.
+
+    A conexão principal é compartilhada pelas leituras dos controllers na
+    thread da interface; as demais são emprestadas, uma por operação, para
+    as gravações (ver `transacao`) e para consultas em outras threads
+    (buscas, exportações), e devolvidas ao final.
+    """
+
+    def __init__(self, db_name: str, tamanho: int = TAMANHO_POOL):
+        self.db_name = db_name
+        self.tamanho = max(tamanho, 1)
+        self._livres = queue.LifoQueue()
+        self._abertas = []
+        self._principal = None
+        self._secundarias = 0
+        self._lock = threading.Lock()
+        self.fechado = False
+
+    def _abrir(self):
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        self._abertas.append(conn)
+        return conn
+
+    def principal(self):
+        """
+        Retorna a conexão principal do tenant, abrindo-a na primeira chamada.
+
+        Returns:
+            sqlite3.Connection: Conexão compartilhada pelos controllers
+        """
+        with self._lock:
+            if self.fechado:
+                raise sqlite3.ProgrammingError(f"Pool do banco '{self.db_name}' já foi fechado.")
+            if self._principal is None:
+                self._principal = self._abrir()
+            return self._principal
+
+    @contextmanager
+    def emprestar(self):
+        """
+        Empresta uma conexão secundária do pool, bloqueando até que uma
+        fique livre caso o limite de conexões já tenha sido atingido.
+
+        Yields:
+            sqlite3.Connection: Conexão exclusiva durante o bloco `with`
+        """
+        conn = None
+        with self._lock:
+            if self.fechado:
+                raise sqlite3.ProgrammingError(f"Pool do banco '{self.db_name}' já foi fechado.")
+            try:
+                conn = self._livres.get_nowait()
+            except queue.Empty:
+                # A conexão principal ocupa uma das vagas do limite
+                if self._secundarias < max(self.tamanho - 1, 1):
+                    conn = self._abrir()
+                    self._secundarias += 1
+        if conn is None:
+            try:
+                conn = self._livres.get(timeout=TEMPO_ESPERA)
+            except queue.Empty:
+                raise sqlite3.OperationalError(
+                    f"Nenhuma conexão livre para '{self.db_name}' após {TEMPO_ESPERA}s."
+                )
+        try:
+            yield conn
+        finally:
+            self._devolver(conn)
+
+    def _devolver(self, conn):
+        # fechar() não mexe nas conexões emprestadas: a de quem devolve
+        # continua aberta, e é fechada aqui se o pool já tiver sido fechado
+        descartar = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            print(f"Erro ao desfazer transação em '{self.db_name}': {e}")
+            descartar = True
+        with self._lock:
+            if not self.fechado and not descartar:
+                self._livres.put(conn)
+                return
+            self._abertas.remove(conn)
+            if not self.fechado:
+                self._secundarias -= 1
+        self._fechar_conexao(conn)
+
+    def _fechar_conexao(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Erro ao fechar conexão de '{self.db_name}': {e}")
+
+    def fechar(self):
+        """
+        Fecha a conexão principal e as secundárias livres. As que estão
+        emprestadas (ex.: uma exportação em andamento) terminam o trabalho e
+        são fechadas por quem as pegou, ao devolvê-las.
+        """
+        with self._lock:
+            self.fechado = True
+            ociosas = [] if self._principal is None else [self._principal]
+            while True:
+                try:
+                    ociosas.append(self._livres.get_nowait())
+                except queue.Empty:
+                    break
+            for conn in ociosas:
+                self._abertas.remove(conn)
+            self._principal = None
+        for conn in ociosas:
+            self._fechar_conexao(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _chave(db_name: str) -> str:
+    return os.path.abspath(db_name)
+
+
+def obter_pool(db_name: str) -> PoolConexoes:
+    """
+    Retorna o pool do banco de tenant informado, criando-o se necessário.
+
+    Args:
+        db_name (str): Caminho do arquivo user_*.db
+
+    Returns:
+        PoolConexoes: Pool registrado para o banco
+    """
+    if not db_name:
+        raise ValueError("Nenhum banco de dados informado.")
+    chave = _chave(db_name)
+    with _pools_lock:
+        pool = _pools.get(chave)
+        if pool is None:
+            pool = PoolConexoes(db_name)
+            _pools[chave] = pool
+        return pool
+
+
+def obter_conexao(db_name: str) -> sqlite3.Connection:
+    """Atalho para a conexão principal do tenant, usada nas leituras dos controllers."""
+    return obter_pool(db_name).principal()
+
+
+@contextmanager
+def transacao(db_name: str):
+    """
+    Empresta uma conexão do pool com uma transação de escrita aberta.
+
+    A conexão é exclusiva do bloco, então o BEGIN, o commit e o rollback não
+    se misturam com o que outros controllers, threads ou sessões fazem na
+    conexão principal. Ao sair do bloco a transação é confirmada; se houver
+    exceção, desfeita e a exceção repassada.
+
+    Yields:
+        sqlite3.Connection: Conexão com a transação (BEGIN IMMEDIATE) aberta
+    """
+    with obter_pool(db_name).emprestar() as conn:
+        # IMMEDIATE reserva a escrita já no início, em vez de falhar no meio
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def fechar_pool(db_name: str):
+    """
+    Fecha e remove do registro o pool do banco informado.
+
+    O pool é compartilhado por todas as sessões do tenant, então só deve ser
+    fechado quando nenhuma delas o usa mais (ex.: ao fim de um benchmark);
+    no aplicativo os pools são fechados na saída, por `fechar_todos`.
+    """
+    if not db_name:
+        return
+    with _pools_lock:
+        pool = _pools.pop(_chave(db_name), None)
+    if pool is not None:
+        pool.fechar()
+        print(f"Conexões do banco '{db_name}' fechadas.")
+
+
+def fechar_todos():
+    """Fecha todos os pools registrados (ex.: ao encerrar o aplicativo)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.fechar()
+
+
+atexit.register(fechar_todos)
@@ -1,8 +1,22 @@
 import sqlite3
+from database.conexao import obter_conexao, obter_pool, transacao
+from database.linhas import ler_linhas
+from database.busca import padrao_like
+from database.eventos import publicar, INSERCAO, ATUALIZACAO, EXCLUSAO
+from database.referencias import referencias
+from database.paginacao import listar_pagina, TAMANHO_PAGINA
 
 class EstoqueController:
+    # Colunas aceitas na ordenação da listagem paginada (todas indexadas)
+    COLUNAS_ORDENACAO = {
+        'id': 'me.id',
+        # Sem data entra como '' (usa idx_movimentacao_data_ordem), como em VendasController
+        'data_movimentacao': "COALESCE(me.data_movimentacao, '')",
+    }
+
     def __init__(self, db_name: str):
-        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.db_name = db_name
+        self.conn = obter_conexao(db_name)
         self.cursor = self.conn.cursor()
 
     def listar_movimentacoes(self):
@@ -29,11 +43,188 @@ class EstoqueController:
         try:
             self.cursor.execute(sql)
             movimentacoes = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in movimentacoes]
+            return ler_linhas(self.cursor, movimentacoes)
         except sqlite3.Error as e:
             print(f"Erro ao listar movimentações: {e}")
             return []
 
+    def listar_movimentacoes_paginado(self, apos=None, limite=TAMANHO_PAGINA, ordenar_por='data_movimentacao', decrescente=True):
+        """
+        Lista uma página de movimentações usando paginação por keyset
+
+        Args:
+            apos (tuple, opcional): Cursor 'proximo' devolvido pela página anterior
+            limite (int): Quantidade de registros por página
+            ordenar_por (str): Uma de 'id', 'data_movimentacao'
+            decrescente (bool): Ordena do maior para o menor
+
+        Returns:
+            dict: {'itens': lista de dicionários, 'proximo': cursor da próxima página ou None}
+        """
+        sql = """SELECT
+                    me.*,
+                    p.nome as produto_nome,
+                    f.nome as funcionario_nome,
+                    CASE 
+                        WHEN me.referencia_tipo = 'VENDA' THEN 'Venda #' || me.referencia_id
+                        WHEN me.referencia_tipo = 'COMPRA' THEN 'Compra #' || me.referencia_id
+                        ELSE me.referencia_tipo || ' #' || COALESCE(me.referencia_id, '')
+                    END as referencia_descricao
+                FROM movimentacao_estoque me
+                LEFT JOIN produtos p ON me.produto_id = p.id
+                LEFT JOIN funcionarios f ON me.funcionario_id = f.id"""
+        try:
+            return listar_pagina(self.cursor, sql, self.COLUNAS_ORDENACAO, ordenar_por,
+                                 apos, limite, decrescente)
+        except sqlite3.Error as e:
+            print(f"Erro ao listar movimentações: {e}")
+            return {'itens': [], 'proximo': None}
+
+    def pesquisar_movimentacoes_paginado(self, termo, apos=None, limite=TAMANHO_PAGINA):
+        """
+        Pesquisa movimentações no banco pelo ID, pelo produto (ID ou nome) ou
+        pelo tipo, da mais recente para a mais antiga, paginando por keyset.
+        Roda numa conexão emprestada do pool (pode ser chamada por BuscaAdiada).
+
+        Args:
+            termo (str): Texto digitado no campo de pesquisa
+            apos (tuple, opcional): Cursor 'proximo' devolvido pela página anterior
+            limite (int): Quantidade de registros por página
+
+        Returns:
+            dict: {'itens': lista de dicionários, 'proximo': cursor da próxima página ou None}
+        """
+        sql = """SELECT
+                    me.*,
+                    p.nome as produto_nome,
+                    f.nome as funcionario_nome,
+                    CASE 
+                        WHEN me.referencia_tipo = 'VENDA' THEN 'Venda #' || me.referencia_id
+                        WHEN me.referencia_tipo = 'COMPRA' THEN 'Compra #' || me.referencia_id
+                        ELSE me.referencia_tipo || ' #' || COALESCE(me.referencia_id, '')
+                    END as referencia_descricao
+                FROM movimentacao_estoque me
+                LEFT JOIN produtos p ON me.produto_id = p.id
+                LEFT JOIN funcionarios f ON me.funcionario_id = f.id"""
+        campos = ("CAST(me.id AS TEXT)", "CAST(me.produto_id AS TEXT)", "p.nome", "me.tipo_movimentacao")
+        condicao = " OR ".join(f"{campo} LIKE ? ESCAPE '\\'" for campo in campos)
+        filtro = (condicao, [padrao_like(termo.strip())] * len(campos))
+        try:
+            with obter_pool(self.db_name).emprestar() as conn:
+                return listar_pagina(conn.cursor(), sql, self.COLUNAS_ORDENACAO, 'data_movimentacao',
+                                     apos, limite, True, filtro=filtro)
+        except sqlite3.Error as e:
+            print(f"Erro ao pesquisar movimentações: {e}")
+            return {'itens': [], 'proximo': None}
+
+    def cadastrar_movimentacao(self, dados: dict):
+        """
+        Registra uma nova movimentação de estoque.
+
+        Args:
+            dados: Dicionário com os mesmos campos de atualizar_movimentacao
+
+        Returns:
+            int: ID da movimentação cadastrada ou None em caso de erro
+        """
+        sql = """INSERT INTO movimentacao_estoque (
+                     produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual,
+                     motivo, referencia_id, referencia_tipo, funcionario_id, observacoes
+                 ) VALUES (
+                     :produto_id, :tipo_movimentacao, :quantidade, :estoque_anterior, :estoque_atual,
+                     :motivo, :referencia_id, :referencia_tipo, :funcionario_id, :observacoes
+                 )"""
+        try:
+            with transacao(self.db_name) as conn:
+                cursor = conn.execute(sql, {
+                    'produto_id': dados['produto_id'],
+                    'tipo_movimentacao': dados['tipo_movimentacao'],
+                    'quantidade': dados['quantidade'],
+                    'estoque_anterior': dados['estoque_anterior'],
+                    'estoque_atual': dados['estoque_atual'],
+                    'motivo': dados.get('motivo'),
+                    'referencia_id': dados.get('referencia_id'),
+                    'referencia_tipo': dados.get('referencia_tipo'),
+                    'funcionario_id': dados.get('funcionario_id'),
+                    'observacoes': dados.get('observacoes')
+                })
+            movimentacao_id = cursor.lastrowid
+            publicar(self.db_name, 'movimentacao_estoque', (movimentacao_id,), INSERCAO)
+            return movimentacao_id
+        except sqlite3.Error as e:
+            print(f"Erro ao cadastrar movimentação: {e}")
+            return None
+
+    def buscar_movimentacao_por_id(self, movimentacao_id):
+        """
+        Busca uma movimentação pelo ID, com as mesmas colunas da listagem
+
+        Args:
+            movimentacao_id (int): ID da movimentação
+
+        Returns:
+            dict: Dados da movimentação ou None se não encontrada
+        """
+        sql = """SELECT
+                    me.*,
+                    p.nome as produto_nome,
+                    f.nome as funcionario_nome,
+                    CASE 
+                        WHEN me.referencia_tipo = 'VENDA' THEN 'Venda #' || me.referencia_id
+                        WHEN me.referencia_tipo = 'COMPRA' THEN 'Compra #' || me.referencia_id
+                        ELSE me.referencia_tipo || ' #' || COALESCE(me.referencia_id, '')
+                    END as referencia_descricao
+                FROM movimentacao_estoque me
+                LEFT JOIN produtos p ON me.produto_id = p.id
+                LEFT JOIN funcionarios f ON me.funcionario_id = f.id
+                WHERE me.id = ?"""
+        try:
+            self.cursor.execute(sql, (movimentacao_id,))
+            row = self.cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in self.cursor.description], row))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar movimentação: {e}")
+            return None
+
+    def buscar_por_ids(self, ids):
+        """
+        Busca várias movimentações pelo ID numa única consulta (ex.: os ids de uma Alteracao)
+
+        Usa uma conexão emprestada do pool: roda na thread que entrega a
+        Alteracao, enquanto a interface pode estar usando o cursor do controller
+
+        Args:
+            ids (iterable): IDs das movimentações
+
+        Returns:
+            list: Dicionários com as mesmas colunas da listagem; ids inexistentes são ignorados
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        marcadores = ", ".join("?" * len(ids))
+        sql = f"""SELECT
+                    me.*,
+                    p.nome as produto_nome,
+                    f.nome as funcionario_nome,
+                    CASE 
+                        WHEN me.referencia_tipo = 'VENDA' THEN 'Venda #' || me.referencia_id
+                        WHEN me.referencia_tipo = 'COMPRA' THEN 'Compra #' || me.referencia_id
+                        ELSE me.referencia_tipo || ' #' || COALESCE(me.referencia_id, '')
+                    END as referencia_descricao
+                FROM movimentacao_estoque me
+                LEFT JOIN produtos p ON me.produto_id = p.id
+                LEFT JOIN funcionarios f ON me.funcionario_id = f.id
+                WHERE me.id IN ({marcadores})"""
+        try:
+            with obter_pool(self.db_name).emprestar() as conn:
+                return ler_linhas(conn.execute(sql, ids))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar movimentações: {e}")
+            return []
+
     def atualizar_movimentacao(self, movimentacao_id: int, dados: dict) -> bool:
         """
         Atualiza uma movimentação de estoque existente.
@@ -68,25 +259,49 @@ class EstoqueController:
                      observacoes = :observacoes
                  WHERE id = :id"""
         try:
-            self.cursor.execute(sql, {
-                'id': movimentacao_id,
-                'produto_id': dados['produto_id'],
-                'tipo_movimentacao': dados['tipo_movimentacao'],
-                'quantidade': dados['quantidade'],
-                'estoque_anterior': dados['estoque_anterior'],
-                'estoque_atual': dados['estoque_atual'],
-                'motivo': dados.get('motivo'),
-                'referencia_id': dados.get('referencia_id'),
-                'referencia_tipo': dados.get('referencia_tipo'),
-                'funcionario_id': dados.get('funcionario_id'),
-                'observacoes': dados.get('observacoes')
-            })
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            with transacao(self.db_name) as conn:
+                cursor = conn.execute(sql, {
+                    'id': movimentacao_id,
+                    'produto_id': dados['produto_id'],
+                    'tipo_movimentacao': dados['tipo_movimentacao'],
+                    'quantidade': dados['quantidade'],
+                    'estoque_anterior': dados['estoque_anterior'],
+                    'estoque_atual': dados['estoque_atual'],
+                    'motivo': dados.get('motivo'),
+                    'referencia_id': dados.get('referencia_id'),
+                    'referencia_tipo': dados.get('referencia_tipo'),
+                    'funcionario_id': dados.get('funcionario_id'),
+                    'observacoes': dados.get('observacoes')
+                })
+            if cursor.rowcount == 0:
+                return False
+            publicar(self.db_name, 'movimentacao_estoque', (movimentacao_id,), ATUALIZACAO)
+            return True
         except sqlite3.Error as e:
             print(f"Erro ao atualizar movimentação: {e}")
             return False
 
+    def excluir_movimentacao(self, movimentacao_id: int) -> bool:
+        """
+        Exclui uma movimentação de estoque.
+
+        Args:
+            movimentacao_id: ID da movimentação a ser excluída
+
+        Returns:
+            bool: True se a exclusão foi bem-sucedida, False caso contrário
+        """
+        try:
+            with transacao(self.db_name) as conn:
+                cursor = conn.execute("DELETE FROM movimentacao_estoque WHERE id = ?", (movimentacao_id,))
+            if cursor.rowcount == 0:
+                return False
+            publicar(self.db_name, 'movimentacao_estoque', (movimentacao_id,), EXCLUSAO)
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao excluir movimentação: {e}")
+            return False
+
     def listar_id_e_produtos(self):
         """
         Lista os IDs e nomes dos produtos cadastrados no banco de dados.
@@ -94,11 +309,9 @@ class EstoqueController:
         Returns:
             list: Lista de dicionários com os IDs e nomes dos produtos.
         """
-        sql = "SELECT id, nome FROM produtos ORDER BY nome"
         try:
-            self.cursor.execute(sql)
-            produtos = self.cursor.fetchall()
-            return [{'id': row[0], 'nome': row[1]} for row in produtos]
+            return referencias.obter(self.db_name, 'produtos_id_nome', ('produtos',),
+                                     lambda: self._ler_id_e_nome('produtos'))
         except sqlite3.Error as e:
             print(f"Erro ao listar produtos: {e}")
             return []
@@ -110,11 +323,14 @@ class EstoqueController:
         Returns:
             list: Lista de dicionários com os IDs e nomes dos funcionários.
         """
-        sql = "SELECT id, nome FROM funcionarios ORDER BY nome"
         try:
-            self.cursor.execute(sql)
-            funcionarios = self.cursor.fetchall()
-            return [{'id': row[0], 'nome': row[1]} for row in funcionarios]
+            return referencias.obter(self.db_name, 'funcionarios_id_nome', ('funcionarios',),
+                                     lambda: self._ler_id_e_nome('funcionarios'))
         except sqlite3.Error as e:
             print(f"Erro ao listar funcionários: {e}")
             return []
+
+    def _ler_id_e_nome(self, tabela):
+        # Listas de referência do formulário (ver listar_id_e_produtos/funcionarios)
+        self.cursor.execute(f"SELECT id, nome FROM {tabela} ORDER BY nome")
+        return ler_linhas(self.cursor)
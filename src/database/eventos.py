@@ -0,0 +1,120 @@
+import threading
+import types
+import weakref
+
+# Operações informadas em Alteracao.operacao
+INSERCAO = "insercao"
+ATUALIZACAO = "atualizacao"
+EXCLUSAO = "exclusao"
+
+
+class Alteracao:
+    """
+    Alteração já gravada (depois do commit) numa tabela de um banco de tenant.
+
+    `ids` são as chaves das linhas afetadas; para `itens_venda` são os ids
+    das vendas cujos itens mudaram. Uma tupla vazia indica que as linhas
+    não são conhecidas (ex.: movimentações geradas por gatilhos), e quem
+    assina deve recarregar o que depende da tabela.
+    """
+
+    __slots__ = ("banco", "tabela", "ids", "operacao")
+
+    def __init__(self, banco, tabela, ids, operacao):
+        self.banco = banco
+        self.tabela = tabela
+        self.ids = tuple(ids)
+        self.operacao = operacao
+
+    def __repr__(self):
+        return f"Alteracao({self.tabela!r}, {self.operacao!r}, ids={self.ids!r})"
+
+
+class Assinatura:
+    """Inscrição de um callback no barramento; `cancelar()` encerra a entrega."""
+
+    __slots__ = ("_barramento", "_callback", "_fraco", "tabelas", "banco", "__weakref__")
+
+    def __init__(self, barramento, callback, tabelas, banco):
+        self._barramento = barramento
+        # Métodos ficam com referência fraca: o objeto dono pode ser coletado
+        # (ex.: o cache de uma sessão encerrada) sem cancelar a assinatura
+        self._fraco = isinstance(callback, types.MethodType)
+        self._callback = weakref.WeakMethod(callback) if self._fraco else callback
+        self.tabelas = frozenset(tabelas) if tabelas is not None else None
+        self.banco = banco
+
+    def cancelar(self):
+        self._barramento._remover(self)
+
+    def _aceita(self, alteracao):
+        return ((self.banco is None or self.banco == alteracao.banco)
+                and (self.tabelas is None or alteracao.tabela in self.tabelas))
+
+    def _obter_callback(self):
+        return self._callback() if self._fraco else self._callback
+
+
+class Barramento:
+    """
+    Publicação e assinatura de alterações dentro do processo.
+
+    Os controllers publicam depois de cada commit; views e caches assinam as
+    tabelas (e o banco) que exibem e atualizam só o que mudou. Os callbacks
+    rodam na thread de quem publicou, na ordem em que foram assinados; um
+    erro num deles não impede a entrega aos demais nem desfaz a gravação.
+    """
+
+    def __init__(self):
+        self._assinaturas = []
+        self._lock = threading.Lock()
+
+    def assinar(self, callback, tabelas=None, banco=None) -> Assinatura:
+        """
+        Passa a entregar ao callback as alterações publicadas.
+
+        Args:
+            callback (callable): Recebe uma Alteracao
+            tabelas (iterable, opcional): Só alterações nessas tabelas; padrão: todas
+            banco (str, opcional): Só alterações nesse banco de tenant; padrão: todos
+
+        Returns:
+            Assinatura: Use `cancelar()` para deixar de receber
+        """
+        assinatura = Assinatura(self, callback, tabelas, banco)
+        with self._lock:
+            self._assinaturas = self._assinaturas + [assinatura]
+        return assinatura
+
+    def _remover(self, assinatura):
+        with self._lock:
+            self._assinaturas = [a for a in self._assinaturas if a is not assinatura]
+
+    def publicar(self, banco, tabela, ids, operacao):
+        """Entrega a alteração aos assinantes interessados."""
+        alteracao = Alteracao(banco, tabela, ids, operacao)
+        # A lista é trocada, nunca alterada, então pode ser percorrida sem o lock
+        for assinatura in self._assinaturas:
+            if not assinatura._aceita(alteracao):
+                continue
+            callback = assinatura._obter_callback()
+            if callback is None:
+                self._remover(assinatura)
+                continue
+            try:
+                callback(alteracao)
+            except Exception as e:
+                print(f"Erro ao entregar {alteracao}: {e}")
+
+
+barramento = Barramento()
+
+
+def assinar(callback, tabelas=None, banco=None) -> Assinatura:
+    """Assina alterações no barramento do processo (ver Barramento.assinar)."""
+    return barramento.assinar(callback, tabelas, banco)
+
+
+def publicar(banco, tabela, ids, operacao):
+    """Publica uma alteração no barramento do processo."""
+    barramento.publicar(banco, tabela, ids, operacao)
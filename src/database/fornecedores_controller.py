@@ -1,8 +1,21 @@
 import sqlite3
+from database.conexao import obter_conexao, obter_pool, transacao
+from database.linhas import ler_linhas
+from database.eventos import publicar, INSERCAO, ATUALIZACAO, EXCLUSAO
+from database.paginacao import listar_pagina, TAMANHO_PAGINA
+from database.busca import buscar_fts, LIMITE_BUSCA
 
 class FornecedoresController:
+    # Colunas aceitas na ordenação da listagem paginada (todas indexadas)
+    COLUNAS_ORDENACAO = {
+        'id': 'id',
+        'nome_fantasia': 'nome_fantasia',
+        'cnpj': 'cnpj',
+    }
+
     def __init__(self, db_name: str):
-        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.db_name = db_name
+        self.conn = obter_conexao(db_name)
         self.cursor = self.conn.cursor()
 
     def cadastrar_fornecedor(self, fornecedor_data):
@@ -33,16 +46,18 @@ class FornecedoresController:
             ) VALUES (?, ?, ?, ?, ?, ?)"""
         
         try:
-            self.cursor.execute(sql, (
-                fornecedor_data['nome_fantasia'],
-                fornecedor_data['razao_social'],
-                fornecedor_data['cnpj'],
-                fornecedor_data.get('telefone'),
-                fornecedor_data.get('email'),
-                fornecedor_data.get('observacoes')
-            ))
-            self.conn.commit()
-            return self.cursor.lastrowid
+            with transacao(self.db_name) as conn:
+                cursor = conn.execute(sql, (
+                    fornecedor_data['nome_fantasia'],
+                    fornecedor_data['razao_social'],
+                    fornecedor_data['cnpj'],
+                    fornecedor_data.get('telefone'),
+                    fornecedor_data.get('email'),
+                    fornecedor_data.get('observacoes')
+                ))
+            fornecedor_id = cursor.lastrowid
+            publicar(self.db_name, 'fornecedores', (fornecedor_id,), INSERCAO)
+            return fornecedor_id
         except sqlite3.Error as e:
             print(f"Erro ao cadastrar fornecedor: {e}")
             return None
@@ -58,12 +73,99 @@ class FornecedoresController:
         try:
             self.cursor.execute(sql)
             fornedores = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in fornedores]
+            return ler_linhas(self.cursor, fornedores)
         except sqlite3.Error as e:
             print(f"Erro ao listar fornecedores: {e}")
             self.conn.rollback()
             return []
         
+    def listar_fornecedores_paginado(self, apos=None, limite=TAMANHO_PAGINA, ordenar_por='id', decrescente=False):
+        """
+        Lista uma página de fornecedores usando paginação por keyset
+
+        Args:
+            apos (tuple, opcional): Cursor 'proximo' devolvido pela página anterior
+            limite (int): Quantidade de registros por página
+            ordenar_por (str): Uma de 'id', 'nome_fantasia', 'cnpj'
+            decrescente (bool): Ordena do maior para o menor
+
+        Returns:
+            dict: {'itens': lista de dicionários, 'proximo': cursor da próxima página ou None}
+        """
+        sql = """SELECT * FROM fornecedores"""
+        try:
+            return listar_pagina(self.cursor, sql, self.COLUNAS_ORDENACAO, ordenar_por,
+                                 apos, limite, decrescente)
+        except sqlite3.Error as e:
+            print(f"Erro ao listar fornecedores: {e}")
+            return {'itens': [], 'proximo': None}
+
+    def buscar_fornecedor_por_id(self, fornecedor_id):
+        """
+        Busca um fornecedor pelo ID, com as mesmas colunas da listagem
+
+        Args:
+            fornecedor_id (int): ID do fornecedor
+
+        Returns:
+            dict: Dados do fornecedor ou None se não encontrado
+        """
+        sql = """SELECT * FROM fornecedores WHERE id = ?"""
+        try:
+            self.cursor.execute(sql, (fornecedor_id,))
+            row = self.cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in self.cursor.description], row))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar fornecedor: {e}")
+            return None
+
+    def buscar_por_ids(self, ids):
+        """
+        Busca vários fornecedores pelo ID numa única consulta (ex.: os ids de uma Alteracao)
+
+        Usa uma conexão emprestada do pool: roda na thread que entrega a
+        Alteracao, enquanto a interface pode estar usando o cursor do controller
+
+        Args:
+            ids (iterable): IDs dos fornecedores
+
+        Returns:
+            list: Dicionários com as mesmas colunas da listagem; ids inexistentes são ignorados
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        marcadores = ", ".join("?" * len(ids))
+        sql = f"SELECT * FROM fornecedores WHERE id IN ({marcadores})"
+        try:
+            with obter_pool(self.db_name).emprestar() as conn:
+                return ler_linhas(conn.execute(sql, ids))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar fornecedores: {e}")
+            return []
+
+    def buscar(self, texto, limite=LIMITE_BUSCA):
+        """
+        Busca fornecedores por ID, por prefixo de palavra e por trecho (nome fantasia, razão social, CNPJ e telefone)
+
+        Args:
+            texto (str): Texto digitado no campo de pesquisa
+            limite (int): Quantidade máxima de resultados
+
+        Returns:
+            dict: {"itens": fornecedores encontrados, do mais ao menos relevante,
+                   "truncado": True se havia mais que `limite`}
+        """
+        sql = """SELECT f.*
+                 FROM fornecedores f"""
+        try:
+            return buscar_fts(self.db_name, sql, "fornecedores", texto, limite, chave="f.id")
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar fornecedores: {e}")
+            return {"itens": [], "truncado": False}
+
     def atualizar_fornecedor(self, fornecedor_id, fornecedor_data):
         """
         Atualiza os dados de um fornecedor existente
@@ -85,20 +187,20 @@ class FornecedoresController:
             WHERE id = ?"""
         
         try:
-            self.cursor.execute(sql, (
-                fornecedor_data['nome_fantasia'],
-                fornecedor_data['razao_social'],
-                fornecedor_data['cnpj'],
-                fornecedor_data.get('telefone'),
-                fornecedor_data.get('email'),
-                fornecedor_data.get('observacoes'),
-                fornecedor_id
-            ))
-            self.conn.commit()
+            with transacao(self.db_name) as conn:
+                conn.execute(sql, (
+                    fornecedor_data['nome_fantasia'],
+                    fornecedor_data['razao_social'],
+                    fornecedor_data['cnpj'],
+                    fornecedor_data.get('telefone'),
+                    fornecedor_data.get('email'),
+                    fornecedor_data.get('observacoes'),
+                    fornecedor_id
+                ))
+            publicar(self.db_name, 'fornecedores', (fornecedor_id,), ATUALIZACAO)
             return True
         except sqlite3.Error as e:
             print(f"Erro ao atualizar fornecedor: {e}")
-            self.conn.rollback()
             return False
         
     def excluir_fornecedor(self, fornecedor_id):
@@ -114,17 +216,17 @@ class FornecedoresController:
         sql = "DELETE FROM fornecedores WHERE id = ?"
         
         try:
-            self.cursor.execute(sql, (fornecedor_id,))
-            self.conn.commit()
-            if self.cursor.rowcount > 0:
+            with transacao(self.db_name) as conn:
+                cursor = conn.execute(sql, (fornecedor_id,))
+            if cursor.rowcount > 0:
                 print(f"Fornecedor ID {fornecedor_id} excluído com sucesso!")
+                publicar(self.db_name, 'fornecedores', (fornecedor_id,), EXCLUSAO)
                 return True
             else:
                 print(f"Nenhum fornecedor encontrado com ID {fornecedor_id}.")
                 return False
         except sqlite3.Error as e:
             print(f"Erro ao excluir fornecedor: {e}")
-            self.conn.rollback()
             return False
         
     
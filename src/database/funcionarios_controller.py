@@ -1,8 +1,20 @@
 import sqlite3
+from database.conexao import obter_conexao, obter_pool, transacao
+from database.linhas import ler_linhas
+from database.eventos import publicar, INSERCAO, ATUALIZACAO, EXCLUSAO
+from database.paginacao import listar_pagina, TAMANHO_PAGINA
+from database.busca import buscar_fts, LIMITE_BUSCA
 
 class FuncionariosController:
+    # Colunas aceitas na ordenação da listagem paginada (todas indexadas)
+    COLUNAS_ORDENACAO = {
+        'id': 'id',
+        'nome': 'nome',
+    }
+
     def __init__(self, db_name: str):
-        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.db_name = db_name
+        self.conn = obter_conexao(db_name)
         self.cursor = self.conn.cursor()
 
 
@@ -34,19 +46,20 @@ class FuncionariosController:
                 ) VALUES (?, ?, ?, ?, ?, ?)"""
         
         try:
-            self.cursor.execute(sql, (
-                funcionario_data['nome'],
-                funcionario_data['cargo'],
-                funcionario_data.get('telefone'),
-                funcionario_data.get('email'),
-                funcionario_data['data_admissao'],
-                funcionario_data.get('observacoes')
-            ))
-            self.conn.commit()
-            return self.cursor.lastrowid
+            with transacao(self.db_name) as conn:
+                cursor = conn.execute(sql, (
+                    funcionario_data['nome'],
+                    funcionario_data['cargo'],
+                    funcionario_data.get('telefone'),
+                    funcionario_data.get('email'),
+                    funcionario_data['data_admissao'],
+                    funcionario_data.get('observacoes')
+                ))
+            funcionario_id = cursor.lastrowid
+            publicar(self.db_name, 'funcionarios', (funcionario_id,), INSERCAO)
+            return funcionario_id
         except sqlite3.Error as e:
             print(f"Erro ao cadastrar funcionário: {e}")
-            self.conn.rollback()
             return None
     
     def listar_funcionarios(self):
@@ -60,11 +73,98 @@ class FuncionariosController:
         try:
             self.cursor.execute(sql)
             funcionarios = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in funcionarios]
+            return ler_linhas(self.cursor, funcionarios)
         except sqlite3.Error as e:
             print(f"Erro ao listar funcionários: {e}")
             return []
         
+    def listar_funcionarios_paginado(self, apos=None, limite=TAMANHO_PAGINA, ordenar_por='id', decrescente=False):
+        """
+        Lista uma página de funcionários usando paginação por keyset
+
+        Args:
+            apos (tuple, opcional): Cursor 'proximo' devolvido pela página anterior
+            limite (int): Quantidade de registros por página
+            ordenar_por (str): Uma de 'id', 'nome'
+            decrescente (bool): Ordena do maior para o menor
+
+        Returns:
+            dict: {'itens': lista de dicionários, 'proximo': cursor da próxima página ou None}
+        """
+        sql = """SELECT * FROM funcionarios"""
+        try:
+            return listar_pagina(self.cursor, sql, self.COLUNAS_ORDENACAO, ordenar_por,
+                                 apos, limite, decrescente)
+        except sqlite3.Error as e:
+            print(f"Erro ao listar funcionários: {e}")
+            return {'itens': [], 'proximo': None}
+
+    def buscar_funcionario_por_id(self, funcionario_id):
+        """
+        Busca um funcionário pelo ID, com as mesmas colunas da listagem
+
+        Args:
+            funcionario_id (int): ID do funcionário
+
+        Returns:
+            dict: Dados do funcionário ou None se não encontrado
+        """
+        sql = """SELECT * FROM funcionarios WHERE id = ?"""
+        try:
+            self.cursor.execute(sql, (funcionario_id,))
+            row = self.cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in self.cursor.description], row))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar funcionário: {e}")
+            return None
+
+    def buscar_por_ids(self, ids):
+        """
+        Busca vários funcionários pelo ID numa única consulta (ex.: os ids de uma Alteracao)
+
+        Usa uma conexão emprestada do pool: roda na thread que entrega a
+        Alteracao, enquanto a interface pode estar usando o cursor do controller
+
+        Args:
+            ids (iterable): IDs dos funcionários
+
+        Returns:
+            list: Dicionários com as mesmas colunas da listagem; ids inexistentes são ignorados
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        marcadores = ", ".join("?" * len(ids))
+        sql = f"SELECT * FROM funcionarios WHERE id IN ({marcadores})"
+        try:
+            with obter_pool(self.db_name).emprestar() as conn:
+                return ler_linhas(conn.execute(sql, ids))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar funcionários: {e}")
+            return []
+
+    def buscar(self, texto, limite=LIMITE_BUSCA):
+        """
+        Busca funcionários por ID, por prefixo de palavra e por trecho (nome e cargo)
+
+        Args:
+            texto (str): Texto digitado no campo de pesquisa
+            limite (int): Quantidade máxima de resultados
+
+        Returns:
+            dict: {"itens": funcionários encontrados, do mais ao menos relevante,
+                   "truncado": True se havia mais que `limite`}
+        """
+        sql = """SELECT fu.*
+                 FROM funcionarios fu"""
+        try:
+            return buscar_fts(self.db_name, sql, "funcionarios", texto, limite, chave="fu.id")
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar funcionários: {e}")
+            return {"itens": [], "truncado": False}
+
     def atualizar_funcionario(self, funcionario_id, funcionario_data):
         """
         Atualiza os dados de um funcionário existente
@@ -86,20 +186,20 @@ class FuncionariosController:
                 WHERE id = ?"""
         
         try:
-            self.cursor.execute(sql, (
-                funcionario_data['nome'],
-                funcionario_data['cargo'],
-                funcionario_data.get('telefone'),
-                funcionario_data.get('email'),
-                funcionario_data['data_admissao'],
-                funcionario_data.get('observacoes'),
-                funcionario_id
-            ))
-            self.conn.commit()
+            with transacao(self.db_name) as conn:
+                conn.execute(sql, (
+                    funcionario_data['nome'],
+                    funcionario_data['cargo'],
+                    funcionario_data.get('telefone'),
+                    funcionario_data.get('email'),
+                    funcionario_data['data_admissao'],
+                    funcionario_data.get('observacoes'),
+                    funcionario_id
+                ))
+            publicar(self.db_name, 'funcionarios', (funcionario_id,), ATUALIZACAO)
             return True
         except sqlite3.Error as e:
             print(f"Erro ao atualizar funcionário: {e}")
-            self.conn.rollback()
             return False
         
     def excluir_funcionario(self, funcionario_id):
@@ -115,10 +215,10 @@ class FuncionariosController:
         sql = "DELETE FROM funcionarios WHERE id = ?"
         
         try:
-            self.cursor.execute(sql, (funcionario_id,))
-            self.conn.commit()
+            with transacao(self.db_name) as conn:
+                conn.execute(sql, (funcionario_id,))
+            publicar(self.db_name, 'funcionarios', (funcionario_id,), EXCLUSAO)
             return True
         except sqlite3.Error as e:
             print(f"Erro ao excluir funcionário: {e}")
-            self.conn.rollback()
             return False
\ No newline at end of file
@@ -0,0 +1,113 @@
+import threading
+from collections.abc import ItemsView, KeysView, Mapping, ValuesView
+
+# Classes de linha já montadas, por conjunto de colunas
+_classes = {}
+_lock = threading.Lock()
+
+
+class Linha:
+    """
+    Registro lido do banco, acessado pelo nome da coluna: `linha["nome"]`.
+
+    Guarda só a tupla devolvida pelo sqlite3; os nomes das colunas e a
+    posição de cada uma ficam na classe, montada uma vez por conjunto de
+    colunas (ver `classe_linha`). Assim cada registro ocupa um objeto com
+    um único slot, em vez de um dicionário com as chaves repetidas.
+
+    Responde como um dicionário somente leitura (`get`, `in`, `keys`,
+    `items`, `dict(linha)`, `{**linha}`); quem precisa alterar os campos
+    deve fazer uma cópia com `dict(linha)`.
+    """
+
+    __slots__ = ("_valores",)
+    _colunas = ()
+    _indices = {}
+
+    def __init__(self, valores):
+        self._valores = valores
+
+    def __getitem__(self, coluna):
+        return self._valores[self._indices[coluna]]
+
+    def get(self, coluna, padrao=None):
+        indice = self._indices.get(coluna)
+        return padrao if indice is None else self._valores[indice]
+
+    def __contains__(self, coluna):
+        return coluna in self._indices
+
+    def __iter__(self):
+        return iter(self._colunas)
+
+    def __len__(self):
+        return len(self._colunas)
+
+    def keys(self):
+        return KeysView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def __eq__(self, outro):
+        if type(outro) is type(self):
+            return self._valores == outro._valores
+        if isinstance(outro, Mapping):
+            return dict(zip(self._colunas, self._valores)) == dict(outro.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Linha({dict(zip(self._colunas, self._valores))!r})"
+
+
+# Reconhecida como Mapping por isinstance; csv.DictWriter, dict(linha) e
+# {**linha} usam keys() e __getitem__ definidos acima
+Mapping.register(Linha)
+
+
+def classe_linha(colunas):
+    """
+    Retorna a classe de Linha das colunas informadas, criando-a no primeiro uso.
+
+    Args:
+        colunas (iterable): Nomes das colunas, na ordem do SELECT
+
+    Returns:
+        type: Subclasse de Linha; chame-a com a tupla de valores
+    """
+    colunas = tuple(colunas)
+    classe = _classes.get(colunas)
+    if classe is None:
+        with _lock:
+            classe = _classes.get(colunas)
+            if classe is None:
+                classe = type("Linha", (Linha,), {
+                    "__slots__": (),
+                    "_colunas": colunas,
+                    # Com colunas repetidas (ex.: dois "id" num JOIN) vale a última, como no dict
+                    "_indices": {coluna: i for i, coluna in enumerate(colunas)},
+                })
+                _classes[colunas] = classe
+    return classe
+
+
+def ler_linhas(cursor, linhas=None):
+    """
+    Converte o resultado da última consulta do cursor em registros Linha.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor que executou o SELECT
+        linhas (list, opcional): Tuplas já lidas; padrão: cursor.fetchall()
+
+    Returns:
+        list: Lista de Linha
+    """
+    if linhas is None:
+        linhas = cursor.fetchall()
+    classe = classe_linha(column[0] for column in cursor.description)
+    return list(map(classe, linhas))
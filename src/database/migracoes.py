@@ -0,0 +1,667 @@
+import sqlite3
+from database.conexao import obter_pool
+
+
+def _indice_fts(tabela, colunas):
+    """
+    Gera o DDL de um índice FTS5 de conteúdo externo para a tabela, com os
+    gatilhos que o mantêm sincronizado e a carga inicial dos registros.
+    """
+    fts = f"{tabela}_fts"
+    lista = ", ".join(colunas)
+    novos = ", ".join(f"NEW.{c}" for c in colunas)
+    antigos = ", ".join(f"OLD.{c}" for c in colunas)
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {lista}, content='{tabela}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{fts}_inserido
+        AFTER INSERT ON {tabela}
+        BEGIN
+            INSERT INTO {fts}(rowid, {lista}) VALUES (NEW.id, {novos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{fts}_excluido
+        AFTER DELETE ON {tabela}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', OLD.id, {antigos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{fts}_atualizado
+        AFTER UPDATE OF {lista} ON {tabela}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', OLD.id, {antigos});
+            INSERT INTO {fts}(rowid, {lista}) VALUES (NEW.id, {novos});
+        END""",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _so_digitos(expressao):
+    """Expressão SQL com a pontuação de CPF, CNPJ e telefone removida."""
+    for caractere in ".-/() ":
+        expressao = f"replace({expressao}, '{caractere}', '')"
+    return expressao
+
+
+def _indice_trigrama(tabela, colunas, digitos=()):
+    """
+    Gera o DDL de um índice FTS5 com o tokenizador trigram, que encontra um
+    trecho em qualquer posição do texto ("ilva" em "Silva"), com os gatilhos
+    e a carga inicial. As colunas de `digitos` também são indexadas só com
+    os números, numa coluna extra lida da view {tabela}_trigrama_conteudo,
+    para que "12345678900" encontre "123.456.789-00".
+    """
+    fts = f"{tabela}_trigrama"
+    lista = ", ".join(colunas)
+    novos = [f"NEW.{c}" for c in colunas]
+    antigos = [f"OLD.{c}" for c in colunas]
+    passos = []
+    conteudo = tabela
+    if digitos:
+        conteudo = f"{fts}_conteudo"
+        juntar = " || ' ' || ".join
+        passos.append(
+            f"""CREATE VIEW IF NOT EXISTS {conteudo} AS
+            SELECT id, {lista}, {juntar(_so_digitos(f"COALESCE({c}, '')") for c in digitos)} AS digitos
+            FROM {tabela}"""
+        )
+        lista += ", digitos"
+        novos.append(juntar(_so_digitos(f"COALESCE(NEW.{c}, '')") for c in digitos))
+        antigos.append(juntar(_so_digitos(f"COALESCE(OLD.{c}, '')") for c in digitos))
+    novos = ", ".join(novos)
+    antigos = ", ".join(antigos)
+    return passos + [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {lista}, content='{conteudo}', content_rowid='id',
+            tokenize='trigram'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{fts}_inserido
+        AFTER INSERT ON {tabela}
+        BEGIN
+            INSERT INTO {fts}(rowid, {lista}) VALUES (NEW.id, {novos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{fts}_excluido
+        AFTER DELETE ON {tabela}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', OLD.id, {antigos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{fts}_atualizado
+        AFTER UPDATE OF {", ".join(dict.fromkeys(colunas + digitos))} ON {tabela}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', OLD.id, {antigos});
+            INSERT INTO {fts}(rowid, {lista}) VALUES (NEW.id, {novos});
+        END""",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _adicionar_coluna(tabela, coluna, tipo):
+    """Passo que acrescenta uma coluna, se o banco ainda não a tiver."""
+    def passo(conn: sqlite3.Connection):
+        existentes = {linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})")}
+        if coluna not in existentes:
+            conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+    return passo
+
+
+# Vendas que seguram estoque: a pendente reserva, a concluída já saiu; só a
+# cancelada devolve. Os gatilhos abaixo mantêm produtos.estoque_atual e o
+# histórico em movimentacao_estoque a partir desse único critério. Eles não
+# conferem o saldo: uma baixa maior que o estoque viola o
+# CHECK(estoque_atual >= 0) de produtos e desfaz a gravação inteira, que o
+# VendasController informa como EstoqueInsuficiente.
+_VENDA_ATIVA = "IN ('Pendente', 'Concluída')"
+
+_MOVIMENTACAO = """INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade,
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id, observacoes
+            )"""
+
+# Gatilhos de estoque. Ficam numa constante para poderem ser removidos e
+# recriados em cargas em lote (DROP antes, CREATE e reconciliação depois).
+GATILHOS_ESTOQUE = {
+    # Item gravado numa venda ativa: baixa o estoque do produto
+    "trg_estoque_item_inserido": f"""CREATE TRIGGER IF NOT EXISTS trg_estoque_item_inserido
+        AFTER INSERT ON itens_venda
+        WHEN (SELECT status FROM vendas WHERE id = NEW.venda_id) {_VENDA_ATIVA}
+        BEGIN
+            {_MOVIMENTACAO}
+            SELECT p.id, 'SAIDA', NEW.quantidade,
+                   p.estoque_atual, p.estoque_atual - NEW.quantidade, 'Venda de produto',
+                   NEW.venda_id, 'VENDA', v.funcionario_id, NULL
+            FROM produtos p, vendas v
+            WHERE p.id = NEW.produto_id AND v.id = NEW.venda_id;
+            UPDATE produtos
+            SET estoque_atual = estoque_atual - NEW.quantidade,
+                data_atualizacao = datetime('now')
+            WHERE id = NEW.produto_id;
+        END""",
+    # Item removido de uma venda ativa: devolve o estoque
+    "trg_estoque_item_excluido": f"""CREATE TRIGGER IF NOT EXISTS trg_estoque_item_excluido
+        AFTER DELETE ON itens_venda
+        WHEN (SELECT status FROM vendas WHERE id = OLD.venda_id) {_VENDA_ATIVA}
+        BEGIN
+            {_MOVIMENTACAO}
+            SELECT p.id, 'DEVOLUCAO', OLD.quantidade,
+                   p.estoque_atual, p.estoque_atual + OLD.quantidade, 'Item removido da venda',
+                   OLD.venda_id, 'VENDA', v.funcionario_id, NULL
+            FROM produtos p, vendas v
+            WHERE p.id = OLD.produto_id AND v.id = OLD.venda_id;
+            UPDATE produtos
+            SET estoque_atual = estoque_atual + OLD.quantidade,
+                data_atualizacao = datetime('now')
+            WHERE id = OLD.produto_id;
+        END""",
+    # Quantidade alterada num item de venda ativa: uma movimentação com a diferença
+    "trg_estoque_item_atualizado": f"""CREATE TRIGGER IF NOT EXISTS trg_estoque_item_atualizado
+        AFTER UPDATE OF quantidade ON itens_venda
+        WHEN OLD.produto_id = NEW.produto_id AND OLD.quantidade != NEW.quantidade
+         AND (SELECT status FROM vendas WHERE id = NEW.venda_id) {_VENDA_ATIVA}
+        BEGIN
+            {_MOVIMENTACAO}
+            SELECT p.id,
+                   CASE WHEN NEW.quantidade > OLD.quantidade THEN 'SAIDA' ELSE 'DEVOLUCAO' END,
+                   abs(NEW.quantidade - OLD.quantidade),
+                   p.estoque_atual, p.estoque_atual - (NEW.quantidade - OLD.quantidade),
+                   'Quantidade alterada na venda', NEW.venda_id, 'VENDA', v.funcionario_id,
+                   'Quantidade alterada de ' || OLD.quantidade || ' para ' || NEW.quantidade
+            FROM produtos p, vendas v
+            WHERE p.id = NEW.produto_id AND v.id = NEW.venda_id;
+            UPDATE produtos
+            SET estoque_atual = estoque_atual - (NEW.quantidade - OLD.quantidade),
+                data_atualizacao = datetime('now')
+            WHERE id = NEW.produto_id;
+        END""",
+    # Produto trocado num item de venda ativa: devolve o antigo e baixa o novo
+    "trg_estoque_item_trocado": f"""CREATE TRIGGER IF NOT EXISTS trg_estoque_item_trocado
+        AFTER UPDATE OF produto_id ON itens_venda
+        WHEN OLD.produto_id != NEW.produto_id
+         AND (SELECT status FROM vendas WHERE id = NEW.venda_id) {_VENDA_ATIVA}
+        BEGIN
+            {_MOVIMENTACAO}
+            SELECT p.id, 'DEVOLUCAO', OLD.quantidade,
+                   p.estoque_atual, p.estoque_atual + OLD.quantidade, 'Item alterado na venda',
+                   OLD.venda_id, 'VENDA', v.funcionario_id, NULL
+            FROM produtos p, vendas v
+            WHERE p.id = OLD.produto_id AND v.id = OLD.venda_id;
+            UPDATE produtos
+            SET estoque_atual = estoque_atual + OLD.quantidade,
+                data_atualizacao = datetime('now')
+            WHERE id = OLD.produto_id;
+            {_MOVIMENTACAO}
+            SELECT p.id, 'SAIDA', NEW.quantidade,
+                   p.estoque_atual, p.estoque_atual - NEW.quantidade, 'Item alterado na venda',
+                   NEW.venda_id, 'VENDA', v.funcionario_id, NULL
+            FROM produtos p, vendas v
+            WHERE p.id = NEW.produto_id AND v.id = NEW.venda_id;
+            UPDATE produtos
+            SET estoque_atual = estoque_atual - NEW.quantidade,
+                data_atualizacao = datetime('now')
+            WHERE id = NEW.produto_id;
+        END""",
+    # Venda cancelada ou reativada: uma instrução para o histórico e uma para
+    # o estoque, com os itens agregados por produto (junção por índice)
+    "trg_estoque_venda_status": f"""CREATE TRIGGER IF NOT EXISTS trg_estoque_venda_status
+        AFTER UPDATE OF status ON vendas
+        WHEN (OLD.status {_VENDA_ATIVA}) != (NEW.status {_VENDA_ATIVA})
+        BEGIN
+            {_MOVIMENTACAO}
+            SELECT p.id,
+                   CASE WHEN NEW.status = 'Cancelada' THEN 'DEVOLUCAO' ELSE 'SAIDA' END,
+                   t.quantidade,
+                   p.estoque_atual,
+                   p.estoque_atual + CASE WHEN NEW.status = 'Cancelada' THEN t.quantidade ELSE -t.quantidade END,
+                   CASE WHEN NEW.status = 'Cancelada' THEN 'Venda cancelada' ELSE 'Reativação de venda' END,
+                   NEW.id, 'VENDA', NEW.funcionario_id,
+                   'Status alterado de ' || OLD.status || ' para ' || NEW.status
+            FROM (SELECT produto_id, SUM(quantidade) AS quantidade
+                  FROM itens_venda WHERE venda_id = NEW.id
+                  GROUP BY produto_id) AS t
+            JOIN produtos p ON p.id = t.produto_id;
+            UPDATE produtos
+            SET estoque_atual = produtos.estoque_atual
+                    + CASE WHEN NEW.status = 'Cancelada' THEN t.quantidade ELSE -t.quantidade END,
+                data_atualizacao = datetime('now')
+            FROM (SELECT produto_id, SUM(quantidade) AS quantidade
+                  FROM itens_venda WHERE venda_id = NEW.id
+                  GROUP BY produto_id) AS t
+            WHERE produtos.id = t.produto_id;
+        END""",
+    # Venda ativa excluída com itens ainda gravados: devolve o estoque deles
+    "trg_estoque_venda_excluida": f"""CREATE TRIGGER IF NOT EXISTS trg_estoque_venda_excluida
+        AFTER DELETE ON vendas
+        WHEN OLD.status {_VENDA_ATIVA}
+        BEGIN
+            {_MOVIMENTACAO}
+            SELECT p.id, 'DEVOLUCAO', t.quantidade,
+                   p.estoque_atual, p.estoque_atual + t.quantidade, 'Venda excluída',
+                   OLD.id, 'VENDA', OLD.funcionario_id, NULL
+            FROM (SELECT produto_id, SUM(quantidade) AS quantidade
+                  FROM itens_venda WHERE venda_id = OLD.id
+                  GROUP BY produto_id) AS t
+            JOIN produtos p ON p.id = t.produto_id;
+            UPDATE produtos
+            SET estoque_atual = produtos.estoque_atual + t.quantidade,
+                data_atualizacao = datetime('now')
+            FROM (SELECT produto_id, SUM(quantidade) AS quantidade
+                  FROM itens_venda WHERE venda_id = OLD.id
+                  GROUP BY produto_id) AS t
+            WHERE produtos.id = t.produto_id;
+        END""",
+}
+
+# DDL da migração 7 exatamente como foi publicada. GATILHOS_ESTOQUE guarda a
+# versão vigente dos gatilhos e muda com novas migrações; esta não.
+_MIGRACAO_7 = (
+    "DROP TRIGGER IF EXISTS trigger_baixa_estoque_venda",
+    "DROP TRIGGER IF EXISTS trigger_venda_pendente",
+    "DROP TRIGGER IF EXISTS trg_movimentacao_estoque_status",
+    """CREATE TRIGGER IF NOT EXISTS trg_estoque_item_inserido
+        AFTER INSERT ON itens_venda
+        WHEN (SELECT status FROM vendas WHERE id = NEW.venda_id) IN ('Pendente', 'Concluída')
+        BEGIN
+            INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade,
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id, observacoes
+            )
+            SELECT p.id, 'SAIDA', NEW.quantidade,
+                   p.estoque_atual, p.estoque_atual - NEW.quantidade, 'Venda de produto',
+                   NEW.venda_id, 'VENDA', v.funcionario_id, NULL
+            FROM produtos p, vendas v
+            WHERE p.id = NEW.produto_id AND v.id = NEW.venda_id;
+            UPDATE produtos
+            SET estoque_atual = estoque_atual - NEW.quantidade,
+                data_atualizacao = datetime('now')
+            WHERE id = NEW.produto_id;
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_estoque_item_excluido
+        AFTER DELETE ON itens_venda
+        WHEN (SELECT status FROM vendas WHERE id = OLD.venda_id) IN ('Pendente', 'Concluída')
+        BEGIN
+            INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade,
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id, observacoes
+            )
+            SELECT p.id, 'DEVOLUCAO', OLD.quantidade,
+                   p.estoque_atual, p.estoque_atual + OLD.quantidade, 'Item removido da venda',
+                   OLD.venda_id, 'VENDA', v.funcionario_id, NULL
+            FROM produtos p, vendas v
+            WHERE p.id = OLD.produto_id AND v.id = OLD.venda_id;
+            UPDATE produtos
+            SET estoque_atual = estoque_atual + OLD.quantidade,
+                data_atualizacao = datetime('now')
+            WHERE id = OLD.produto_id;
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_estoque_item_atualizado
+        AFTER UPDATE OF produto_id, quantidade ON itens_venda
+        WHEN (SELECT status FROM vendas WHERE id = NEW.venda_id) IN ('Pendente', 'Concluída')
+        BEGIN
+            INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade,
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id, observacoes
+            )
+            SELECT p.id, 'DEVOLUCAO', OLD.quantidade,
+                   p.estoque_atual, p.estoque_atual + OLD.quantidade, 'Item alterado na venda',
+                   OLD.venda_id, 'VENDA', v.funcionario_id, NULL
+            FROM produtos p, vendas v
+            WHERE p.id = OLD.produto_id AND v.id = OLD.venda_id;
+            UPDATE produtos
+            SET estoque_atual = estoque_atual + OLD.quantidade,
+                data_atualizacao = datetime('now')
+            WHERE id = OLD.produto_id;
+            INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade,
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id, observacoes
+            )
+            SELECT p.id, 'SAIDA', NEW.quantidade,
+                   p.estoque_atual, p.estoque_atual - NEW.quantidade, 'Item alterado na venda',
+                   NEW.venda_id, 'VENDA', v.funcionario_id, NULL
+            FROM produtos p, vendas v
+            WHERE p.id = NEW.produto_id AND v.id = NEW.venda_id;
+            UPDATE produtos
+            SET estoque_atual = estoque_atual - NEW.quantidade,
+                data_atualizacao = datetime('now')
+            WHERE id = NEW.produto_id;
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_estoque_venda_status
+        AFTER UPDATE OF status ON vendas
+        WHEN (OLD.status IN ('Pendente', 'Concluída')) != (NEW.status IN ('Pendente', 'Concluída'))
+        BEGIN
+            INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade,
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id, observacoes
+            )
+            SELECT p.id,
+                   CASE WHEN NEW.status = 'Cancelada' THEN 'DEVOLUCAO' ELSE 'SAIDA' END,
+                   t.quantidade,
+                   p.estoque_atual,
+                   p.estoque_atual + CASE WHEN NEW.status = 'Cancelada' THEN t.quantidade ELSE -t.quantidade END,
+                   CASE WHEN NEW.status = 'Cancelada' THEN 'Venda cancelada' ELSE 'Reativação de venda' END,
+                   NEW.id, 'VENDA', NEW.funcionario_id,
+                   'Status alterado de ' || OLD.status || ' para ' || NEW.status
+            FROM (SELECT produto_id, SUM(quantidade) AS quantidade
+                  FROM itens_venda WHERE venda_id = NEW.id
+                  GROUP BY produto_id) AS t
+            JOIN produtos p ON p.id = t.produto_id;
+            UPDATE produtos
+            SET estoque_atual = produtos.estoque_atual
+                    + CASE WHEN NEW.status = 'Cancelada' THEN t.quantidade ELSE -t.quantidade END,
+                data_atualizacao = datetime('now')
+            FROM (SELECT produto_id, SUM(quantidade) AS quantidade
+                  FROM itens_venda WHERE venda_id = NEW.id
+                  GROUP BY produto_id) AS t
+            WHERE produtos.id = t.produto_id;
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_estoque_venda_excluida
+        AFTER DELETE ON vendas
+        WHEN OLD.status IN ('Pendente', 'Concluída')
+        BEGIN
+            INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade,
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id, observacoes
+            )
+            SELECT p.id, 'DEVOLUCAO', t.quantidade,
+                   p.estoque_atual, p.estoque_atual + t.quantidade, 'Venda excluída',
+                   OLD.id, 'VENDA', OLD.funcionario_id, NULL
+            FROM (SELECT produto_id, SUM(quantidade) AS quantidade
+                  FROM itens_venda WHERE venda_id = OLD.id
+                  GROUP BY produto_id) AS t
+            JOIN produtos p ON p.id = t.produto_id;
+            UPDATE produtos
+            SET estoque_atual = produtos.estoque_atual + t.quantidade,
+                data_atualizacao = datetime('now')
+            FROM (SELECT produto_id, SUM(quantidade) AS quantidade
+                  FROM itens_venda WHERE venda_id = OLD.id
+                  GROUP BY produto_id) AS t
+            WHERE produtos.id = t.produto_id;
+        END""",
+)
+
+
+def _reservar_vendas_pendentes(conn: sqlite3.Connection):
+    """
+    Baixa o estoque que as vendas pendentes ainda não seguram.
+
+    Nos gatilhos anteriores à migração 7 a venda pendente não reservava
+    estoque; com os atuais ela reserva e, ao ser cancelada, devolve tudo.
+    Para cada venda pendente e produto, compara a quantidade dos itens com
+    o saldo já movimentado para a venda (SAIDA menos DEVOLUCAO) e baixa a
+    diferença, registrando-a em movimentacao_estoque. Sem estoque
+    suficiente, baixa o que houver e anota a falta na movimentação.
+    """
+    faltas = conn.execute("""
+        SELECT iv.venda_id, iv.produto_id, v.funcionario_id,
+               SUM(iv.quantidade) - COALESCE((
+                   SELECT SUM(CASE m.tipo_movimentacao WHEN 'SAIDA' THEN m.quantidade ELSE -m.quantidade END)
+                   FROM movimentacao_estoque m
+                   WHERE m.produto_id = iv.produto_id
+                     AND m.referencia_tipo = 'VENDA' AND m.referencia_id = iv.venda_id
+                     AND m.tipo_movimentacao IN ('SAIDA', 'DEVOLUCAO')
+               ), 0) AS falta
+        FROM itens_venda iv
+        JOIN vendas v ON v.id = iv.venda_id
+        WHERE v.status = 'Pendente'
+        GROUP BY iv.venda_id, iv.produto_id
+        ORDER BY iv.venda_id, iv.produto_id
+    """).fetchall()
+    for venda_id, produto_id, funcionario_id, falta in faltas:
+        if falta <= 0:
+            continue
+        produto = conn.execute("SELECT estoque_atual FROM produtos WHERE id = ?", (produto_id,)).fetchone()
+        if produto is None:
+            continue
+        estoque = produto[0]
+        baixa = min(falta, max(estoque, 0))
+        observacao = None
+        if baixa < falta:
+            observacao = f"Estoque insuficiente: faltaram {falta - baixa:g} unidade(s)"
+            print(f"Venda pendente {venda_id}: {observacao.lower()} do produto {produto_id}")
+        if baixa <= 0:
+            continue
+        conn.execute(f"""{_MOVIMENTACAO}
+            VALUES (?, 'SAIDA', ?, ?, ?, 'Reserva de venda pendente', ?, 'VENDA', ?, ?)""",
+                     (produto_id, baixa, estoque, estoque - baixa, venda_id, funcionario_id, observacao))
+        conn.execute("""UPDATE produtos
+                        SET estoque_atual = estoque_atual - ?, data_atualizacao = datetime('now')
+                        WHERE id = ?""", (baixa, produto_id))
+
+
+def remover_gatilhos_estoque(conn: sqlite3.Connection):
+    """Remove os gatilhos de estoque (ex.: antes de uma carga em lote)."""
+    for nome in GATILHOS_ESTOQUE:
+        conn.execute(f"DROP TRIGGER IF EXISTS {nome}")
+
+
+def criar_gatilhos_estoque(conn: sqlite3.Connection):
+    """Cria os gatilhos de estoque que ainda não existirem."""
+    for ddl in GATILHOS_ESTOQUE.values():
+        conn.execute(ddl)
+
+
+# Recalcula do zero as tabelas de resumo do painel (migração 3 e cargas em lote)
+RECALCULAR_RESUMOS = (
+    """INSERT OR REPLACE INTO resumo_indicadores (id, receita_total, total_vendas, total_clientes, total_produtos)
+       VALUES (1,
+               (SELECT COALESCE(SUM(total), 0) FROM vendas),
+               (SELECT COUNT(*) FROM vendas),
+               (SELECT COUNT(*) FROM clientes),
+               (SELECT COUNT(*) FROM produtos))""",
+    "DELETE FROM resumo_vendas_diarias",
+    """INSERT INTO resumo_vendas_diarias (dia, receita, quantidade)
+       SELECT substr(data_venda, 1, 10), COALESCE(SUM(total), 0), COUNT(*)
+       FROM vendas
+       WHERE data_venda IS NOT NULL
+       GROUP BY substr(data_venda, 1, 10)""",
+)
+
+
+def recalcular_resumos(conn: sqlite3.Connection):
+    """Refaz resumo_indicadores e resumo_vendas_diarias a partir das vendas."""
+    for sql in RECALCULAR_RESUMOS:
+        conn.execute(sql)
+
+
+# Cada migração é (versão, descrição, passos). Um passo é uma instrução SQL
+# ou uma função que recebe a conexão, para conversões que exigem Python.
+# Migrações já publicadas nunca devem ser alteradas: mudanças de esquema
+# entram sempre como uma nova versão no fim da lista.
+MIGRACOES = [
+    (1, "Índices de chaves estrangeiras e datas", [
+        "CREATE INDEX IF NOT EXISTS idx_itens_venda_venda_id ON itens_venda(venda_id)",
+        "CREATE INDEX IF NOT EXISTS idx_itens_venda_produto_id ON itens_venda(produto_id)",
+        "CREATE INDEX IF NOT EXISTS idx_vendas_cliente_id ON vendas(cliente_id)",
+        "CREATE INDEX IF NOT EXISTS idx_vendas_funcionario_id ON vendas(funcionario_id)",
+        "CREATE INDEX IF NOT EXISTS idx_movimentacao_produto_id ON movimentacao_estoque(produto_id)",
+        "CREATE INDEX IF NOT EXISTS idx_movimentacao_data ON movimentacao_estoque(data_movimentacao)",
+    ]),
+    (2, "Datas de venda em ISO-8601 (YYYY-MM-DD HH:MM:SS) indexadas", [
+        # Converte o formato antigo dd/mm/YYYY HH:MM:SS, que não ordena como texto
+        """UPDATE vendas
+           SET data_venda = substr(data_venda, 7, 4) || '-' || substr(data_venda, 4, 2) || '-'
+                            || substr(data_venda, 1, 2) || substr(data_venda, 11)
+           WHERE data_venda GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]*'""",
+        "CREATE INDEX IF NOT EXISTS idx_vendas_data_venda ON vendas(data_venda)",
+    ]),
+    (3, "Indicadores do painel mantidos por gatilhos", [
+        """CREATE TABLE IF NOT EXISTS resumo_indicadores (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            receita_total REAL NOT NULL DEFAULT 0,
+            total_vendas INTEGER NOT NULL DEFAULT 0,
+            total_clientes INTEGER NOT NULL DEFAULT 0,
+            total_produtos INTEGER NOT NULL DEFAULT 0
+        )""",
+        """CREATE TABLE IF NOT EXISTS resumo_vendas_diarias (
+            dia TEXT PRIMARY KEY,
+            receita REAL NOT NULL DEFAULT 0,
+            quantidade INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID""",
+        *RECALCULAR_RESUMOS,
+        """CREATE TRIGGER IF NOT EXISTS trg_resumo_venda_inserida
+        AFTER INSERT ON vendas
+        BEGIN
+            UPDATE resumo_indicadores
+            SET receita_total = receita_total + COALESCE(NEW.total, 0),
+                total_vendas = total_vendas + 1
+            WHERE id = 1;
+            INSERT INTO resumo_vendas_diarias (dia, receita, quantidade)
+            SELECT substr(NEW.data_venda, 1, 10), COALESCE(NEW.total, 0), 1
+            WHERE NEW.data_venda IS NOT NULL
+            ON CONFLICT(dia) DO UPDATE SET
+                receita = receita + excluded.receita,
+                quantidade = quantidade + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_resumo_venda_atualizada
+        AFTER UPDATE OF total, data_venda ON vendas
+        BEGIN
+            UPDATE resumo_indicadores
+            SET receita_total = receita_total - COALESCE(OLD.total, 0) + COALESCE(NEW.total, 0)
+            WHERE id = 1;
+            UPDATE resumo_vendas_diarias
+            SET receita = receita - COALESCE(OLD.total, 0),
+                quantidade = quantidade - 1
+            WHERE dia = substr(OLD.data_venda, 1, 10);
+            INSERT INTO resumo_vendas_diarias (dia, receita, quantidade)
+            SELECT substr(NEW.data_venda, 1, 10), COALESCE(NEW.total, 0), 1
+            WHERE NEW.data_venda IS NOT NULL
+            ON CONFLICT(dia) DO UPDATE SET
+                receita = receita + excluded.receita,
+                quantidade = quantidade + 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_resumo_venda_excluida
+        AFTER DELETE ON vendas
+        BEGIN
+            UPDATE resumo_indicadores
+            SET receita_total = receita_total - COALESCE(OLD.total, 0),
+                total_vendas = total_vendas - 1
+            WHERE id = 1;
+            UPDATE resumo_vendas_diarias
+            SET receita = receita - COALESCE(OLD.total, 0),
+                quantidade = quantidade - 1
+            WHERE dia = substr(OLD.data_venda, 1, 10);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_resumo_cliente_inserido
+        AFTER INSERT ON clientes
+        BEGIN
+            UPDATE resumo_indicadores SET total_clientes = total_clientes + 1 WHERE id = 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_resumo_cliente_excluido
+        AFTER DELETE ON clientes
+        BEGIN
+            UPDATE resumo_indicadores SET total_clientes = total_clientes - 1 WHERE id = 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_resumo_produto_inserido
+        AFTER INSERT ON produtos
+        BEGIN
+            UPDATE resumo_indicadores SET total_produtos = total_produtos + 1 WHERE id = 1;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_resumo_produto_excluido
+        AFTER DELETE ON produtos
+        BEGIN
+            UPDATE resumo_indicadores SET total_produtos = total_produtos - 1 WHERE id = 1;
+        END""",
+    ]),
+    (4, "Índices das colunas de ordenação da paginação", [
+        "CREATE INDEX IF NOT EXISTS idx_clientes_nome ON clientes(nome)",
+        "CREATE INDEX IF NOT EXISTS idx_produtos_nome ON produtos(nome)",
+        "CREATE INDEX IF NOT EXISTS idx_funcionarios_nome ON funcionarios(nome)",
+    ]),
+    (5, "Índices de busca textual (FTS5)", [
+        *_indice_fts("clientes", ("nome", "cpf_cnpj", "telefone")),
+        *_indice_fts("produtos", ("nome", "categoria", "descricao")),
+        *_indice_fts("fornecedores", ("nome_fantasia", "razao_social", "cnpj")),
+        *_indice_fts("funcionarios", ("nome", "cargo")),
+    ]),
+    (6, "Código de barras (EAN/SKU) dos produtos", [
+        _adicionar_coluna("produtos", "codigo_barras", "TEXT"),
+        # Único só entre os produtos que têm código; os demais ficam NULL
+        """CREATE UNIQUE INDEX IF NOT EXISTS idx_produtos_codigo_barras
+           ON produtos(codigo_barras) WHERE codigo_barras IS NOT NULL""",
+    ]),
+    (7, "Gatilhos de estoque por conjunto, no momento certo do ciclo da venda", [
+        *_MIGRACAO_7,
+    ]),
+    (8, "Edição de item de venda gera só a diferença de estoque", [
+        "DROP TRIGGER IF EXISTS trg_estoque_item_atualizado",
+        GATILHOS_ESTOQUE["trg_estoque_item_atualizado"],
+        GATILHOS_ESTOQUE["trg_estoque_item_trocado"],
+    ]),
+    (9, "Reserva de estoque das vendas pendentes gravadas antes da migração 7", [
+        _reservar_vendas_pendentes,
+    ]),
+    (10, "Busca por trecho (trigram) e por CPF/CNPJ e telefone só com números", [
+        *_indice_trigrama("clientes", ("nome", "cpf_cnpj", "telefone"), digitos=("cpf_cnpj", "telefone")),
+        *_indice_trigrama("produtos", ("nome", "categoria", "descricao")),
+        *_indice_trigrama("fornecedores", ("nome_fantasia", "razao_social", "cnpj"), digitos=("cnpj", "telefone")),
+        *_indice_trigrama("funcionarios", ("nome", "cargo")),
+    ]),
+    (11, "Índices da paginação por data com as datas vazias ordenadas como ''", [
+        # As colunas aceitam NULL; a paginação ordena por COALESCE(coluna, '')
+        "CREATE INDEX IF NOT EXISTS idx_vendas_data_venda_ordem ON vendas(COALESCE(data_venda, ''))",
+        """CREATE INDEX IF NOT EXISTS idx_movimentacao_data_ordem
+           ON movimentacao_estoque(COALESCE(data_movimentacao, ''))""",
+    ]),
+]
+
+
+def versao_atual(conn: sqlite3.Connection) -> int:
+    """Retorna a versão de esquema gravada em PRAGMA user_version."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migracoes(conn: sqlite3.Connection) -> int:
+    """
+    Aplica, em ordem, as migrações ainda não executadas no banco.
+
+    Cada migração roda na sua própria transação junto com a atualização de
+    PRAGMA user_version, de modo que uma falha deixa o banco na última
+    versão consistente.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco do tenant
+
+    Returns:
+        int: Versão de esquema após a execução
+    """
+    versao = versao_atual(conn)
+    if conn.in_transaction:
+        conn.commit()
+    for numero, descricao, passos in MIGRACOES:
+        if numero <= versao:
+            continue
+        try:
+            conn.execute("BEGIN")
+            for passo in passos:
+                if callable(passo):
+                    passo(conn)
+                else:
+                    conn.execute(passo)
+            conn.execute(f"PRAGMA user_version = {int(numero)}")
+            conn.commit()
+            versao = numero
+            print(f"Migração {numero} aplicada: {descricao}")
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"Erro ao aplicar migração {numero} ({descricao}): {e}")
+            break
+    return versao
+
+
+def migrar_banco(db_name: str) -> int:
+    """
+    Atualiza o esquema de um banco user_*.db existente (ex.: no login).
+
+    Args:
+        db_name (str): Caminho do banco do tenant
+
+    Returns:
+        int: Versão de esquema após a execução
+    """
+    with obter_pool(db_name).emprestar() as conn:
+        return aplicar_migracoes(conn)
@@ -0,0 +1,67 @@
+from database.linhas import ler_linhas
+
+# Tamanho padrão de página usado pelos métodos listar_*_paginado
+TAMANHO_PAGINA = 50
+
+
+def listar_pagina(cursor, sql_base, colunas_ordenacao, ordenar_por="id", apos=None,
+                  limite=TAMANHO_PAGINA, decrescente=False, coluna_id="id", filtro=None):
+    """
+    Executa uma consulta paginada por keyset (cursor), sem OFFSET
+
+    A página seguinte começa depois da última linha da anterior, comparando o
+    par (coluna de ordenação, id). Com um índice na coluna de ordenação o
+    custo de cada página é o mesmo, seja a primeira ou a milésima.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor do controller
+        sql_base (str): SELECT ... FROM ... [JOIN ...], sem WHERE nem ORDER BY
+        colunas_ordenacao (dict): Lista branca {coluna do resultado: expressão SQL}; deve
+            conter coluna_id. Colunas que aceitam NULL entram como COALESCE(coluna, ''),
+            já que a comparação do cursor com NULL nunca é verdadeira
+        ordenar_por (str): Coluna de ordenação (chave de colunas_ordenacao)
+        apos (tuple, opcional): Cursor (valor, id) retornado pela página anterior
+        limite (int): Quantidade máxima de registros da página
+        decrescente (bool): Ordena do maior para o menor
+        coluna_id (str): Chave primária usada como desempate
+        filtro (tuple, opcional): (condição SQL, parâmetros) que as linhas devem
+            atender, ex.: a pesquisa digitada pelo usuário
+
+    Returns:
+        dict: {'itens': list de Linha, 'proximo': cursor da próxima página ou None}
+    """
+    if ordenar_por not in colunas_ordenacao:
+        raise ValueError(f"Ordenação não permitida: {ordenar_por}")
+    expressao = colunas_ordenacao[ordenar_por]
+    expressao_id = colunas_ordenacao[coluna_id]
+    limite = max(int(limite), 1)
+    direcao = "DESC" if decrescente else "ASC"
+    comparador = "<" if decrescente else ">"
+
+    condicoes = []
+    parametros = []
+    if filtro is not None:
+        condicoes.append(f"({filtro[0]})")
+        parametros.extend(filtro[1])
+    if apos is not None:
+        # Equivale a (expressao, id) > (?, ?), mas o primeiro termo é uma faixa
+        # que o SQLite busca no índice mesmo quando a expressão é um COALESCE
+        condicoes.append(f"{expressao} {comparador}= ? AND ({expressao} {comparador} ? OR {expressao_id} {comparador} ?)")
+        parametros.extend((apos[0], apos[0], apos[1]))
+    sql = sql_base
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+    sql += f" ORDER BY {expressao} {direcao}, {expressao_id} {direcao} LIMIT ?"
+    parametros.append(limite + 1)
+
+    cursor.execute(sql, parametros)
+    linhas = cursor.fetchall()
+
+    itens = ler_linhas(cursor, linhas[:limite])
+    proximo = None
+    if len(linhas) > limite:
+        ultimo = itens[-1]
+        valor = ultimo[ordenar_por]
+        # NULL ordena como '' (ver colunas_ordenacao)
+        proximo = ("" if valor is None else valor, ultimo[coluna_id])
+    return {"itens": itens, "proximo": proximo}
@@ -1,8 +1,29 @@
 import sqlite3
+from database.conexao import obter_conexao, obter_pool, transacao
+from database.linhas import ler_linhas
+from database.eventos import publicar, INSERCAO, ATUALIZACAO, EXCLUSAO
+from database.paginacao import listar_pagina, TAMANHO_PAGINA
+from database.busca import buscar_fts, LIMITE_BUSCA
+from database.referencias import referencias
+
+
+def normalizar_codigo_barras(codigo):
+    """Remove espaços do código lido; código vazio vira None (produto sem código)."""
+    if codigo is None:
+        return None
+    codigo = str(codigo).strip()
+    return codigo or None
 
 class ProdutosController:
+    # Colunas aceitas na ordenação da listagem paginada (todas indexadas)
+    COLUNAS_ORDENACAO = {
+        'id': 'p.id',
+        'nome': 'p.nome',
+    }
+
     def __init__(self, db_name: str):
-        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.db_name = db_name
+        self.conn = obter_conexao(db_name)
         self.cursor = self.conn.cursor()
     
     def cadastrar_produto(self, produto_data):
@@ -20,7 +41,8 @@ class ProdutosController:
                     'estoque': int,
                     'fornecedor_id': int,
                     'categoria': str,
-                    'data_cadastro': str
+                    'data_cadastro': str,
+                    'codigo_barras': str (opcional, único)
                 }
         
         Returns:
@@ -37,24 +59,30 @@ class ProdutosController:
                 estoque_maximo,
                 fornecedor_id,
                 categoria,
-                data_cadastro
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+                data_cadastro,
+                codigo_barras
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
         try:
-            self.cursor.execute(sql, (
-                produto_data['nome'],
-                produto_data.get('descricao'),
-                produto_data['preco'],
-                produto_data.get('preco_promocional'),
-                produto_data['custo_unitario'],
-                produto_data['estoque_atual'],  # Alterado de 'estoque' para 'estoque_atual'
-                produto_data.get('estoque_minimo', 0),  # Novo campo com valor padrão 0
-                produto_data.get('estoque_maximo'),  # Novo campo (opcional)
-                produto_data['fornecedor_id'],
-                produto_data.get('categoria'),
-                produto_data.get('data_cadastro')
-            ))
-            self.conn.commit()
-            return self.cursor.lastrowid
+            with transacao(self.db_name) as conn:
+                cursor = conn.execute(sql, (
+                    produto_data['nome'],
+                    produto_data.get('descricao'),
+                    produto_data['preco'],
+                    produto_data.get('preco_promocional'),
+                    produto_data['custo_unitario'],
+                    produto_data['estoque_atual'],  # Alterado de 'estoque' para 'estoque_atual'
+                    produto_data.get('estoque_minimo', 0),  # Novo campo com valor padrão 0
+                    produto_data.get('estoque_maximo'),  # Novo campo (opcional)
+                    produto_data['fornecedor_id'],
+                    produto_data.get('categoria'),
+                    produto_data.get('data_cadastro'),
+                    normalizar_codigo_barras(produto_data.get('codigo_barras'))
+                ))
+            produto_id = cursor.lastrowid
+            publicar(self.db_name, 'produtos', (produto_id,), INSERCAO)
+            # O gatilho trg_produto_adicionado registra a entrada inicial no estoque
+            publicar(self.db_name, 'movimentacao_estoque', (), INSERCAO)
+            return produto_id
         except sqlite3.Error as e:
             print(f"Erro ao cadastrar produto: {e}")
             return None
@@ -75,11 +103,142 @@ class ProdutosController:
         try:
             self.cursor.execute(sql)
             produtos = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in produtos]
+            return ler_linhas(self.cursor, produtos)
         except sqlite3.Error as e:
             print(f"Erro ao listar produtos: {e}")
             return []
         
+    def listar_produtos_paginado(self, apos=None, limite=TAMANHO_PAGINA, ordenar_por='id', decrescente=False):
+        """
+        Lista uma página de produtos usando paginação por keyset
+
+        Args:
+            apos (tuple, opcional): Cursor 'proximo' devolvido pela página anterior
+            limite (int): Quantidade de registros por página
+            ordenar_por (str): Uma de 'id', 'nome'
+            decrescente (bool): Ordena do maior para o menor
+
+        Returns:
+            dict: {'itens': lista de dicionários, 'proximo': cursor da próxima página ou None}
+        """
+        sql = """SELECT 
+                    p.*,
+                    f.nome_fantasia as fornecedor
+                FROM produtos p
+                LEFT JOIN fornecedores f ON p.fornecedor_id = f.id"""
+        try:
+            return listar_pagina(self.cursor, sql, self.COLUNAS_ORDENACAO, ordenar_por,
+                                 apos, limite, decrescente)
+        except sqlite3.Error as e:
+            print(f"Erro ao listar produtos: {e}")
+            return {'itens': [], 'proximo': None}
+
+    def buscar_produto_por_id(self, produto_id):
+        """
+        Busca um produto pelo ID, com as mesmas colunas da listagem
+
+        Args:
+            produto_id (int): ID do produto
+
+        Returns:
+            dict: Dados do produto ou None se não encontrado
+        """
+        sql = """SELECT 
+                    p.*,
+                    f.nome_fantasia as fornecedor
+                FROM produtos p
+                LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+                WHERE p.id = ?"""
+        try:
+            self.cursor.execute(sql, (produto_id,))
+            row = self.cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in self.cursor.description], row))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar produto: {e}")
+            return None
+
+    def buscar_por_ids(self, ids):
+        """
+        Busca vários produtos pelo ID numa única consulta (ex.: os ids de uma Alteracao)
+
+        Usa uma conexão emprestada do pool: roda na thread que entrega a
+        Alteracao, enquanto a interface pode estar usando o cursor do controller
+
+        Args:
+            ids (iterable): IDs dos produtos
+
+        Returns:
+            list: Dicionários com as mesmas colunas da listagem; ids inexistentes são ignorados
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        marcadores = ", ".join("?" * len(ids))
+        sql = f"""SELECT
+                    p.*,
+                    f.nome_fantasia as fornecedor
+                FROM produtos p
+                LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+                WHERE p.id IN ({marcadores})"""
+        try:
+            with obter_pool(self.db_name).emprestar() as conn:
+                return ler_linhas(conn.execute(sql, ids))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar produtos: {e}")
+            return []
+
+    def buscar_por_codigo_barras(self, codigo):
+        """
+        Busca um produto pelo código de barras (índice único idx_produtos_codigo_barras)
+
+        Args:
+            codigo (str): Código lido pelo leitor ou digitado
+
+        Returns:
+            dict: Dados do produto ou None se não encontrado
+        """
+        codigo = normalizar_codigo_barras(codigo)
+        if codigo is None:
+            return None
+        sql = """SELECT 
+                    p.*,
+                    f.nome_fantasia as fornecedor
+                FROM produtos p
+                LEFT JOIN fornecedores f ON p.fornecedor_id = f.id
+                WHERE p.codigo_barras = ?"""
+        try:
+            self.cursor.execute(sql, (codigo,))
+            row = self.cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in self.cursor.description], row))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar produto pelo código de barras: {e}")
+            return None
+
+    def buscar(self, texto, limite=LIMITE_BUSCA):
+        """
+        Busca produtos por ID, por prefixo de palavra e por trecho (nome, categoria e descrição)
+
+        Args:
+            texto (str): Texto digitado no campo de pesquisa
+            limite (int): Quantidade máxima de resultados
+
+        Returns:
+            dict: {"itens": produtos encontrados, do mais ao menos relevante,
+                   "truncado": True se havia mais que `limite`}
+        """
+        sql = """SELECT p.*, f.nome_fantasia as fornecedor
+                 FROM produtos p
+                 LEFT JOIN fornecedores f ON p.fornecedor_id = f.id"""
+        try:
+            return buscar_fts(self.db_name, sql, "produtos", texto, limite, chave="p.id")
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar produtos: {e}")
+            return {"itens": [], "truncado": False}
+
     def atualizar_produto(self, produto_id, produto_data):
         """
         Atualiza os dados de um produto existente
@@ -96,7 +255,8 @@ class ProdutosController:
                     'estoque': int,
                     'fornecedor_id': int,
                     'categoria': str,
-                    'data_cadastro': str (formato 'YYYY-MM-DD')
+                    'data_cadastro': str (formato 'YYYY-MM-DD'),
+                    'codigo_barras': str (opcional, único)
                 }
         
         Returns:
@@ -114,24 +274,27 @@ class ProdutosController:
                 fornecedor_id = ?,
                 categoria = ?,
                 data_cadastro = ?,
+                codigo_barras = ?,
                 data_atualizacao = datetime('now')
             WHERE id = ?"""
         try:
-            self.cursor.execute(sql, (
-                produto_data['nome'],
-                produto_data.get('descricao'),
-                produto_data['preco'],
-                produto_data.get('preco_promocional'),
-                produto_data['custo_unitario'],
-                produto_data['estoque_atual'],  # Alterado de 'estoque' para 'estoque_atual'
-                produto_data.get('estoque_minimo', 0),  # Novo campo com valor padrão 0
-                produto_data.get('estoque_maximo'),  # Novo campo (opcional)
-                produto_data['fornecedor_id'],
-                produto_data.get('categoria'),
-                produto_data.get('data_cadastro'),
-                produto_id
-            ))
-            self.conn.commit()
+            with transacao(self.db_name) as conn:
+                conn.execute(sql, (
+                    produto_data['nome'],
+                    produto_data.get('descricao'),
+                    produto_data['preco'],
+                    produto_data.get('preco_promocional'),
+                    produto_data['custo_unitario'],
+                    produto_data['estoque_atual'],  # Alterado de 'estoque' para 'estoque_atual'
+                    produto_data.get('estoque_minimo', 0),  # Novo campo com valor padrão 0
+                    produto_data.get('estoque_maximo'),  # Novo campo (opcional)
+                    produto_data['fornecedor_id'],
+                    produto_data.get('categoria'),
+                    produto_data.get('data_cadastro'),
+                    normalizar_codigo_barras(produto_data.get('codigo_barras')),
+                    produto_id
+                ))
+            publicar(self.db_name, 'produtos', (produto_id,), ATUALIZACAO)
             return True
         except sqlite3.Error as e:
             print(f"Erro ao atualizar produto: {e}")
@@ -149,8 +312,9 @@ class ProdutosController:
         """
         sql = "DELETE FROM produtos WHERE id = ?"
         try:
-            self.cursor.execute(sql, (produto_id,))
-            self.conn.commit()
+            with transacao(self.db_name) as conn:
+                conn.execute(sql, (produto_id,))
+            publicar(self.db_name, 'produtos', (produto_id,), EXCLUSAO)
             return True
         except sqlite3.Error as e:
             print(f"Erro ao excluir produto: {e}")
@@ -158,19 +322,24 @@ class ProdutosController:
         
     def listar_id_e_fornecedores(self):
         """
-        Lista apenas os nomes dos fornecedores cadastrados
-        
+        Lista o id e o nome fantasia dos fornecedores cadastrados
+
+        A lista fica no cache de referências do tenant até a próxima
+        alteração em fornecedores.
+
         Returns:
-            list: Lista de strings com os nomes dos fornecedores
+            list: Lista de dicionários {'id', 'nome_fantasia'}
         """
-        sql = "SELECT id, nome_fantasia FROM fornecedores"
         try:
-            self.cursor.execute(sql)
-            nomes = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in nomes]
+            return referencias.obter(self.db_name, 'fornecedores_id_nome', ('fornecedores',),
+                                     self._ler_id_e_fornecedores)
         except sqlite3.Error as e:
             print(f"Erro ao listar nomes de fornecedores: {e}")
             return []
+
+    def _ler_id_e_fornecedores(self):
+        self.cursor.execute("SELECT id, nome_fantasia FROM fornecedores")
+        return ler_linhas(self.cursor)
     
 if __name__ == "__main__":
     db = ProdutosController()
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from database import eventos
+
+# Quantidade máxima de listas guardadas, somando todos os tenants
+TAMANHO_CACHE = 64
+
+# Tempo máximo (em segundos) que uma lista é servida sem reler o banco, para
+# cobrir gravações feitas fora do app (outro processo, script de carga)
+VALIDADE = 300
+
+
+class CacheReferencias:
+    """
+    Listas de referência pequenas (fornecedores, funcionários, id e nome dos
+    produtos, clientes do autocompletar) lidas uma vez por tenant.
+
+    `obter(banco, nome, tabelas, carregar)` devolve a lista guardada ou a lê
+    com `carregar()`. As entradas saem por LRU (TAMANHO_CACHE), por tempo
+    (VALIDADE) e, principalmente, quando o controller dono publica no
+    barramento uma alteração em uma das `tabelas` daquele banco.
+
+    Os registros das listas são compartilhados entre as sessões do tenant;
+    por isso os carregadores devolvem Linha, que é somente leitura.
+    """
+
+    def __init__(self, tamanho=TAMANHO_CACHE, validade=VALIDADE, relogio=time.monotonic):
+        self.tamanho = tamanho
+        self.validade = validade
+        self.relogio = relogio
+        self._entradas = OrderedDict()
+        # Versão por banco: leituras que começaram antes de uma alteração não são guardadas
+        self._versoes = {}
+        self._lock = threading.Lock()
+        self._assinatura = eventos.assinar(self._ao_alterar)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obter(self, banco, nome, tabelas, carregar):
+        """
+        Devolve a lista `nome` do banco, lendo-a com `carregar()` se preciso.
+
+        Args:
+            banco (str): Banco do tenant
+            nome (str): Identificação da lista (ex.: 'fornecedores_id_nome')
+            tabelas (tuple): Tabelas cujas alterações invalidam a lista
+            carregar (callable): Lê a lista do banco; exceções não são guardadas
+
+        Returns:
+            list: Cópia rasa da lista guardada
+        """
+        chave = (banco, nome)
+        agora = self.relogio()
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[0] > agora:
+                self._entradas.move_to_end(chave)
+                return list(entrada[1])
+            versao = self._versoes.get(banco, 0)
+
+        valor = tuple(carregar())
+
+        with self._lock:
+            if self._versoes.get(banco, 0) == versao:
+                self._entradas[chave] = (agora + self.validade, valor, frozenset(tabelas))
+                self._entradas.move_to_end(chave)
+                while len(self._entradas) > self.tamanho:
+                    self._entradas.popitem(last=False)
+        return list(valor)
+
+    def limpar(self, banco=None):
+        """Descarta as listas do banco informado, ou de todos."""
+        with self._lock:
+            for chave in list(self._entradas):
+                if banco is None or chave[0] == banco:
+                    del self._entradas[chave]
+
+    def _ao_alterar(self, alteracao):
+        with self._lock:
+            self._versoes[alteracao.banco] = self._versoes.get(alteracao.banco, 0) + 1
+            for chave, (_, _, tabelas) in list(self._entradas.items()):
+                if chave[0] == alteracao.banco and alteracao.tabela in tabelas:
+                    del self._entradas[chave]
+
+
+referencias = CacheReferencias()
@@ -0,0 +1,115 @@
+import sqlite3
+import datetime
+from database.conexao import obter_conexao
+
+
+class RelatoriosController:
+    def __init__(self, db_name: str):
+        self.conn = obter_conexao(db_name)
+        self.cursor = self.conn.cursor()
+
+    def vendas_por_cliente(self):
+        """
+        Conta as vendas de cada cliente com um único GROUP BY
+
+        Returns:
+            dict: {nome_do_cliente: quantidade_de_vendas}, em ordem decrescente
+        """
+        sql = """SELECT COALESCE(c.nome, 'Desconhecido') AS cliente, COUNT(*) AS quantidade
+                 FROM vendas v
+                 LEFT JOIN clientes c ON v.cliente_id = c.id
+                 GROUP BY cliente
+                 ORDER BY quantidade DESC"""
+        try:
+            self.cursor.execute(sql)
+            return dict(self.cursor.fetchall())
+        except sqlite3.Error as e:
+            print(f"Erro ao agrupar vendas por cliente: {e}")
+            return {}
+
+    def quantidade_por_produto(self):
+        """
+        Soma a quantidade vendida de cada produto com um único GROUP BY
+
+        Returns:
+            dict: {nome_do_produto: quantidade_vendida}, em ordem decrescente
+        """
+        sql = """SELECT COALESCE(p.nome, 'Desconhecido') AS produto, SUM(iv.quantidade) AS quantidade
+                 FROM itens_venda iv
+                 JOIN vendas v ON iv.venda_id = v.id
+                 LEFT JOIN produtos p ON iv.produto_id = p.id
+                 GROUP BY produto
+                 ORDER BY quantidade DESC"""
+        try:
+            self.cursor.execute(sql)
+            return dict(self.cursor.fetchall())
+        except sqlite3.Error as e:
+            print(f"Erro ao agrupar vendas por produto: {e}")
+            return {}
+
+    def total_geral(self):
+        """
+        Soma o valor total de todas as vendas
+
+        Returns:
+            float: Receita total registrada
+        """
+        try:
+            self.cursor.execute("SELECT COALESCE(SUM(total), 0) FROM vendas")
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Erro ao somar total de vendas: {e}")
+            return 0.0
+
+    def contar_cadastros(self):
+        """
+        Conta produtos e clientes cadastrados sem carregar as tabelas
+
+        Returns:
+            dict: {'produtos': int, 'clientes': int}
+        """
+        sql = """SELECT (SELECT COUNT(*) FROM produtos) AS produtos,
+                        (SELECT COUNT(*) FROM clientes) AS clientes"""
+        try:
+            self.cursor.execute(sql)
+            row = self.cursor.fetchone()
+            return dict(zip([column[0] for column in self.cursor.description], row))
+        except sqlite3.Error as e:
+            print(f"Erro ao contar cadastros: {e}")
+            return {'produtos': 0, 'clientes': 0}
+
+    def obter_indicadores(self, dia=None):
+        """
+        Lê os indicadores do painel da tabela resumo_indicadores, mantida por
+        gatilhos, em tempo constante independentemente do histórico
+
+        Args:
+            dia (datetime.date, opcional): Dia da receita diária; padrão é hoje
+
+        Returns:
+            dict: receita_total, total_vendas, total_clientes, total_produtos e receita_hoje
+        """
+        dia = (dia or datetime.date.today()).isoformat()
+        sql = """SELECT r.receita_total, r.total_vendas, r.total_clientes, r.total_produtos,
+                        COALESCE(d.receita, 0) AS receita_hoje
+                 FROM resumo_indicadores r
+                 LEFT JOIN resumo_vendas_diarias d ON d.dia = ?
+                 WHERE r.id = 1"""
+        try:
+            self.cursor.execute(sql, (dia,))
+            row = self.cursor.fetchone()
+            if row:
+                return dict(zip([column[0] for column in self.cursor.description], row))
+        except sqlite3.Error as e:
+            print(f"Erro ao ler indicadores: {e}")
+        return {'receita_total': 0.0, 'total_vendas': 0, 'total_clientes': 0,
+                'total_produtos': 0, 'receita_hoje': 0.0}
+
+    def gerar_relatorios(self):
+        """
+        Gera os agregados exibidos na tela de Relatórios
+
+        Returns:
+            tuple: (vendas_por_cliente, vendas_por_produto, total_geral)
+        """
+        return self.vendas_por_cliente(), self.quantidade_por_produto(), self.total_geral()
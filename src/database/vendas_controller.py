@@ -1,11 +1,171 @@
 import sqlite3
+import datetime
+from database.conexao import obter_conexao, obter_pool, transacao
+from database.linhas import ler_linhas
+from database.busca import padrao_like
+from database.paginacao import listar_pagina, TAMANHO_PAGINA
+from database.eventos import publicar, INSERCAO, ATUALIZACAO, EXCLUSAO
+from database.referencias import referencias
+from utils import exportar_cursor_csv
+
+# Formato de armazenamento de vendas.data_venda: ordena como texto e usa o índice
+FORMATO_DATA_VENDA = "%Y-%m-%d %H:%M:%S"
+
+# Instruções de gravação da venda. O texto é sempre o mesmo, então o sqlite3
+# reaproveita a instrução já compilada do seu cache a cada venda.
+SQL_INSERIR_VENDA = """INSERT INTO vendas (
+        cliente_id, funcionario_id, desconto, status, total, data_venda
+    ) VALUES (?, ?, ?, ?, ?, ?)"""
+
+SQL_INSERIR_ITEM = """INSERT INTO itens_venda (
+        venda_id, produto_id, quantidade, preco_unitario, desconto, subtotal
+    ) VALUES (?, ?, ?, ?, ?, ?)"""
+
+SQL_ATUALIZAR_VENDA = """UPDATE vendas SET
+        cliente_id = ?, funcionario_id = ?, desconto = ?, status = ?, total = ?, data_venda = ?
+    WHERE id = ?"""
+
+# A quantidade só entra no SET quando muda: o gatilho de estoque do item
+# dispara por UPDATE OF quantidade, mesmo que o valor continue igual
+SQL_ATUALIZAR_ITEM = """UPDATE itens_venda
+    SET quantidade = ?, preco_unitario = ?, desconto = ?, subtotal = ?
+    WHERE id = ?"""
+
+SQL_ATUALIZAR_VALORES_ITEM = """UPDATE itens_venda
+    SET preco_unitario = ?, desconto = ?, subtotal = ?
+    WHERE id = ?"""
+
+
+class EstoqueInsuficiente(Exception):
+    """
+    Gravação recusada porque o estoque não cobre as quantidades da venda.
+
+    Os gatilhos de estoque baixam sem conferir o saldo; quem barra a venda é
+    o CHECK(estoque_atual >= 0) de produtos, que desfaz a transação inteira.
+    `faltas` lista (nome do produto, disponível, pedido).
+    """
+
+    def __init__(self, faltas):
+        self.faltas = faltas
+        detalhes = "; ".join(
+            f"{nome} (disponível {disponivel:g}, pedido {pedido:g})" for nome, disponivel, pedido in faltas
+        )
+        super().__init__(f"Estoque insuficiente: {detalhes}" if detalhes else "Estoque insuficiente")
+
+
+def _sem_estoque(erro):
+    """Indica se o erro veio do CHECK(estoque_atual >= 0) de produtos."""
+    return isinstance(erro, sqlite3.IntegrityError) and "estoque_atual" in str(erro)
+
+
+def agora_data_venda():
+    """Retorna o instante atual no formato de armazenamento de data_venda."""
+    return datetime.datetime.now().strftime(FORMATO_DATA_VENDA)
+
+
+def intervalo_do_periodo(periodo, referencia=None):
+    """
+    Calcula o intervalo [início, fim) de um período de calendário
+
+    Args:
+        periodo (str): 'dia', 'semana' (segunda a domingo) ou 'mes'
+        referencia (datetime.date, opcional): Data dentro do período; padrão é hoje
+
+    Returns:
+        tuple: (inicio, fim) como datetime.date, com fim exclusivo
+    """
+    referencia = referencia or datetime.date.today()
+    if isinstance(referencia, datetime.datetime):
+        referencia = referencia.date()
+    if periodo == "dia":
+        inicio = referencia
+        fim = inicio + datetime.timedelta(days=1)
+    elif periodo == "semana":
+        inicio = referencia - datetime.timedelta(days=referencia.weekday())
+        fim = inicio + datetime.timedelta(days=7)
+    elif periodo == "mes":
+        inicio = referencia.replace(day=1)
+        fim = (inicio + datetime.timedelta(days=32)).replace(day=1)
+    else:
+        raise ValueError(f"Período inválido: {periodo}")
+    return inicio, fim
+
+
+def _formatar_limite(valor):
+    if isinstance(valor, datetime.datetime):
+        return valor.strftime(FORMATO_DATA_VENDA)
+    if isinstance(valor, datetime.date):
+        return valor.strftime("%Y-%m-%d")
+    return valor
+
+
+def _filtro_intervalo(inicio, fim):
+    """WHERE sobre v.data_venda (usa idx_vendas_data_venda) para os limites informados."""
+    condicoes, parametros = [], []
+    if inicio is not None:
+        condicoes.append("v.data_venda >= ?")
+        parametros.append(_formatar_limite(inicio))
+    if fim is not None:
+        condicoes.append("v.data_venda < ?")
+        parametros.append(_formatar_limite(fim))
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    return where, parametros
 
 
 class VendasController:
+    # Colunas aceitas na ordenação da listagem paginada (todas indexadas)
+    COLUNAS_ORDENACAO = {
+        'id': 'v.id',
+        # Vendas sem data entram como '' (as mais antigas), para o cursor da
+        # paginação nunca comparar com NULL; usa idx_vendas_data_venda_ordem
+        'data_venda': "COALESCE(v.data_venda, '')",
+    }
+
     def __init__(self, db_path: str):
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.db_path = db_path
+        self.conn = obter_conexao(db_path)
         self.cursor = self.conn.cursor()
 
+    def _produtos_da_venda(self, cursor, venda_id):
+        cursor.execute("SELECT DISTINCT produto_id FROM itens_venda WHERE venda_id = ?", (venda_id,))
+        return {linha[0] for linha in cursor.fetchall()}
+
+    def _estoque_insuficiente(self, venda_id, itens):
+        """
+        Monta o EstoqueInsuficiente de uma gravação já desfeita, com os produtos
+        cujo estoque não cobre os itens. O que a venda ativa já segura conta
+        como disponível.
+        """
+        pedidos = {}
+        for item in itens:
+            pedidos[item['produto_id']] = pedidos.get(item['produto_id'], 0) + item['quantidade']
+        reservados = {}
+        if venda_id is not None:
+            reservados = dict(self.conn.execute(
+                """SELECT iv.produto_id, SUM(iv.quantidade)
+                   FROM itens_venda iv JOIN vendas v ON v.id = iv.venda_id
+                   WHERE iv.venda_id = ? AND v.status IN ('Pendente', 'Concluída')
+                   GROUP BY iv.produto_id""",
+                (venda_id,)
+            ).fetchall())
+        faltas = []
+        if pedidos:
+            marcadores = ", ".join("?" * len(pedidos))
+            for produto_id, nome, estoque in self.conn.execute(
+                f"SELECT id, nome, estoque_atual FROM produtos WHERE id IN ({marcadores}) ORDER BY nome",
+                list(pedidos)
+            ).fetchall():
+                disponivel = estoque + reservados.get(produto_id, 0)
+                if pedidos[produto_id] > disponivel:
+                    faltas.append((nome, disponivel, pedidos[produto_id]))
+        return EstoqueInsuficiente(faltas)
+
+    def _publicar_estoque(self, produto_ids):
+        # Os gatilhos de estoque alteraram estoque_atual e gravaram movimentações
+        if produto_ids:
+            publicar(self.db_path, 'produtos', sorted(produto_ids), ATUALIZACAO)
+            publicar(self.db_path, 'movimentacao_estoque', (), INSERCAO)
+
     def cadastrar_itens_venda(self, venda_id, itens_data):
         """
         Cadastra os itens de uma venda no banco de dados
@@ -36,25 +196,89 @@ class VendasController:
         itens_ids = []
         try:
             print(f"Venda cadastrada com sucesso! ID: {venda_id}")
-            for item in itens_data:
-                self.cursor.execute(sql, (
+            with transacao(self.db_path) as conn:
+                for item in itens_data:
+                    cursor = conn.execute(sql, (
+                        venda_id,
+                        item['produto_id'],
+                        item['quantidade'],
+                        item['preco_unitario'],
+                        item.get('desconto', 0.0),
+                        item['subtotal']
+                    ))
+                    itens_ids.append(cursor.lastrowid)
+            publicar(self.db_path, 'itens_venda', (venda_id,), INSERCAO)
+            self._publicar_estoque({item['produto_id'] for item in itens_data})
+            return itens_ids
+        except sqlite3.Error as e:
+            print(f"Erro ao cadastrar itens de venda: {e}")
+            return None
+
+    def registrar_venda(self, venda_data):
+        """
+        Grava o cabeçalho e todos os itens de uma venda numa única transação
+
+        Os itens entram com um só executemany; se qualquer instrução falhar
+        (inclusive nos gatilhos de estoque), nada da venda é gravado.
+
+        Args:
+            venda_data (dict): Mesmo formato de cadastrar_venda
+
+        Returns:
+            dict: {'id': ID da venda,
+                   'venda': venda gravada com os itens (como buscar_venda_por_id),
+                   'estoque': {produto_id: estoque_atual após a venda}},
+                  ou None em caso de erro
+
+        Raises:
+            EstoqueInsuficiente: Algum produto não tem estoque para a venda
+        """
+        itens = venda_data.get('itens') or []
+        try:
+            with transacao(self.db_path) as conn:
+                cursor = conn.execute(SQL_INSERIR_VENDA, (
+                    venda_data['cliente_id'],
+                    venda_data['funcionario_id'],
+                    venda_data.get('desconto', 0.0),
+                    venda_data.get('status', 'Pendente'),
+                    venda_data['total'],
+                    venda_data.get('data_venda') or agora_data_venda()
+                ))
+                venda_id = cursor.lastrowid
+                cursor.executemany(SQL_INSERIR_ITEM, [(
                     venda_id,
                     item['produto_id'],
                     item['quantidade'],
                     item['preco_unitario'],
                     item.get('desconto', 0.0),
                     item['subtotal']
-                ))
-                itens_ids.append(self.cursor.lastrowid)
-            self.conn.commit()
-            return itens_ids
+                ) for item in itens])
+
+                produto_ids = sorted({item['produto_id'] for item in itens})
+                estoque = {}
+                if produto_ids:
+                    marcadores = ", ".join("?" * len(produto_ids))
+                    cursor.execute(
+                        f"SELECT id, estoque_atual FROM produtos WHERE id IN ({marcadores})",
+                        produto_ids
+                    )
+                    estoque = dict(cursor.fetchall())
         except sqlite3.Error as e:
-            print(f"Erro ao cadastrar itens de venda: {e}")
+            if _sem_estoque(e):
+                raise self._estoque_insuficiente(None, itens) from e
+            print(f"Erro ao registrar venda: {e}")
             return None
 
+        publicar(self.db_path, 'vendas', (venda_id,), INSERCAO)
+        publicar(self.db_path, 'itens_venda', (venda_id,), INSERCAO)
+        # Venda já cancelada não movimenta o estoque
+        if venda_data.get('status', 'Pendente') != 'Cancelada':
+            self._publicar_estoque(produto_ids)
+        return {'id': venda_id, 'venda': self.buscar_venda_por_id(venda_id), 'estoque': estoque}
+
     def cadastrar_venda(self, venda_data):
         """
-        Cadastra uma nova venda no banco de dados
+        Cadastra uma nova venda no banco de dados (veja registrar_venda)
         
         Args:
             venda_data (dict): Dicionário contendo os dados da venda:
@@ -64,45 +288,20 @@ class VendasController:
                     'desconto': float,
                     'status': str,
                     'total': float,
-                    'data_venda': str,
+                    'data_venda': str (formato YYYY-MM-DD HH:MM:SS),
                     'itens': list
                 }
         
         Returns:
             int: ID da venda cadastrada ou None em caso de erro
+
+        Raises:
+            EstoqueInsuficiente: Algum produto não tem estoque para a venda
         """
-        sql = """INSERT INTO vendas (
-                cliente_id,
-                funcionario_id,
-                desconto,
-                status,
-                total,
-                data_venda
-            ) VALUES (?, ?, ?, ?, ?, ?)"""
-        try:
-            self.cursor.execute("BEGIN TRANSACTION")
-            self.cursor.execute(sql, (
-                venda_data['cliente_id'],
-                venda_data['funcionario_id'],
-                venda_data.get('desconto', 0.0),
-                venda_data.get('status', 'Pendente'),
-                venda_data['total'],
-                venda_data.get('data_venda', 'CURRENT_TIMESTAMP')
-            ))
-            venda_id = self.cursor.lastrowid
-            
-            # Cadastra os itens da venda
-            if venda_data.get('itens'):
-                result = self.cadastrar_itens_venda(venda_id, venda_data['itens'])
-                if result is None:
-                    raise Exception("Erro ao cadastrar itens da venda")
-            
-            self.conn.commit()
-            return venda_id
-        except sqlite3.Error as e:
-            self.conn.rollback()
-            print(f"Erro ao cadastrar venda: {e}")
+        resultado = self.registrar_venda(venda_data)
+        if resultado is None:
             return None
+        return resultado['id']
         
     def listar_vendas(self):
         """
@@ -114,27 +313,212 @@ class VendasController:
         sql = """SELECT v.*, c.nome AS cliente_nome, f.nome AS funcionario_nome
                  FROM vendas v
                  JOIN clientes c ON v.cliente_id = c.id
-                 JOIN funcionarios f ON v.funcionario_id = f.id"""
+                 JOIN funcionarios f ON v.funcionario_id = f.id
+                 ORDER BY v.data_venda DESC, v.id DESC"""
         try:
             self.cursor.execute(sql)
             vendas = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in vendas]
+            return ler_linhas(self.cursor, vendas)
         except sqlite3.Error as e:
             print(f"Erro ao listar vendas: {e}")
             return []
+
+    def listar_vendas_paginado(self, apos=None, limite=TAMANHO_PAGINA, ordenar_por='data_venda', decrescente=True):
+        """
+        Lista uma página de vendas usando paginação por keyset
+
+        Args:
+            apos (tuple, opcional): Cursor 'proximo' devolvido pela página anterior
+            limite (int): Quantidade de registros por página
+            ordenar_por (str): Uma de 'id', 'data_venda'
+            decrescente (bool): Ordena do maior para o menor
+
+        Returns:
+            dict: {'itens': lista de dicionários, 'proximo': cursor da próxima página ou None}
+        """
+        sql = """SELECT v.*, c.nome AS cliente_nome, f.nome AS funcionario_nome
+                 FROM vendas v
+                 JOIN clientes c ON v.cliente_id = c.id
+                 JOIN funcionarios f ON v.funcionario_id = f.id"""
+        try:
+            return listar_pagina(self.cursor, sql, self.COLUNAS_ORDENACAO, ordenar_por,
+                                 apos, limite, decrescente)
+        except sqlite3.Error as e:
+            print(f"Erro ao listar vendas: {e}")
+            return {'itens': [], 'proximo': None}
+
+    def pesquisar_vendas_paginado(self, termo, apos=None, limite=TAMANHO_PAGINA):
+        """
+        Pesquisa vendas no banco, da mais recente para a mais antiga, com a
+        mesma paginação por keyset de listar_vendas_paginado
+
+        O termo é procurado no nome do cliente e do vendedor, no status, na
+        data exibida (dd/mm/aaaa hh:mm:ss) e no ID. Roda numa conexão
+        emprestada do pool, então pode ser chamada fora da thread da
+        interface (ex.: por BuscaAdiada).
+
+        Args:
+            termo (str): Texto digitado no campo de pesquisa
+            apos (tuple, opcional): Cursor 'proximo' devolvido pela página anterior
+            limite (int): Quantidade de registros por página
+
+        Returns:
+            dict: {'itens': lista de dicionários, 'proximo': cursor da próxima página ou None}
+        """
+        sql = """SELECT v.*, c.nome AS cliente_nome, f.nome AS funcionario_nome
+                 FROM vendas v
+                 JOIN clientes c ON v.cliente_id = c.id
+                 JOIN funcionarios f ON v.funcionario_id = f.id"""
+        campos = ("c.nome", "f.nome", "v.status",
+                  "strftime('%d/%m/%Y %H:%M:%S', v.data_venda)", "CAST(v.id AS TEXT)")
+        condicao = " OR ".join(f"{campo} LIKE ? ESCAPE '\\'" for campo in campos)
+        filtro = (condicao, [padrao_like(termo.strip())] * len(campos))
+        try:
+            with obter_pool(self.db_path).emprestar() as conn:
+                return listar_pagina(conn.cursor(), sql, self.COLUNAS_ORDENACAO, 'data_venda',
+                                     apos, limite, True, filtro=filtro)
+        except sqlite3.Error as e:
+            print(f"Erro ao pesquisar vendas: {e}")
+            return {'itens': [], 'proximo': None}
+
+    def buscar_por_ids(self, ids):
+        """
+        Busca várias vendas pelo ID, com as mesmas colunas da listagem paginada
+
+        Usa uma conexão emprestada do pool: roda na thread que entrega a
+        Alteracao, enquanto a interface pode estar usando o cursor do controller
+
+        Args:
+            ids (iterable): IDs das vendas (ex.: os de uma Alteracao)
+
+        Returns:
+            list: Dicionários das vendas encontradas
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        marcadores = ", ".join("?" * len(ids))
+        sql = f"""SELECT v.*, c.nome AS cliente_nome, f.nome AS funcionario_nome
+                  FROM vendas v
+                  JOIN clientes c ON v.cliente_id = c.id
+                  JOIN funcionarios f ON v.funcionario_id = f.id
+                  WHERE v.id IN ({marcadores})"""
+        try:
+            with obter_pool(self.db_path).emprestar() as conn:
+                return ler_linhas(conn.execute(sql, ids))
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar vendas: {e}")
+            return []
+
+    def listar_vendas_por_intervalo(self, inicio, fim):
+        """
+        Lista as vendas com data_venda no intervalo [inicio, fim), usando o
+        índice idx_vendas_data_venda em vez de carregar a tabela inteira
+
+        Args:
+            inicio (datetime.date | datetime.datetime | str): Limite inicial (inclusivo)
+            fim (datetime.date | datetime.datetime | str): Limite final (exclusivo)
+
+        Returns:
+            list: Lista de dicionários com as vendas, da mais recente para a mais antiga
+        """
+        sql = """SELECT v.*, c.nome AS cliente_nome, f.nome AS funcionario_nome
+                 FROM vendas v
+                 JOIN clientes c ON v.cliente_id = c.id
+                 JOIN funcionarios f ON v.funcionario_id = f.id
+                 WHERE v.data_venda >= ? AND v.data_venda < ?
+                 ORDER BY v.data_venda DESC, v.id DESC"""
+        try:
+            self.cursor.execute(sql, (_formatar_limite(inicio), _formatar_limite(fim)))
+            vendas = self.cursor.fetchall()
+            return ler_linhas(self.cursor, vendas)
+        except sqlite3.Error as e:
+            print(f"Erro ao listar vendas por intervalo: {e}")
+            return []
+
+    def contar_vendas(self, inicio=None, fim=None):
+        """
+        Conta as vendas com data_venda em [inicio, fim); sem limites conta todas
+
+        Returns:
+            int: Quantidade de vendas (0 em caso de erro)
+        """
+        where, parametros = _filtro_intervalo(inicio, fim)
+        try:
+            self.cursor.execute(f"SELECT COUNT(*) FROM vendas v {where}", parametros)
+            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Erro ao contar vendas: {e}")
+            return 0
+
+    def exportar_vendas_csv(self, caminho, inicio=None, fim=None, ao_progredir=None, cancelado=None):
+        """
+        Exporta as vendas de [inicio, fim) para CSV (separador ; e decimais com vírgula)
+
+        A consulta roda numa conexão emprestada do pool e as linhas são lidas
+        e gravadas em lotes, então a exportação pode rodar em segundo plano
+        sem ocupar a conexão da tela e sem carregar todas as vendas na memória.
+
+        Args:
+            caminho (str): Arquivo de destino
+            inicio, fim (datetime.date | datetime.datetime | str, opcionais): Intervalo
+                de data_venda; sem limites exporta todas
+            ao_progredir (callable, opcional): Recebe a quantidade de vendas já gravadas
+            cancelado (callable, opcional): Retorna True para interromper a exportação
+                (levanta utils.ExportacaoCancelada)
+
+        Returns:
+            int: Quantidade de vendas exportadas ou None em caso de erro
+        """
+        where, parametros = _filtro_intervalo(inicio, fim)
+        sql = f"""SELECT v.*, c.nome AS cliente_nome, f.nome AS funcionario_nome
+                  FROM vendas v
+                  JOIN clientes c ON v.cliente_id = c.id
+                  JOIN funcionarios f ON v.funcionario_id = f.id
+                  {where}
+                  ORDER BY v.data_venda DESC, v.id DESC"""
+        try:
+            with obter_pool(self.db_path).emprestar() as conn:
+                cursor = conn.execute(sql, parametros)
+                try:
+                    return exportar_cursor_csv(cursor, caminho, ao_progredir, cancelado)
+                finally:
+                    cursor.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Erro ao exportar vendas: {e}")
+            return None
+
+    def listar_vendas_por_periodo(self, periodo, referencia=None):
+        """
+        Lista as vendas de um dia, semana ou mês
+
+        Args:
+            periodo (str): 'dia', 'semana' ou 'mes'
+            referencia (datetime.date, opcional): Data dentro do período; padrão é hoje
+
+        Returns:
+            list: Lista de dicionários com as vendas do período
+        """
+        inicio, fim = intervalo_do_periodo(periodo, referencia)
+        return self.listar_vendas_por_intervalo(inicio, fim)
         
+    def _ler_tabela(self, tabela):
+        # Leitura das listas de referência do cadastro de vendas (cache em referencias)
+        self.cursor.execute(f"SELECT * FROM {tabela}")
+        return ler_linhas(self.cursor)
+
     def listar_produtos(self):
         """
         Lista todos os produtos cadastrados no banco de dados
-        
+
+        A lista vem do cache de referências do tenant, que a descarta a cada
+        alteração em produtos (inclusive a baixa de estoque de uma venda).
+
         Returns:
-            list: Lista de dicionários com os dados dos produtos
+            list: Lista de Linha (somente leitura) com os dados dos produtos
         """
-        sql = "SELECT * FROM produtos"
         try:
-            self.cursor.execute(sql)
-            produtos = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in produtos]
+            return referencias.obter(self.db_path, 'produtos', ('produtos',), lambda: self._ler_tabela('produtos'))
         except sqlite3.Error as e:
             print(f"Erro ao listar produtos: {e}")
             return []
@@ -175,16 +559,7 @@ class VendasController:
             
             # Busca os itens
             self.cursor.execute(sql_itens, (venda_id,))
-            itens_rows = self.cursor.fetchall()
-            
-            # Converte itens para lista de dicionários
-            itens = []
-            if itens_rows:
-                for item_row in itens_rows:
-                    item = dict(zip([column[0] for column in self.cursor.description], item_row))
-                    itens.append(item)
-            
-            venda['itens'] = itens
+            venda['itens'] = ler_linhas(self.cursor)
             return venda
             
         except sqlite3.Error as e:
@@ -202,15 +577,19 @@ class VendasController:
             bool: True se a exclusão foi bem-sucedida, False caso contrário.
         """
         try:
-            # Exclui os itens da venda primeiro devido à chave estrangeira
-            self.cursor.execute("DELETE FROM itens_venda WHERE venda_id = ?", (venda_id,))
-            # Exclui a venda principal
-            self.cursor.execute("DELETE FROM vendas WHERE id = ?", (venda_id,))
-            self.conn.commit()
+            with transacao(self.db_path) as conn:
+                cursor = conn.cursor()
+                produto_ids = self._produtos_da_venda(cursor, venda_id)
+                # Exclui os itens da venda primeiro devido à chave estrangeira
+                cursor.execute("DELETE FROM itens_venda WHERE venda_id = ?", (venda_id,))
+                # Exclui a venda principal
+                cursor.execute("DELETE FROM vendas WHERE id = ?", (venda_id,))
+            publicar(self.db_path, 'itens_venda', (venda_id,), EXCLUSAO)
+            publicar(self.db_path, 'vendas', (venda_id,), EXCLUSAO)
+            self._publicar_estoque(produto_ids)
             return True
         except sqlite3.Error as e:
             print(f"Erro ao excluir venda: {e}")
-            self.conn.rollback()
             return False
 
     def atualizar_venda(self, venda_id, venda_data):
@@ -223,35 +602,146 @@ class VendasController:
 
         Returns:
             bool: True se a atualização foi bem-sucedida, False caso contrário.
+
+        Raises:
+            EstoqueInsuficiente: A venda foi reativada sem estoque para os itens
         """
-        sql = """UPDATE vendas SET
-                cliente_id = ?,
-                funcionario_id = ?,
-                desconto = ?,
-                status = ?,
-                total = ?,
-                data_venda = ?
-            WHERE id = ?"""
         try:
-            self.cursor.execute(sql, (
-                venda_data['cliente_id'],
-                venda_data['funcionario_id'],
-                venda_data.get('desconto', 0.0),
-                venda_data.get('status', 'Pendente'),
-                venda_data['total'],
-                venda_data.get('data_venda', 'CURRENT_TIMESTAMP'),
-                venda_id
-            ))
-            self.conn.commit()
+            with transacao(self.db_path) as conn:
+                cursor = conn.execute(SQL_ATUALIZAR_VENDA, (
+                    venda_data['cliente_id'],
+                    venda_data['funcionario_id'],
+                    venda_data.get('desconto', 0.0),
+                    venda_data.get('status', 'Pendente'),
+                    venda_data['total'],
+                    venda_data.get('data_venda') or agora_data_venda(),
+                    venda_id
+                ))
+                produto_ids = self._produtos_da_venda(cursor, venda_id)
+            publicar(self.db_path, 'vendas', (venda_id,), ATUALIZACAO)
+            # Uma troca de status devolve ou baixa o estoque dos itens
+            self._publicar_estoque(produto_ids)
             return True
         except sqlite3.Error as e:
+            if _sem_estoque(e):
+                itens = self.conn.execute(
+                    "SELECT produto_id, quantidade FROM itens_venda WHERE venda_id = ?", (venda_id,)
+                ).fetchall()
+                raise self._estoque_insuficiente(venda_id, [
+                    {'produto_id': produto_id, 'quantidade': quantidade} for produto_id, quantidade in itens
+                ]) from e
             print(f"Erro ao atualizar venda: {e}")
-            self.conn.rollback()
             return False
 
+    def _aplicar_diferencas_itens(self, cursor, venda_id, itens_data):
+        """
+        Compara os itens gravados da venda com os itens editados (por produto)
+        e executa só os INSERT, UPDATE e DELETE necessários. Deve rodar dentro
+        de uma transação aberta pelo chamador.
+
+        Returns:
+            dict: Quantidade de itens {'inseridos', 'atualizados', 'removidos'}
+        """
+        cursor.execute(
+            """SELECT id, produto_id, quantidade, preco_unitario, desconto, subtotal
+               FROM itens_venda WHERE venda_id = ? ORDER BY id""",
+            (venda_id,)
+        )
+        gravados = {}
+        remover = []
+        for item_id, produto_id, quantidade, preco, desconto, subtotal in cursor.fetchall():
+            if produto_id in gravados:
+                # Linhas repetidas do mesmo produto: mantém a primeira
+                remover.append((item_id,))
+                continue
+            gravados[produto_id] = (item_id, quantidade, preco, desconto, subtotal)
+
+        # Itens editados por produto; repetições do mesmo produto são somadas
+        editados = {}
+        for item in itens_data:
+            quantidade, preco, desconto, subtotal = (
+                item['quantidade'], item['preco_unitario'], item.get('desconto', 0.0), item['subtotal']
+            )
+            anterior = editados.get(item['produto_id'])
+            if anterior is not None:
+                quantidade += anterior[0]
+                desconto += anterior[2]
+                subtotal += anterior[3]
+            editados[item['produto_id']] = (quantidade, preco, desconto, subtotal)
+
+        inserir, mudar_quantidade, mudar_valores = [], [], []
+        for produto_id, novo in editados.items():
+            atual = gravados.pop(produto_id, None)
+            if atual is None:
+                inserir.append((venda_id, produto_id, *novo))
+            elif novo[0] != atual[1]:
+                mudar_quantidade.append((*novo, atual[0]))
+            elif novo[1:] != atual[2:]:
+                mudar_valores.append((*novo[1:], atual[0]))
+        # O que sobrou dos gravados saiu do carrinho
+        remover.extend((item_id,) for item_id, *_ in gravados.values())
+
+        cursor.executemany("DELETE FROM itens_venda WHERE id = ?", remover)
+        cursor.executemany(SQL_ATUALIZAR_ITEM, mudar_quantidade)
+        cursor.executemany(SQL_ATUALIZAR_VALORES_ITEM, mudar_valores)
+        cursor.executemany(SQL_INSERIR_ITEM, inserir)
+        return {
+            'inseridos': len(inserir),
+            'atualizados': len(mudar_quantidade) + len(mudar_valores),
+            'removidos': len(remover),
+        }
+
+    def editar_venda(self, venda_id, venda_data):
+        """
+        Grava a edição de uma venda: cabeçalho e itens numa única transação
+
+        Os itens são comparados com os já gravados, então uma edição que muda
+        uma quantidade altera uma linha e gera uma única movimentação de
+        estoque, em vez de apagar e regravar todos os itens.
+
+        Args:
+            venda_id (int): ID da venda
+            venda_data (dict): Mesmo formato de cadastrar_venda (com 'itens')
+
+        Returns:
+            dict: Quantidade de itens {'inseridos', 'atualizados', 'removidos'},
+                  ou None em caso de erro
+
+        Raises:
+            EstoqueInsuficiente: Algum produto não tem estoque para a edição
+        """
+        try:
+            with transacao(self.db_path) as conn:
+                cursor = conn.cursor()
+                produto_ids = self._produtos_da_venda(cursor, venda_id)
+                produto_ids.update(item['produto_id'] for item in venda_data.get('itens') or [])
+                # O cabeçalho vai antes: uma mudança de status ajusta o estoque dos
+                # itens gravados e as diferenças seguem o novo status
+                cursor.execute(SQL_ATUALIZAR_VENDA, (
+                    venda_data['cliente_id'],
+                    venda_data['funcionario_id'],
+                    venda_data.get('desconto', 0.0),
+                    venda_data.get('status', 'Pendente'),
+                    venda_data['total'],
+                    venda_data.get('data_venda') or agora_data_venda(),
+                    venda_id
+                ))
+                alteracoes = self._aplicar_diferencas_itens(cursor, venda_id, venda_data.get('itens') or [])
+        except sqlite3.Error as e:
+            if _sem_estoque(e):
+                raise self._estoque_insuficiente(venda_id, venda_data.get('itens') or []) from e
+            print(f"Erro ao editar venda: {e}")
+            return None
+
+        publicar(self.db_path, 'vendas', (venda_id,), ATUALIZACAO)
+        if any(alteracoes.values()):
+            publicar(self.db_path, 'itens_venda', (venda_id,), ATUALIZACAO)
+        self._publicar_estoque(produto_ids)
+        return alteracoes
+
     def atualizar_itens_venda(self, venda_id, itens_data):
         """
-        Atualiza os itens de uma venda existente.
+        Atualiza os itens de uma venda existente, gravando só as diferenças.
 
         Args:
             venda_id (int): ID da venda.
@@ -259,20 +749,26 @@ class VendasController:
 
         Returns:
             bool: True se a atualização foi bem-sucedida, False caso contrário.
+
+        Raises:
+            EstoqueInsuficiente: Algum produto não tem estoque para os itens
         """
         try:
-            # Remove itens antigos
-            self.cursor.execute("DELETE FROM itens_venda WHERE venda_id = ?", (venda_id,))
-            # Adiciona novos itens
-            if itens_data:
-                self.cadastrar_itens_venda(venda_id, itens_data)
-            self.conn.commit()
-            return True
+            with transacao(self.db_path) as conn:
+                cursor = conn.cursor()
+                produto_ids = self._produtos_da_venda(cursor, venda_id)
+                produto_ids.update(item['produto_id'] for item in itens_data or [])
+                self._aplicar_diferencas_itens(cursor, venda_id, itens_data or [])
         except sqlite3.Error as e:
+            if _sem_estoque(e):
+                raise self._estoque_insuficiente(venda_id, itens_data or []) from e
             print(f"Erro ao atualizar itens da venda: {e}")
-            self.conn.rollback()
             return False
 
+        publicar(self.db_path, 'itens_venda', (venda_id,), ATUALIZACAO)
+        self._publicar_estoque(produto_ids)
+        return True
+
     def listar_funcionarios(self):
         """
         Lista todos os funcionários cadastrados no banco de dados
@@ -280,11 +776,8 @@ class VendasController:
         Returns:
             list: Lista de dicionários com os dados dos funcionários
         """
-        sql = "SELECT * FROM funcionarios"
         try:
-            self.cursor.execute(sql)
-            funcionarios = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in funcionarios]
+            return referencias.obter(self.db_path, 'funcionarios', ('funcionarios',), lambda: self._ler_tabela('funcionarios'))
         except sqlite3.Error as e:
             print(f"Erro ao listar funcionários: {e}")
             return []
@@ -296,11 +789,8 @@ class VendasController:
         Returns:
             list: Lista de dicionários com os dados dos clientes
         """
-        sql = "SELECT * FROM clientes"
         try:
-            self.cursor.execute(sql)
-            clientes = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in clientes]
+            return referencias.obter(self.db_path, 'clientes', ('clientes',), lambda: self._ler_tabela('clientes'))
         except sqlite3.Error as e:
             print(f"Erro ao listar clientes: {e}")
             return []
@@ -316,12 +806,15 @@ class VendasController:
             bool: True se a remoção foi bem-sucedida, False caso contrário.
         """
         try:
-            self.cursor.execute("DELETE FROM itens_venda WHERE venda_id = ?", (venda_id,))
-            self.conn.commit()
+            with transacao(self.db_path) as conn:
+                cursor = conn.cursor()
+                produto_ids = self._produtos_da_venda(cursor, venda_id)
+                cursor.execute("DELETE FROM itens_venda WHERE venda_id = ?", (venda_id,))
+            publicar(self.db_path, 'itens_venda', (venda_id,), EXCLUSAO)
+            self._publicar_estoque(produto_ids)
             return True
         except sqlite3.Error as e:
             print(f"Erro ao remover itens da venda: {e}")
-            self.conn.rollback()
             return False
 
     def listar_itens_venda(self):
@@ -337,15 +830,7 @@ class VendasController:
         try:
             self.cursor.execute(sql)
             itens_venda = self.cursor.fetchall()
-            return [dict(zip([column[0] for column in self.cursor.description], row)) for row in itens_venda]
+            return ler_linhas(self.cursor, itens_venda)
         except sqlite3.Error as e:
             print(f"Erro ao listar itens de venda: {e}")
             return []
-        
-
-    def __del__(self):
-        """
-        Fecha a conexão com o banco de dados ao deletar a instância
-        """
-        self.conn.close()
-        print("Conexão com o banco de dados fechada.")
\ No newline at end of file
@@ -1,7 +1,34 @@
+import importlib
 import flet as ft
-from routes import login, home, cadastro_login, clientes, vendas, cadastro_vendas, \
-                    fornecedores, produtos, relatorios, funcionarios, configuracoes, \
-                    estoque
+from componentes.relogio import obter_relogio
+from componentes.cache_views import obter_cache_views
+
+# Rota -> módulo com a função View(page). Os módulos são importados só na
+# primeira navegação para a rota, então a tela de login abre sem carregar
+# os controllers e as dependências das outras telas. Módulos que declaram
+# TABELAS têm a view guardada no cache da sessão (ver CacheViews).
+ROTAS = {
+    "/login": "routes.login",
+    "/home": "routes.home",
+    "/cadastro_login": "routes.cadastro_login",
+    "/produtos": "routes.produtos",
+    "/clientes": "routes.clientes",
+    "/vendas": "routes.vendas",
+    "/fornecedores": "routes.fornecedores",
+    "/cadastro_vendas": "routes.cadastro_vendas",
+    "/relatorios": "routes.relatorios",
+    "/funcionarios": "routes.funcionarios",
+    "/configuracoes": "routes.configuracoes",
+    "/estoque": "routes.estoque",
+}
+
+
+def carregar_rota(rota: str):
+    """Retorna o módulo da rota (importando-o na primeira vez), ou None."""
+    modulo = ROTAS.get(rota)
+    if modulo is None:
+        return None
+    return importlib.import_module(modulo)
 
 
 def main(page: ft.Page):
@@ -16,36 +43,21 @@ def main(page: ft.Page):
     page.title = "SEVEN SYSTEM"
 
     def route_change(e: ft.RouteChangeEvent):
-        # Sempre limpe a pilha de views e adicione a view inicial
-        # Isso garante que você está sempre começando com uma tela limpa para a rota atual
+        # A pilha de views sempre contém só a view da rota atual
         page.views.clear() 
+        # Relógios das views anteriores deixam de ser atualizados
+        obter_relogio(page).ao_mudar_rota(page.route)
+
+        # Reaproveita a view guardada da rota ou monta uma nova
+        modulo = carregar_rota(page.route)
+        view = obter_cache_views(page).abrir(
+            page.route,
+            (lambda: modulo.View(page)) if modulo is not None else None,
+            getattr(modulo, "TABELAS", None)
+        )
+        if view is not None:
+            page.views.append(view)
 
-        # Adicione a view da rota atual
-        if page.route == "/login":
-            page.views.append(login.View(page))
-        elif page.route == "/home":
-            page.views.append(home.View(page))
-        elif page.route == "/cadastro_login":
-            page.views.append(cadastro_login.View(page))
-        elif page.route == "/produtos":
-            page.views.append(produtos.View(page))
-        elif page.route == "/clientes":
-            page.views.append(clientes.View(page))
-        elif page.route == "/vendas":
-            page.views.append(vendas.View(page))
-        elif page.route == "/fornecedores": 
-            page.views.append(fornecedores.View(page))
-        elif page.route == "/cadastro_vendas":
-            page.views.append(cadastro_vendas.View(page))
-        elif page.route == "/relatorios":
-            page.views.append(relatorios.View(page))
-        elif page.route == "/funcionarios":
-            page.views.append(funcionarios.View(page))
-        elif page.route == "/configuracoes":
-            page.views.append(configuracoes.View(page))
-        elif page.route == "/estoque":
-            page.views.append(estoque.View(page))
-        
         page.update()
 
     # Função para manipular o "voltar" do appbar (se houver)
@@ -1,14 +1,14 @@
 import flet as ft
 import re
-from storage_manager import create_user, init_db
+from autenticacao import obter_servico
 
 def View(page: ft.Page):
     """Tela de cadastro de usuários
     Possui os campos de nome completo, e-mail, nome de usuário, empresa, senha e confirmação de senha.
     """
     page.title = "Cadastro de Usuário"
-    # Inicializa o banco de dados
-    init_db()
+    # Inicializa o banco de dados (o serviço cria a tabela de usuários)
+    servico = obter_servico()
     
     def VaiPraHome(e):
         page.go("/login")
@@ -27,7 +27,7 @@ def View(page: ft.Page):
         senha_status.color = cor
         page.update()
 
-    def senhas(e):
+    async def senhas(e):
         """Verifica se as senhas coincidem.
         Caso elas coincidam, um usuário é criado e redirecionado para a tela de login.
         """
@@ -50,7 +50,17 @@ def View(page: ft.Page):
             page.update()
             return
 
-        if create_user(nome, email, empresa, usuario, senha):
+        # O hash da senha roda no pool do serviço; a tela só aguarda
+        criar.disabled = True
+        progresso.visible = True
+        page.update()
+        try:
+            criado = await servico.cadastrar(nome, email, empresa, usuario, senha)
+        finally:
+            criar.disabled = False
+            progresso.visible = False
+
+        if criado:
             result.value = "Usuário criado com sucesso!"
             result.color = ft.Colors.GREEN
             page.update()
@@ -77,6 +87,7 @@ def View(page: ft.Page):
     txtConfirma = ft.TextField(label="Confirme a senha", password=True, width=350)
     senha_status = ft.Text(value="", size=12)
     result = ft.Text()
+    progresso = ft.ProgressRing(width=24, height=24, stroke_width=3, visible=False)
 
     criar = ft.ElevatedButton(
         text="Criar",
@@ -102,6 +113,7 @@ def View(page: ft.Page):
                 senha_status,
                 txtConfirma,
                 criar,
+                progresso,
                 result
             ],
             spacing=15,
@@ -1,22 +1,40 @@
 import flet as ft
-import datetime
 import globals
-import asyncio
-from database.vendas_controller import VendasController
+from database.vendas_controller import VendasController, EstoqueInsuficiente, agora_data_venda
+from database.produtos_controller import ProdutosController
+from database.catalogo import IndiceCatalogo
+from componentes.tabela import TabelaChaveada
+from componentes.relogio import obter_relogio
+from componentes.cache_views import obter_cache_views
+from database.eventos import EXCLUSAO
 
 venda_atual = []
 venda_id = None
 
-_clock_task = None
-
 def View(page: ft.Page):
     db_vendas = VendasController(page.client_storage.get("user_db"))
-    global _clock_task
+    db_produtos = ProdutosController(page.client_storage.get("user_db"))
     produtos = db_vendas.listar_produtos()
     clientes = db_vendas.listar_clientes()
-    print(clientes)
     funcionarios = db_vendas.listar_funcionarios()
 
+    # Índices montados uma vez por view: as buscas a cada tecla não percorrem as listas
+    catalogo = IndiceCatalogo(produtos, campo_codigo="codigo_barras")
+    indice_clientes = IndiceCatalogo(clientes)
+    indice_funcionarios = IndiceCatalogo(funcionarios)
+
+    def atualizar_catalogo(alteracao):
+        # Estoque baixado por vendas de outros caixas e produtos editados
+        # enquanto esta tela está aberta
+        if alteracao.operacao == EXCLUSAO:
+            for produto_id in alteracao.ids:
+                catalogo.remover(produto_id)
+            return
+        for produto in db_produtos.buscar_por_ids(alteracao.ids):
+            catalogo.atualizar(produto)
+
+    obter_cache_views(page).assinar(("produtos",), atualizar_catalogo)
+
     nome_empresa = ft.Text(
         color=ft.Colors.WHITE,
         size=16,
@@ -25,18 +43,10 @@ def View(page: ft.Page):
     )
 
     def vaiPraVendas(e):
-        # Ao sair da View, cancela a tarefa do relógio
-        if _clock_task and not _clock_task.done():
-            _clock_task.cancel()
-            print("Tarefa atualiza_tempo cancelada.") # Para depuração
         page.go("/vendas")
 
-    sugestoes_clientes = [c["nome"] for c in clientes]
-    print(f"Sugestões de clientes: {sugestoes_clientes}")  # Para depuração
-
     def sugerir_cliente(e):
-        texto = cliente_input.value.lower()
-        cliente_input.autosuggest_options = [nome for nome in sugestoes_clientes if texto in nome.lower()]
+        cliente_input.autosuggest_options = [c["nome"] for c in indice_clientes.buscar(cliente_input.value)]
         # Limpa o erro ao digitar
         if cliente_input.error_text:
             cliente_input.error_text = None
@@ -59,20 +69,14 @@ def View(page: ft.Page):
         Retorna o ID do cliente dado o nome.
         Se não encontrar, retorna None.
         """
-        for cliente in clientes:
-            if cliente["nome"].lower() == nome.strip().lower():
-                return cliente["id"]
-        return None
+        return indice_clientes.id_por_nome(nome)
     
     def get_funcionario_id(nome):
         """
         Retorna o ID do funcionário dado o nome.
         Se não encontrar, retorna None.
         """
-        for funcionario in funcionarios:
-            if funcionario["nome"].lower() == nome.strip().lower():
-                return funcionario["id"]
-        return None
+        return indice_funcionarios.id_por_nome(nome)
 
     def on_vendedor_change(e):
         # Limpa o erro ao selecionar um valor
@@ -83,7 +87,7 @@ def View(page: ft.Page):
 
     vendedor_dropdown = ft.Dropdown(
         label="Vendedor Responsável",
-        options=[ft.dropdown.Option(f["nome"]) for f in db_vendas.listar_funcionarios()],
+        options=[ft.dropdown.Option(f["nome"]) for f in funcionarios],
         width=250,
         filled=True,
         fill_color=ft.Colors.GREY_100,
@@ -157,14 +161,14 @@ def View(page: ft.Page):
     ], alignment=ft.MainAxisAlignment.START)
 
     def buscar_produto(e):
-        nome_ou_id = produto_input.value.lower()
-        p = next((p for p in produtos if nome_ou_id in p["nome"].lower() or nome_ou_id == str(p["id"])), None)
+        nome_ou_id = produto_input.value.strip()
+        p = catalogo.primeiro(nome_ou_id)
         preco_unitario.value = f"{p['preco']:.2f}" if p else ""
         if not p and nome_ou_id: # Se não encontrou o produto e o campo não está vazio
             produto_input.error_text = "Produto não encontrado."
             produto_input.border_color = ft.Colors.RED_400
-        elif p and nome_ou_id and p['estoque_atual'] <= 0:
-            produto_input.error_text = f"Produto fora de estoque ({p['estoque_atual']} unidades disponíveis)."
+        elif p and nome_ou_id and estoque_disponivel(p) <= 0:
+            produto_input.error_text = f"Produto fora de estoque ({estoque_disponivel(p)} unidades disponíveis)."
             produto_input.border_color = ft.Colors.RED_400
         else:
             produto_input.error_text = None
@@ -185,41 +189,89 @@ def View(page: ft.Page):
         rows=[]
     )
 
-    def atualizar_lista_itens():
-        tabela_itens.rows.clear()
-        for i, item in enumerate(venda_atual):
-            tabela_itens.rows.append(
-                ft.DataRow(
-                    cells=[
-                        ft.DataCell(ft.Text(str(item["produto_id"]))),
-                        ft.DataCell(ft.Text(item["nome"])),
-                        ft.DataCell(ft.Text(str(item["quantidade"]))),
-                        ft.DataCell(ft.Text(f"R$ {item['desconto']:.2f}".replace(",", "X").replace(".", ",").replace("X", "."))), # Formato BR
-                        ft.DataCell(ft.Text(f"R$ {item['preco_unitario']:.2f}".replace(",", "X").replace(".", ",").replace("X", "."))), # Formato BR
-                        ft.DataCell(ft.Text(f"R$ {item['subtotal']:.2f}".replace(",", "X").replace(".", ",").replace("X", "."))), # Formato BR
-                        ft.DataCell(
-                            ft.IconButton(
-                                icon=ft.Icons.DELETE,
-                                icon_color=ft.Colors.RED,
-                                on_click=lambda e, index=i: remover_produto(index)
-                            )
-                        )
-                    ]
+    def enviar(*controles):
+        """Envia ao cliente só os controles alterados que já estão na tela."""
+        for controle in controles:
+            if controle.page is not None:
+                controle.update()
+
+    def criar_linha_item(item):
+        return ft.DataRow(
+            cells=[
+                ft.DataCell(ft.Text(str(item["produto_id"]))),
+                ft.DataCell(ft.Text(item["nome"])),
+                ft.DataCell(ft.Text(str(item["quantidade"]))),
+                ft.DataCell(ft.Text(f"R$ {item['desconto']:.2f}".replace(",", "X").replace(".", ",").replace("X", "."))), # Formato BR
+                ft.DataCell(ft.Text(f"R$ {item['preco_unitario']:.2f}".replace(",", "X").replace(".", ",").replace("X", "."))), # Formato BR
+                ft.DataCell(ft.Text(f"R$ {item['subtotal']:.2f}".replace(",", "X").replace(".", ",").replace("X", "."))), # Formato BR
+                ft.DataCell(
+                    ft.IconButton(
+                        icon=ft.Icons.DELETE,
+                        icon_color=ft.Colors.RED,
+                        on_click=lambda e, pid=item["produto_id"]: remover_produto(pid)
+                    )
                 )
-            )
+            ]
+        )
+
+    # Uma linha por produto: uma nova leitura do mesmo produto soma na linha existente
+    itens_tabela = TabelaChaveada(tabela_itens, criar_linha_item, chave="produto_id")
+
+    def atualizar_lista_itens():
+        itens_tabela.sincronizar(venda_atual)
         atualizar_valores()
         page.update()
 
-    def remover_produto(index):
-        venda_atual.pop(index)
-        atualizar_lista_itens()
+    def remover_produto(produto_id):
+        venda_atual[:] = [item for item in venda_atual if item["produto_id"] != produto_id]
+        itens_tabela.remover(produto_id)
+        atualizar_valores()
+
+    def quantidade_no_carrinho(produto_id):
+        return sum(item["quantidade"] for item in venda_atual if item["produto_id"] == produto_id)
+
+    # Quantidades que a venda em edição já tirou do estoque (Pendente ou
+    # Concluída), por produto: voltam a ficar livres se saírem do carrinho
+    reservado_na_venda = {}
+
+    def estoque_disponivel(produto):
+        return produto["estoque_atual"] + reservado_na_venda.get(produto["id"], 0)
+
+    def incluir_no_carrinho(produto, qtd):
+        """
+        Soma a quantidade na linha do produto ou cria a linha, enviando
+        apenas essa linha da tabela e os totais.
+        """
+        for i, item in enumerate(venda_atual):
+            if item["produto_id"] == produto["id"]:
+                quantidade = item["quantidade"] + qtd
+                # Um novo dicionário, para a tabela perceber que a linha mudou
+                novo = {
+                    **item,
+                    "quantidade": quantidade,
+                    "subtotal": item["preco_unitario"] * quantidade - item["desconto"]
+                }
+                venda_atual[i] = novo
+                break
+        else:
+            novo = {
+                "produto_id": produto["id"],
+                "nome": produto["nome"],
+                "quantidade": qtd,
+                "preco_unitario": float(produto["preco"]),
+                "desconto": 0.0,
+                "subtotal": float(produto["preco"]) * qtd
+            }
+            venda_atual.append(novo)
+        itens_tabela.inserir(novo)
+        atualizar_valores()
 
     def adicionar_produto(e):
-        nome_ou_id = produto_input.value.lower()
+        nome_ou_id = produto_input.value
         qtd_str = quantidade_valor.value
         
         # Validação de campo de produto e quantidade
-        produto_encontrado = next((p for p in produtos if nome_ou_id in p["nome"].lower() or nome_ou_id == str(p["id"])), None)
+        produto_encontrado = catalogo.primeiro(nome_ou_id)
         
         has_error = False
 
@@ -247,8 +299,8 @@ def View(page: ft.Page):
             quantidade_valor.border_color = ft.Colors.RED_400
             has_error = True
         
-        if produto_encontrado['estoque_atual'] < qtd:
-            produto_input.error_text = f"Quantidade solicitada ({qtd}) maior que o estoque disponível ({produto_encontrado['estoque']})."
+        if not has_error and estoque_disponivel(produto_encontrado) < qtd + quantidade_no_carrinho(produto_encontrado['id']):
+            produto_input.error_text = f"Quantidade solicitada ({qtd}) maior que o estoque disponível ({estoque_disponivel(produto_encontrado)})."
             produto_input.border_color = ft.Colors.RED_400
             has_error = True
 
@@ -259,19 +311,50 @@ def View(page: ft.Page):
     
 
         # Se tudo estiver ok, adiciona o produto
-        subtotal = float(produto_encontrado["preco"]) * qtd
-        venda_atual.append({
-            "produto_id": produto_encontrado["id"],
-            "nome": produto_encontrado["nome"],
-            "quantidade": qtd,
-            "preco_unitario": float(produto_encontrado["preco"]),
-            "desconto": 0.0,
-            "subtotal": subtotal
-        })
+        incluir_no_carrinho(produto_encontrado, qtd)
         produto_input.value = ""
         quantidade_valor.value = "1"
         preco_unitario.value = ""
-        atualizar_lista_itens()
+        enviar(produto_input, quantidade_valor, preco_unitario)
+
+    def ler_codigo_barras(e):
+        """
+        Modo leitor: o leitor digita o código e envia Enter, então cada
+        leitura completa chega num único on_submit (sem on_change por tecla).
+        """
+        codigo = codigo_barras_input.value.strip()
+        codigo_barras_input.value = ""
+        if not codigo:
+            return
+        produto = catalogo.obter_por_codigo(codigo)
+        if produto is None:
+            # Produto cadastrado depois que a tela foi aberta
+            produto = db_produtos.buscar_por_codigo_barras(codigo)
+            if produto is not None:
+                catalogo.atualizar(produto)
+
+        if produto is None:
+            codigo_barras_input.error_text = f"Código {codigo} não cadastrado."
+        elif estoque_disponivel(produto) < quantidade_no_carrinho(produto["id"]) + 1:
+            codigo_barras_input.error_text = f"{produto['nome']} sem estoque ({estoque_disponivel(produto)} unidades disponíveis)."
+        else:
+            codigo_barras_input.error_text = None
+            incluir_no_carrinho(produto, 1)
+        # focus() também envia o campo (valor limpo e mensagem de erro)
+        codigo_barras_input.focus()
+
+    codigo_barras_input = ft.TextField(
+        label="Código de barras",
+        hint_text="Leia o código do produto",
+        width=250,
+        autofocus=True,
+        prefix_icon=ft.Icons.QR_CODE_SCANNER,
+        on_submit=ler_codigo_barras,
+        filled=True,
+        fill_color=ft.Colors.GREY_100,
+        error_text=None,
+        error_style=ft.TextStyle(color=ft.Colors.RED_400, size=12)
+    )
 
     def atualizar_valores():
         try:
@@ -283,23 +366,16 @@ def View(page: ft.Page):
             desconto = 0.0
             desconto_global.error_text = "Desconto inválido."
             desconto_global.border_color = ft.Colors.RED_400
-            page.update()
+            enviar(desconto_global)
             return # Sai da função se houver erro no desconto
 
         total = max(subtotal - desconto, 0)
         subtotal_text.value = f"Subtotal: R$ {subtotal:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") # Formato BR
         total_text.value = f"TOTAL: R$ {total:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") # Formato BR
-        page.update()
+        enviar(subtotal_text, desconto_global, total_text)
 
     hora_atual = ft.Text("", color=ft.Colors.WHITE)
-    def atualizar_hora():
-        hora_atual.value = f"Hoje: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"
-        page.update()
-
-    async def atualiza_tempo():
-        while True:
-            atualizar_hora()
-            await asyncio.sleep(1)
+    obter_relogio(page).registrar(hora_atual, "/cadastro_vendas")
 
     logo = ft.Image(src="seven.png", width=50, height=50, fit=ft.ImageFit.CONTAIN)
 
@@ -340,6 +416,7 @@ def View(page: ft.Page):
         quantidade_valor.value = "1"
         preco_unitario.value = ""
         globals.venda_em_edicao = None
+        reservado_na_venda.clear()
         atualizar_lista_itens()
         
 
@@ -427,7 +504,7 @@ def View(page: ft.Page):
             "desconto": desconto,
             "status": status,
             "total": total,
-            "data_venda": datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+            "data_venda": agora_data_venda(),
             "itens": [{
                 "produto_id": item["produto_id"],
                 "quantidade": item["quantidade"],
@@ -439,21 +516,16 @@ def View(page: ft.Page):
 
         try:
             if globals.venda_em_edicao is not None:  # Modo edição
-            # Primeiro remove os itens antigos
-                if db_vendas.remover_itens_venda(globals.venda_em_edicao):
-                    # Depois atualiza a venda e adiciona os novos itens
-                    if db_vendas.atualizar_venda(globals.venda_em_edicao, venda_data) and \
-                    db_vendas.atualizar_itens_venda(globals.venda_em_edicao, venda_data["itens"]):
-                        page.snack_bar = ft.SnackBar(
-                            content=ft.Text(f"Venda {globals.venda_em_edicao} atualizada com sucesso!", color=ft.Colors.WHITE),
-                            bgcolor=ft.Colors.GREEN_700
-                        )
-                        venda_id = globals.venda_em_edicao  # Mantém o ID da venda editada
-                        vaiPraVendas(e)
-                    else:
-                        raise Exception("Erro ao atualizar venda no banco de dados")
+                # Cabeçalho e itens numa transação, gravando só os itens alterados
+                if db_vendas.editar_venda(globals.venda_em_edicao, venda_data) is not None:
+                    page.snack_bar = ft.SnackBar(
+                        content=ft.Text(f"Venda {globals.venda_em_edicao} atualizada com sucesso!", color=ft.Colors.WHITE),
+                        bgcolor=ft.Colors.GREEN_700
+                    )
+                    venda_id = globals.venda_em_edicao  # Mantém o ID da venda editada
+                    vaiPraVendas(e)
                 else:
-                    raise Exception("Erro ao remover itens antigos da venda")
+                    raise Exception("Erro ao atualizar venda no banco de dados")
             else:  # Nova venda
                 # Cadastra nova venda
                 novo_venda_id = db_vendas.cadastrar_venda(venda_data)
@@ -477,6 +549,15 @@ def View(page: ft.Page):
             else:
                 pass
 
+        except EstoqueInsuficiente as ex:
+            # Nada foi gravado: o carrinho continua como está para ser ajustado
+            page.snack_bar = ft.SnackBar(
+                content=ft.Text(str(ex), color=ft.Colors.WHITE),
+                bgcolor=ft.Colors.ORANGE_700
+            )
+            page.snack_bar.open = True
+            page.update()
+
         except Exception as ex:
             page.snack_bar = ft.SnackBar(
                 content=ft.Text(f"Erro ao salvar venda: {str(ex)}", color=ft.Colors.WHITE),
@@ -485,12 +566,6 @@ def View(page: ft.Page):
             page.snack_bar.open = True
             page.update()
 
-
-    # Inicia a tarefa do relógio apenas uma vez por View
-    if not _clock_task or _clock_task.done():
-        _clock_task = page.run_task(atualiza_tempo)
-        print("Tarefa atualiza_tempo iniciada (cadastro_vendas).")
-
     if globals.venda_em_edicao is not None:
         # Busca a venda do banco de dados
         venda_edit = db_vendas.buscar_venda_por_id(globals.venda_em_edicao)
@@ -503,15 +578,26 @@ def View(page: ft.Page):
             
             # Preenche os itens da venda
             venda_atual.clear()
+            por_produto = {}
             for item in venda_edit['itens']:
-                venda_atual.append({
+                existente = por_produto.get(item['produto_id'])
+                if existente is not None:
+                    # O carrinho tem uma linha por produto; junta itens repetidos
+                    existente["quantidade"] += item['quantidade']
+                    existente["desconto"] += item['desconto']
+                    existente["subtotal"] += item['subtotal']
+                    continue
+                por_produto[item['produto_id']] = {
                     "produto_id": item['produto_id'],
                     "nome": item['produto_nome'],
                     "quantidade": item['quantidade'],
                     "preco_unitario": item['preco_unitario'],
                     "desconto": item['desconto'],
                     "subtotal": item['subtotal']
-                })
+                }
+            venda_atual.extend(por_produto.values())
+            if venda_edit['status'] in ('Pendente', 'Concluída'):
+                reservado_na_venda.update((pid, item["quantidade"]) for pid, item in por_produto.items())
             atualizar_lista_itens()
             
             # Define o venda_id global para edição
@@ -546,6 +632,7 @@ def View(page: ft.Page):
                             ft.Text("CAIXA LIVRE - VENDA", size=20, color=ft.Colors.WHITE, weight=ft.FontWeight.BOLD),
                             vendedor_dropdown,
                             cliente_input,
+                            codigo_barras_input,
                             produto_input,
                             quantidade_input,
                             preco_unitario,
@@ -2,20 +2,24 @@
 import flet as ft
 import datetime
 import re
-import requests
-from data import clientes
 from database.clientes_controller import ClientesController
+from componentes.paginacao import CarregadorPaginas
+from componentes.busca import BuscaAdiada, avisar_truncamento
+from componentes.tabela import TabelaChaveada
+from componentes.cache_views import obter_cache_views
+
+TABELAS = ("clientes",)
 
 def View(page: ft.Page):
     db_clientes = ClientesController(page.client_storage.get("user_db"))
-    cliente_para_excluir = {"index": None}
-    cliente_em_edicao = {"index": None}
+    cliente_para_excluir = {"id": None}
+    cliente_em_edicao = {"id": None}
     id_field = ft.TextField(label="ID", read_only=True, width=120)
 
     def voltar_home(e):
         page.go("/home")
 
-    def criar_linha_tabela(i, c):
+    def criar_linha_tabela(c):
         endereco_completo = ""
         if c.get("endereco"):
             endereco_completo += c["endereco"]
@@ -43,35 +47,32 @@ def View(page: ft.Page):
                         ft.IconButton(
                             icon=ft.Icons.EDIT,
                             icon_color=ft.Colors.BLUE,
-                            on_click=lambda e, idx=i: editar_cliente(idx)(e)
+                            on_click=lambda e, cid=c["id"]: editar_cliente(cid)(e)
                         ),
                         ft.IconButton(
                             icon=ft.Icons.DELETE,
                             icon_color=ft.Colors.RED,
-                            on_click=lambda e, idx=i: excluir_cliente(idx)(e)
+                            on_click=lambda e, cid=c["id"]: excluir_cliente(cid)(e)
                         ),
                     ], spacing=5)
                 ),
             ]
         )
 
+    def adicionar_pagina(novos):
+        linhas.acrescentar(novos)
+
+    paginas = CarregadorPaginas(db_clientes.listar_clientes_paginado, adicionar_pagina)
+
     def atualizar_lista():
-        tabela.rows.clear()
-        if clientes:
-            for i, c in enumerate(clientes):
-                print(i, c)
-                tabela.rows.append(criar_linha_tabela(i, c))
-        elif not clientes:
-            clientes.clear()
-            clientes.extend(db_clientes.listar_clientes())
-            for i, c in enumerate(clientes):
-                tabela.rows.append(criar_linha_tabela(i, c))  
-        page.update()
+        linhas.limpar()
+        if not paginas.reiniciar():
+            page.update()
 
-    def editar_cliente(index):
+    def editar_cliente(cliente_id):
         def handler(e):
-            cliente_em_edicao["index"] = index
-            c = clientes[index]
+            cliente_em_edicao["id"] = cliente_id
+            c = linhas.get(cliente_id)
             id_field.value = str(c["id"])
             nome_field.value = c["nome"]
             cpf_cnpj_field.value = c["cpf_cnpj"]
@@ -85,40 +86,21 @@ def View(page: ft.Page):
             numero_field.value = c.get("numero", "")
             complemento_field.value = c.get("complemento", "")
             data_field.value = c["data_cadastro"]
-            cliente_data = {
-                "id": c["id"],
-                "nome": c["nome"],
-                "cpf_cnpj": c["cpf_cnpj"],
-                "telefone": c["telefone"],
-                "email": c["email"],
-                "cep": c["cep"],
-                "bairro": c.get("bairro", ""),
-                "cidade": c.get("cidade", ""),
-                "estado": c.get("estado", ""),
-                "endereco": c.get("endereco", ""),
-                "numero": c.get("numero", ""),
-                "complemento": c.get("complemento", ""),
-                "data_cadastro": c["data_cadastro"]
-            }
-            db_clientes.atualizar_cliente(c["id"], cliente_data)
-            print(db_clientes.listar_clientes())
             dialog.open = True
             page.update()
         return handler
 
-    def excluir_cliente(index):
+    def excluir_cliente(cliente_id):
         def handler(e):
-            cliente_para_excluir["index"] = index
+            cliente_para_excluir["id"] = cliente_id
             confirm_dialog.open = True
             page.update()
         return handler
 
     def confirmar_exclusao(e):
-        index = cliente_para_excluir["index"]
-        if index is not None:
-            clientes.pop(index)
-            db_clientes.excluir_cliente(index)
-            atualizar_lista()
+        cliente_id = cliente_para_excluir["id"]
+        if cliente_id is not None:
+            db_clientes.excluir_cliente(cliente_id)
         confirm_dialog.open = False
         page.update()
 
@@ -131,7 +113,7 @@ def View(page: ft.Page):
         page.update()
 
     def limpar_campos():
-        id_field.value = str(max([c["id"] for c in clientes], default=0) + 1)
+        id_field.value = str(max(linhas.registros, default=0) + 1)
         nome_field.value = ""
         cpf_cnpj_field.value = ""
         telefone_field.value = ""
@@ -184,13 +166,12 @@ def View(page: ft.Page):
             "data_cadastro": data_field.value
         }
 
-        if cliente_em_edicao["index"] is None:
-            clientes.append(novo_cliente)
+        # A linha afetada chega à tabela pela assinatura de "clientes"
+        if cliente_em_edicao["id"] is None:
             db_clientes.cadastrar_cliente(novo_cliente)
         else:
-            clientes[cliente_em_edicao["index"]] = novo_cliente
+            db_clientes.atualizar_cliente(cliente_em_edicao["id"], novo_cliente)
 
-        atualizar_lista()
         dialog.open = False
         page.update()
 
@@ -202,6 +183,8 @@ def View(page: ft.Page):
         cep = cep_field.value.strip().replace("-", "")
         if re.fullmatch(r"\d{8}", cep):
             try:
+                # Importado aqui: só a busca de CEP usa o requests
+                import requests
                 r = requests.get(f"https://viacep.com.br/ws/{cep}/json/").json()
                 if "erro" not in r:
                     endereco_field.value = r.get("logradouro", "")
@@ -301,24 +284,26 @@ def View(page: ft.Page):
     page.overlay.append(confirm_dialog)
 
     campo_pesquisa = ft.TextField(
-        label="Pesquisar cliente (por nome, CPF/CNPJ, telefone ou ID)",
+        label="Pesquisar cliente (por ID, nome, CPF/CNPJ ou telefone)",
         visible=True,
-        on_change=lambda e: filtrar_clientes(e.control.value),
+        on_change=lambda e: busca.ao_digitar(e),
         prefix_icon=ft.Icons.SEARCH,
         width=500
     )
 
-    def filtrar_clientes(query):
-        tabela.rows.clear()
-        for i, c in enumerate(clientes):
-            if (
-                query.lower() in c["nome"].lower()
-                or query in c["cpf_cnpj"].lower()
-                or query in c["telefone"].lower()
-                or query == str(c["id"])
-            ):
-                tabela.rows.append(criar_linha_tabela(i, c))
-        page.update()
+    def buscar_clientes(query):
+        # Roda fora do loop de eventos; texto vazio volta para a listagem paginada
+        return db_clientes.buscar(query) if query.strip() else None
+
+    def filtrar_clientes(query, resultados):
+        avisar_truncamento(campo_pesquisa, resultados)
+        if resultados is None:
+            atualizar_lista()
+            return
+        # Linhas que já estavam na tela e não mudaram são reaproveitadas
+        linhas.sincronizar(resultados["itens"])
+
+    busca = BuscaAdiada(page, buscar_clientes, filtrar_clientes)
 
     tabela = ft.DataTable(
         columns=[
@@ -335,6 +320,11 @@ def View(page: ft.Page):
         ],
         rows=[]
     )
+    linhas = TabelaChaveada(tabela, criar_linha_tabela)
+    # Só as linhas alteradas (aqui ou em outra tela) são relidas do banco
+    obter_cache_views(page).assinar(
+        ("clientes",), lambda alteracao: linhas.aplicar(alteracao, db_clientes.buscar_por_ids)
+    )
 
     atualizar_lista()
 
@@ -357,6 +347,8 @@ def View(page: ft.Page):
                             tabela, ft.Divider()
                         ],
                         scroll=ft.ScrollMode.AUTO,
+                        # Carrega a próxima página ao chegar perto do fim (exceto durante a pesquisa)
+                        on_scroll=lambda e: None if campo_pesquisa.value else paginas.ao_rolar(e),
                         expand=True
                     ),
                     ft.Container(
@@ -364,7 +356,7 @@ def View(page: ft.Page):
                             text="Cadastrar",
                             icon=ft.Icons.ADD,
                             on_click=lambda e: (
-                                cliente_em_edicao.update({"index": None}), # Reseta o estado
+                                cliente_em_edicao.update({"id": None}), # Reseta o estado
                                 limpar_campos(),
                                 setattr(dialog, 'open', True),
                                 page.update()
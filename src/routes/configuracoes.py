@@ -2,6 +2,7 @@ import flet as ft
 import hashlib
 import os
 from storage_manager import get_db_connection, get_user_data
+from componentes.cache_views import obter_cache_views
 
 def View(page: ft.Page):
     usuario_logado = page.client_storage.get("usuario_logado")
@@ -33,6 +34,7 @@ def View(page: ft.Page):
 
             # Atualiza no client storage
             page.client_storage.set("empresa_logada", empresa)
+            obter_cache_views(page).invalidar("usuarios")
 
             dialog.open = False
             page.snack_bar = ft.SnackBar(ft.Text("Nome da empresa atualizado!"), bgcolor=ft.Colors.GREEN)
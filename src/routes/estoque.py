@@ -1,13 +1,21 @@
 import flet as ft
-from datetime import datetime
 from database.estoque_controller import EstoqueController
+from componentes.paginacao import CarregadorPaginas
+from componentes.busca import BuscaAdiada
+from componentes.tabela import TabelaChaveada
+from componentes.cache_views import obter_cache_views
+from database.eventos import EXCLUSAO
+
+# Movimentações com os nomes de produto e funcionário
+TABELAS = ("movimentacao_estoque", "produtos", "funcionarios")
 
 
 def View(page: ft.Page):
     db_estoque = EstoqueController(page.client_storage.get("user_db"))
-    movimentacoes = []
-    movimentacao_para_excluir = {"index": None}
-    movimentacao_em_edicao = {"index": None}
+    # Movimentações já carregadas do banco, por ID, na ordem da listagem
+    movimentacoes = {}
+    movimentacao_para_excluir = {"id": None}
+    movimentacao_em_edicao = {"id": None}
 
     #produtos_dados = db_estoque.listar_id_e_produtos()
     #produtos = [f['nome'] for f in produtos_dados]
@@ -20,7 +28,7 @@ def View(page: ft.Page):
     def voltar_home(e):
         page.go("/home")
 
-    def criar_linha_tabela(i, p):
+    def criar_linha_tabela(p):
         return ft.DataRow(
             cells=[
                 ft.DataCell(ft.Text(str(p["id"]))),
@@ -47,31 +55,42 @@ def View(page: ft.Page):
                             icon=ft.Icons.EDIT,
                             tooltip="Editar movimentacao",
                             icon_color=ft.Colors.BLUE,
-                            on_click=lambda e, idx=i: editar_movimentacao(idx)(e)
+                            on_click=lambda e, mid=p["id"]: editar_movimentacao(mid)(e)
                         ),
                         ft.IconButton(
                             icon=ft.Icons.DELETE,
                             tooltip="Excluir movimentacao",
                             icon_color=ft.Colors.RED,
-                            on_click=lambda e, idx=i: excluir_movimentacao(idx)(e)
+                            on_click=lambda e, mid=p["id"]: excluir_movimentacao(mid)(e)
                         ),
                     ], spacing=5)
                 ),
             ]
         )
 
+    def adicionar_pagina(novas):
+        movimentacoes.update((p["id"], p) for p in novas)
+        linhas.acrescentar(novas)
+
+    paginas = CarregadorPaginas(db_estoque.listar_movimentacoes_paginado, adicionar_pagina)
+
+    # A pesquisa também é paginada e feita no banco, não só nas páginas carregadas
+    pesquisa_atual = {"termo": ""}
+    paginas_pesquisa = CarregadorPaginas(
+        lambda apos, limite: db_estoque.pesquisar_movimentacoes_paginado(pesquisa_atual["termo"], apos, limite),
+        adicionar_pagina
+    )
+
     def atualizar_lista():
-        tabela.rows.clear()
+        linhas.limpar()
         movimentacoes.clear()
-        movimentacoes.extend(db_estoque.listar_movimentacoes())
-        for i, p in enumerate(movimentacoes):
-            tabela.rows.append(criar_linha_tabela(i, p))
-        page.update()
+        if not paginas.reiniciar():
+            page.update()
 
-    def editar_movimentacao(index):
+    def editar_movimentacao(movimentacao_id):
         def handler(e):
-            movimentacao_em_edicao["index"] = index
-            movimentacao = movimentacoes[index]
+            movimentacao_em_edicao["id"] = movimentacao_id
+            movimentacao = movimentacoes[movimentacao_id]
             id_field.value = movimentacao["id"]
             tipo_movimentacao_field.value = movimentacao["tipo_movimentacao"]
             quantidade_field.value = str(movimentacao["quantidade"])
@@ -110,20 +129,17 @@ def View(page: ft.Page):
             page.update()
         return handler
 
-    def excluir_movimentacao(index):
+    def excluir_movimentacao(movimentacao_id):
         def handler(e):
-            movimentacao_para_excluir["index"] = index
+            movimentacao_para_excluir["id"] = movimentacao_id
             confirm_dialog.open = True
             page.update()
         return handler
 
     def confirmar_exclusao(e):
-        index = movimentacao_para_excluir["index"]
-        if index is not None:
-            movimentacao_id = movimentacoes[index]["id"]
-            if db_estoque.excluir_movimentacao(movimentacao_id):
-                movimentacoes.pop(index)
-                atualizar_lista()
+        movimentacao_id = movimentacao_para_excluir["id"]
+        if movimentacao_id is not None:
+            db_estoque.excluir_movimentacao(movimentacao_id)
         confirm_dialog.open = False
         page.update()
 
@@ -196,22 +212,13 @@ def View(page: ft.Page):
             page.update()
             return
 
-        if movimentacao_em_edicao["index"] is None:
-            movimentacao_id = db_estoque.cadastrar_movimentacao(nova_movimentacao)
-            if movimentacao_id:
-                nova_movimentacao["id"] = movimentacao_id
-                nova_movimentacao["data_movimentacao"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                movimentacoes.append(nova_movimentacao)
+        # A linha é incluída ou trocada por aplicar_alteracao
+        if movimentacao_em_edicao["id"] is None:
+            db_estoque.cadastrar_movimentacao(nova_movimentacao)
         else:
-            index = movimentacao_em_edicao["index"]
-            movimentacao_id = movimentacoes[index]["id"]
-            if db_estoque.atualizar_movimentacao(movimentacao_id, nova_movimentacao):
-                nova_movimentacao["id"] = movimentacao_id
-                nova_movimentacao["data_movimentacao"] = movimentacoes[index]["data_movimentacao"]
-                movimentacoes[movimentacao_em_edicao["index"]] = nova_movimentacao
+            db_estoque.atualizar_movimentacao(movimentacao_em_edicao["id"], nova_movimentacao)
 
-        movimentacao_em_edicao["index"] = None
-        atualizar_lista()
+        movimentacao_em_edicao["id"] = None
         dialog.open = False
         page.update()
 
@@ -301,23 +308,29 @@ def View(page: ft.Page):
     campo_pesquisa = ft.TextField(
         label="Pesquisar movimentação (por ID, produto ou tipo)",
         visible=True,
-        on_change=lambda e: filtrar_movimentacoes(e.control.value),
+        on_change=lambda e: busca.ao_digitar(e),
         prefix_icon=ft.Icons.SEARCH,
         width=500
     )
 
-    def filtrar_movimentacoes(query):
-        if not query:
+    def buscar_movimentacoes(query):
+        # Primeira página das movimentações que casam com a pesquisa
+        query = query.strip()
+        return db_estoque.pesquisar_movimentacoes_paginado(query) if query else None
+
+    def filtrar_movimentacoes(query, pagina):
+        if pagina is None:
+            pesquisa_atual["termo"] = ""
             atualizar_lista()
             return
-            
-        tabela.rows.clear()
-        for i, p in enumerate(movimentacoes):
-            if (query.lower() in str(p["id"]).lower() or
-                query.lower() in str(p["produto_id"]).lower() or
-                query.lower() in p["tipo_movimentacao"].lower()):
-                tabela.rows.append(criar_linha_tabela(i, p))
-        page.update()
+
+        pesquisa_atual["termo"] = query.strip()
+        movimentacoes.clear()
+        movimentacoes.update((p["id"], p) for p in pagina["itens"])
+        paginas_pesquisa.continuar(pagina)
+        linhas.sincronizar(pagina["itens"])
+
+    busca = BuscaAdiada(page, buscar_movimentacoes, filtrar_movimentacoes)
 
     tabela = ft.DataTable(
         columns=[
@@ -337,6 +350,28 @@ def View(page: ft.Page):
         ],
         rows=[]
     )
+    linhas = TabelaChaveada(tabela, criar_linha_tabela)
+
+    def reler_movimentacoes(ids):
+        # Relidas com os nomes de produto e funcionário, como na listagem
+        registros = db_estoque.buscar_por_ids(ids)
+        movimentacoes.update((m["id"], m) for m in registros)
+        return registros
+
+    def aplicar_alteracao(alteracao):
+        if pesquisa_atual["termo"]:
+            # Refaz a pesquisa: a movimentação alterada pode ter entrado ou saído dela
+            busca.agendar(campo_pesquisa.value or "")
+            return
+        if alteracao.operacao == EXCLUSAO:
+            for movimentacao_id in alteracao.ids:
+                movimentacoes.pop(movimentacao_id, None)
+        # A listagem é da mais recente para a mais antiga. Movimentações
+        # gravadas pelos gatilhos das vendas não trazem ids; nesse caso o
+        # cache de views remonta a tela na próxima visita
+        linhas.aplicar(alteracao, reler_movimentacoes, posicao=0)
+
+    obter_cache_views(page).assinar(("movimentacao_estoque",), aplicar_alteracao)
 
     atualizar_lista()
 
@@ -365,6 +400,8 @@ def View(page: ft.Page):
                             tabela
                         ],
                         scroll=ft.ScrollMode.AUTO,
+                        # Carrega a próxima página (da listagem ou da pesquisa) ao chegar perto do fim
+                        on_scroll=lambda e: (paginas_pesquisa if pesquisa_atual["termo"] else paginas).ao_rolar(e),
                         expand=True
                     )
                     #ft.Container(
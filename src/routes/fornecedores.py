@@ -1,13 +1,18 @@
 #CÓDIGO COMPLETO TESTADO
 import flet as ft
-from data import fornecedores
 import re
 from database.fornecedores_controller import FornecedoresController
+from componentes.paginacao import CarregadorPaginas
+from componentes.busca import BuscaAdiada, avisar_truncamento
+from componentes.tabela import TabelaChaveada
+from componentes.cache_views import obter_cache_views
+
+TABELAS = ("fornecedores",)
 
 def View(page: ft.Page):
     db_fornecedores = FornecedoresController(page.client_storage.get("user_db"))
 
-    fornecedor_para_excluir = {"index": None}
+    fornecedor_para_excluir = {"id": None}
     id_field = ft.TextField(label="ID", read_only=True, width=120)
 
     def voltar_home(e):
@@ -19,12 +24,11 @@ def View(page: ft.Page):
         """
         page.go("/home")
 
-    def criar_linha_tabela(i, f):
+    def criar_linha_tabela(f):
         """
         Cria uma linha da tabela com os dados do fornecedor.
 
         Args:
-            i (int): O índice do fornecedor na lista de fornecedores.
             f (dict): O dicionário com os dados do fornecedor.
 
         Returns:
@@ -51,12 +55,12 @@ def View(page: ft.Page):
                         ft.IconButton(
                             icon=ft.Icons.EDIT,
                             icon_color=ft.Colors.BLUE,
-                            on_click=lambda e, idx=i: editar_fornecedor(idx)(e)
+                            on_click=lambda e, fid=f["id"]: editar_fornecedor(fid)(e)
                         ),
                         ft.IconButton(
                             icon=ft.Icons.DELETE,
                             icon_color=ft.Colors.RED,
-                            on_click=lambda e, idx=i: excluir_fornecedor(idx)(e)
+                            on_click=lambda e, fid=f["id"]: excluir_fornecedor(fid)(e)
                         ),
                     ], spacing=5)
                 ),
@@ -67,28 +71,35 @@ def View(page: ft.Page):
         """
         Atualiza a lista de fornecedores na tabela.
         """
-        fornecedores.clear()
-        fornecedores.extend(db_fornecedores.listar_fornecedores())
-        
-        tabela.rows.clear()
-        for i, f in enumerate(fornecedores):
-            tabela.rows.append(criar_linha_tabela(i, f))
-        page.update()
+        linhas.limpar()
+        if not paginas.reiniciar():
+            page.update()
+
+    def adicionar_pagina(novos):
+        """
+        Acrescenta à tabela uma página de fornecedores carregada do banco.
+
+        Args:
+            novos (list): Os fornecedores da página.
+        """
+        linhas.acrescentar(novos)
 
-    def editar_fornecedor(index):
+    paginas = CarregadorPaginas(db_fornecedores.listar_fornecedores_paginado, adicionar_pagina)
+
+    def editar_fornecedor(fornecedor_id):
         
         """
-        Edita o fornecedor com base no índice fornecido.
+        Edita o fornecedor com base no ID fornecido.
 
         Args: 
-            index (int): O índice do fornecedor na lista de fornecedores.
+            fornecedor_id (int): O ID do fornecedor.
 
         Returns:
-            function: Uma função que edita o fornecedor com base no índice fornecido.
+            function: Uma função que edita o fornecedor com base no ID fornecido.
         """
         def handler(e):
-            globals()['fornecedor_em_edicao'] = index
-            f = fornecedores[index]
+            globals()['fornecedor_em_edicao'] = fornecedor_id
+            f = linhas.get(fornecedor_id)
             id_field.value = f["id"]
             nome_fantasia_field.value = f["nome_fantasia"]
             razao_social_field.value = f["razao_social"]
@@ -101,31 +112,28 @@ def View(page: ft.Page):
             page.update()
         return handler
 
-    def excluir_fornecedor(index):
+    def excluir_fornecedor(fornecedor_id):
         """
-        Exclui o fornecedor com base no índice fornecido.
+        Exclui o fornecedor com base no ID fornecido.
 
         Args: 
-            index (int): O índice do fornecedor na lista de fornecedores.
+            fornecedor_id (int): O ID do fornecedor.
 
         Returns:
-            function: Uma função que exclui o fornecedor com base no índice fornecido.
+            function: Uma função que exclui o fornecedor com base no ID fornecido.
         """
         
         def handler(e):
-            fornecedor_para_excluir["index"] = index
+            fornecedor_para_excluir["id"] = fornecedor_id
             confirm_dialog.open = True
             page.update()
         return handler
 
     def confirmar_exclusao(e):
-        index = fornecedor_para_excluir["index"]
-        if index is not None:
+        fornecedor_id = fornecedor_para_excluir["id"]
+        if fornecedor_id is not None:
             try:
-                fornecedor_id = fornecedores[index]["id"]  # Pegar o ID real
                 if db_fornecedores.excluir_fornecedor(fornecedor_id):  # Excluir por ID
-                    fornecedores.pop(index)  # Só remove da lista se exclusão no BD foi bem-sucedida
-                    atualizar_lista()
                     # Mostrar mensagem de sucesso
                     page.open(
                         ft.SnackBar(
@@ -212,8 +220,6 @@ def View(page: ft.Page):
                 # CADASTRO NOVO
                 fornecedor_id = db_fornecedores.cadastrar_fornecedor(novo_fornecedor)
                 if fornecedor_id:
-                    novo_fornecedor["id"] = fornecedor_id
-                    fornecedores.append(novo_fornecedor)
                     # Mostrar mensagem de sucesso
                     page.open(
                         ft.SnackBar(
@@ -225,12 +231,9 @@ def View(page: ft.Page):
                     raise Exception("Falha ao cadastrar fornecedor no banco de dados")
             else:
                 # EDIÇÃO
-                index = globals()['fornecedor_em_edicao']
-                fornecedor_id = fornecedores[index]["id"]
+                fornecedor_id = globals()['fornecedor_em_edicao']
                 
                 if db_fornecedores.atualizar_fornecedor(fornecedor_id, novo_fornecedor):
-                    novo_fornecedor["id"] = fornecedor_id
-                    fornecedores[index] = novo_fornecedor
                     # Mostrar mensagem de sucesso
                     page.open(
                         ft.SnackBar(
@@ -243,7 +246,6 @@ def View(page: ft.Page):
 
             # Se chegou até aqui, operação foi bem-sucedida
             globals()['fornecedor_em_edicao'] = None
-            atualizar_lista()
             dialog.open = False
             page.update()
             
@@ -321,22 +323,25 @@ def View(page: ft.Page):
     page.overlay.append(confirm_dialog)
 
     campo_pesquisa = ft.TextField(
-        label="Pesquisar fornecedor (por nome ou ID)",
+        label="Pesquisar fornecedor (por ID, nome, razão social, CNPJ ou telefone)",
         visible=True,
-        on_change=lambda e: filtrar_fornecedores(e.control.value),
+        on_change=lambda e: busca.ao_digitar(e),
         prefix_icon=ft.Icons.SEARCH,
         width=500
     )
 
-    def filtrar_fornecedores(query):
-        tabela.rows.clear()
-        for i, f in enumerate(fornecedores):
-            if (
-                query.lower() in f["nome_fantasia"].lower()
-                or query == str(f["id"])
-            ):
-                tabela.rows.append(criar_linha_tabela(i, f))
-        page.update()
+    def buscar_fornecedores(query):
+        # Roda fora do loop de eventos; texto vazio volta para a listagem paginada
+        return db_fornecedores.buscar(query) if query.strip() else None
+
+    def filtrar_fornecedores(query, resultados):
+        avisar_truncamento(campo_pesquisa, resultados)
+        if resultados is None:
+            atualizar_lista()
+            return
+        linhas.sincronizar(resultados["itens"])
+
+    busca = BuscaAdiada(page, buscar_fornecedores, filtrar_fornecedores)
 
     tabela = ft.DataTable(
         columns=[
@@ -351,6 +356,11 @@ def View(page: ft.Page):
         ],
         rows=[]
     )
+    linhas = TabelaChaveada(tabela, criar_linha_tabela)
+    # A tabela acompanha as alterações em fornecedores publicadas pelo controller
+    obter_cache_views(page).assinar(
+        ("fornecedores",), lambda alteracao: linhas.aplicar(alteracao, db_fornecedores.buscar_por_ids)
+    )
 
     atualizar_lista()
 
@@ -373,6 +383,8 @@ def View(page: ft.Page):
                             tabela, ft.Divider()
                         ],
                         scroll=ft.ScrollMode.AUTO,
+                        # Carrega a próxima página ao chegar perto do fim (exceto durante a pesquisa)
+                        on_scroll=lambda e: None if campo_pesquisa.value else paginas.ao_rolar(e),
                         expand=True
                     ),
                     ft.Container(
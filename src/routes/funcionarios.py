@@ -1,21 +1,26 @@
 import flet as ft
-from data import funcionarios
 import datetime
 import re
 from database.funcionarios_controller import FuncionariosController  # Importa o controlador de funcionários
+from componentes.paginacao import CarregadorPaginas
+from componentes.busca import BuscaAdiada, avisar_truncamento
+from componentes.tabela import TabelaChaveada
+from componentes.cache_views import obter_cache_views
+
+TABELAS = ("funcionarios",)
 
 def View(page: ft.Page):
     # Instancia o controlador de funcionários
     db_funcionarios = FuncionariosController(page.client_storage.get("user_db"))
-    funcionario_para_excluir = {"index": None}
-    funcionario_em_edicao = {"index": None} 
+    funcionario_para_excluir = {"id": None}
+    funcionario_em_edicao = {"id": None} 
 
     id_field = ft.TextField(label="ID", read_only=True, width=120)
 
     def voltar_home(e):
         page.go("/home")
 
-    def criar_linha_tabela(i, p):
+    def criar_linha_tabela(p):
         """
         Cria uma linha da tabela com os dados do funcionário.
 
@@ -48,13 +53,13 @@ def View(page: ft.Page):
                             icon=ft.Icons.EDIT,
                             tooltip="Clique aqui para editar funcionário",
                             icon_color=ft.Colors.BLUE,
-                            on_click=lambda e, idx=i: editar_funcionario(idx)(e)
+                            on_click=lambda e, fid=p["id"]: editar_funcionario(fid)(e)
                         ),
                         ft.IconButton(
                             icon=ft.Icons.DELETE,
                             tooltip="Clique aqui para excluir funcionário",
                             icon_color=ft.Colors.RED,
-                            on_click=lambda e, idx=i: excluir_funcionario(idx)(e)
+                            on_click=lambda e, fid=p["id"]: excluir_funcionario(fid)(e)
                         ),
                     ], spacing=5)
                 ),
@@ -63,28 +68,29 @@ def View(page: ft.Page):
 
     def atualizar_lista():
         """Atualiza a lista de funcionários na tabela."""
-        tabela.rows.clear()
-        #for i, p in enumerate(funcionarios):
-        #    tabela.rows.append(criar_linha_tabela(i, p))
-        funcionarios.clear()
-        funcionarios.extend(db_funcionarios.listar_funcionarios())
-        for i, p in enumerate(funcionarios):
-            tabela.rows.append(criar_linha_tabela(i, p))
-        page.update()
+        linhas.limpar()
+        if not paginas.reiniciar():
+            page.update()
+
+    def adicionar_pagina(novos):
+        """Acrescenta à tabela uma página de funcionários carregada do banco."""
+        linhas.acrescentar(novos)
+
+    paginas = CarregadorPaginas(db_funcionarios.listar_funcionarios_paginado, adicionar_pagina)
 
-    def editar_funcionario(index):
+    def editar_funcionario(funcionario_id):
         """
-        Edita o funcionário com base no índice fornecido.
+        Edita o funcionário com base no ID fornecido.
 
         Args: 
-            index (int): O índice do funcionário na lista de funcionários.
+            funcionario_id (int): O ID do funcionário.
         Returns:
-            function: Uma função que edita o funcionário com base no índice fornecido.
+            function: Uma função que edita o funcionário com base no ID fornecido.
         """
         def handler(e):
-            # Usando o dicionário para estado de edição
-            funcionario_em_edicao["index"] = index
-            funcionario = funcionarios[index]
+            # Usando o dicionário para estado de edição
+            funcionario_em_edicao["id"] = funcionario_id
+            funcionario = linhas.get(funcionario_id)
             id_field.value = funcionario["id"]
             nome_field.value = funcionario["nome"]
             cargo_field.value = funcionario["cargo"]
@@ -96,37 +102,34 @@ def View(page: ft.Page):
             page.update()
         return handler
 
-    def excluir_funcionario(index):
-        """Exclui o funcionário com base no índice fornecido.
+    def excluir_funcionario(funcionario_id):
+        """Exclui o funcionário com base no ID fornecido.
 
         Args: 
-            index (int): O índice do funcionário na lista de funcionários.
+            funcionario_id (int): O ID do funcionário.
         Returns:
-            function: Uma função que exclui o funcionário com base no índice fornecido.
+            function: Uma função que exclui o funcionário com base no ID fornecido.
         """
         def handler(e):
-            funcionario_para_excluir["index"] = index
+            funcionario_para_excluir["id"] = funcionario_id
             confirm_dialog.open = True
             page.update()
         return handler
 
     def confirmar_exclusao(e):
-        """Confirma a exclusão de um funcionário com base no índice fornecido.
+        """Confirma a exclusão de um funcionário com base no ID fornecido.
         
-        Verifica se o índice está disponível e, se sim, exclui o funcionário da
-        lista de funcionários e atualiza a tabela. Em seguida, fecha o di ́ alogo de
+        Verifica se o ID está disponível e, se sim, exclui o funcionário do
+        banco e remove apenas a sua linha da tabela. Em seguida, fecha o di ́ alogo de
         confirma ção.
         
         Args:
             e (object): O evento de clique.
         """
 
-        index = funcionario_para_excluir["index"]
-        if index is not None:
-            funcionario_id = funcionarios[index]["id"]
-            if db_funcionarios.excluir_funcionario(funcionario_id):
-                funcionarios.pop(index)
-                atualizar_lista()
+        funcionario_id = funcionario_para_excluir["id"]
+        if funcionario_id is not None:
+            db_funcionarios.excluir_funcionario(funcionario_id)
         confirm_dialog.open = False
         page.update()
 
@@ -163,7 +166,7 @@ def View(page: ft.Page):
         data_field.value = datetime.date.today().strftime("%d/%m/%Y") # Formata a data atual - Modificar futuramente
         observacoes_field.value = ""
         # Limpar estado de edição
-        funcionario_em_edicao["index"] = None 
+        funcionario_em_edicao["id"] = None 
         for f in [nome_field, telefone_field]:
             f.error_text = None
             f.border_color = None # Limpar a cor da borda também
@@ -238,22 +241,13 @@ def View(page: ft.Page):
         }
 
         # Usa o dicionário para verificar o estado de edição
-        if funcionario_em_edicao["index"] is None:
-            funcionario_id = db_funcionarios.cadastrar_funcionario(novo_funcionario)
-            if funcionario_id:
-                novo_funcionario["id"] = funcionario_id
-                funcionarios.append(novo_funcionario)
+        if funcionario_em_edicao["id"] is None:
+            db_funcionarios.cadastrar_funcionario(novo_funcionario)
         else:
-            #funcionarios[funcionario_em_edicao["index"]] = novo_funcionario
-            index = funcionario_em_edicao["index"]
-            funcionario_id = funcionarios[index]["id"]
-            if db_funcionarios.atualizar_funcionario(funcionario_id, novo_funcionario):
-                novo_funcionario["id"] = funcionario_id
-                funcionarios[funcionario_em_edicao["index"]] = novo_funcionario
+            db_funcionarios.atualizar_funcionario(funcionario_em_edicao["id"], novo_funcionario)
 
         # Limpar estado de edição após salvar
-        funcionario_em_edicao["index"] = None
-        atualizar_lista()
+        funcionario_em_edicao["id"] = None
         dialog.open = False
         page.update()
 
@@ -343,23 +337,26 @@ def View(page: ft.Page):
     page.overlay.append(confirm_dialog)
 
     campo_pesquisa = ft.TextField(
-        label="Pesquisar funcionário (por nome ou ID)",
+        label="Pesquisar funcionário (por ID, nome ou cargo)",
         visible=True,
-        on_change=lambda e: filtrar_funcionarios(e.control.value),
+        on_change=lambda e: busca.ao_digitar(e),
         prefix_icon=ft.Icons.SEARCH,
         width=500
     )
 
-    def filtrar_funcionarios(query):
+    def buscar_funcionarios(query):
+        # Roda fora do loop de eventos; texto vazio volta para a listagem paginada
+        return db_funcionarios.buscar(query) if query.strip() else None
+
+    def filtrar_funcionarios(query, resultados):
         """Filtrar a lista de funcionários com base na pesquisa."""
-        tabela.rows.clear()
-        for i, p in enumerate(funcionarios):
-            if (
-                query.lower() in p["nome"].lower()
-                or query == str(p["id"])
-            ):
-                tabela.rows.append(criar_linha_tabela(i, p))
-        page.update()
+        avisar_truncamento(campo_pesquisa, resultados)
+        if resultados is None:
+            atualizar_lista()
+            return
+        linhas.sincronizar(resultados["itens"])
+
+    busca = BuscaAdiada(page, buscar_funcionarios, filtrar_funcionarios)
 
     tabela = ft.DataTable(
         columns=[
@@ -374,6 +371,11 @@ def View(page: ft.Page):
         ],
         rows=[]
     )
+    linhas = TabelaChaveada(tabela, criar_linha_tabela)
+    # Linhas incluídas, editadas ou excluídas, aqui ou em outra tela, chegam pelo barramento
+    obter_cache_views(page).assinar(
+        ("funcionarios",), lambda alteracao: linhas.aplicar(alteracao, db_funcionarios.buscar_por_ids)
+    )
 
     atualizar_lista()
 
@@ -384,7 +386,7 @@ def View(page: ft.Page):
         Args:
             e (event): O evento que disparou esta função.
         """
-        funcionario_em_edicao["index"] = None
+        funcionario_em_edicao["id"] = None
         limpar_campos()
         dialog.open = True
         page.update()
@@ -409,6 +411,8 @@ def View(page: ft.Page):
                             tabela, ft.Divider()
                         ],
                         scroll=ft.ScrollMode.AUTO,
+                        # Carrega a próxima página ao chegar perto do fim (exceto durante a pesquisa)
+                        on_scroll=lambda e: None if campo_pesquisa.value else paginas.ao_rolar(e),
                         expand=True
                     ),
                     ft.Container(
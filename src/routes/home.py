@@ -1,14 +1,16 @@
 import flet as ft
-import datetime
-import asyncio
-from database import vendas_controller, clientes_controller, produtos_controller
+from database.relatorios_controller import RelatoriosController
+from componentes.relogio import obter_relogio
+from componentes.cache_views import obter_cache_views
+
+# Indicadores vêm dos resumos mantidos por gatilhos nessas tabelas;
+# "usuarios" cobre o nome da empresa exibido na barra
+TABELAS = ("vendas", "itens_venda", "produtos", "clientes", "usuarios")
 
 def View(page: ft.Page):
     """Tela inicial do sistema"""
     db = page.client_storage.get("user_db")
-    db_vendas = vendas_controller.VendasController(db)
-    db_clientes = clientes_controller.ClientesController(db)
-    db_produtos = produtos_controller.ProdutosController(db)
+    db_relatorios = RelatoriosController(db)
 
     drawer_open = False
 
@@ -52,6 +54,11 @@ def View(page: ft.Page):
         page.client_storage.remove("empresa_logada")
         page.client_storage.remove("nome_usuario")
         page.client_storage.remove("email_usuario")
+        # O pool do banco não é fechado aqui: outras sessões do mesmo tenant
+        # continuam usando as conexões, que são fechadas ao encerrar o aplicativo
+        page.client_storage.remove("user_db")
+        # As telas guardadas são do banco que acabou de ser fechado
+        obter_cache_views(page).limpar()
 
         page.update()
         page.go("/login")
@@ -114,10 +121,8 @@ def View(page: ft.Page):
         page.update()
 
     # Texto do horário que será atualizado
-    texto_horario = ft.Text(
-        f"Hoje: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", 
-        color=ft.Colors.WHITE
-    )
+    texto_horario = ft.Text(color=ft.Colors.WHITE)
+    obter_relogio(page).registrar(texto_horario, "/home")
 
     appbar = ft.AppBar(
         title=nome_empresa,
@@ -129,22 +134,12 @@ def View(page: ft.Page):
             ft.IconButton(icon=ft.Icons.LOGOUT, icon_color=ft.Colors.WHITE, on_click=logout, tooltip="Sair")
         ])
 
-    def atualizar_hora():
-        """Atualiza o texto do horário"""
-        texto_horario.value = f"Hoje: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"
-        page.update()
-
-    async def atualiza_tempo():
-        """Atualiza o horário de forma assíncrona"""
-        while True:
-            atualizar_hora()
-            await asyncio.sleep(1)
-
-    vendas = db_vendas.listar_vendas()
-    
-    total_vendas = sum(venda["total"] for venda in vendas) if vendas else 0.0
-    total_clientes = len(db_clientes.listar_clientes())
-    total_produtos = len(db_produtos.listar_produtos())
+    # Uma única linha mantida por gatilhos, independente do tamanho do histórico
+    indicadores_db = db_relatorios.obter_indicadores()
+    total_vendas = indicadores_db["receita_total"]
+    vendas_hoje = indicadores_db["receita_hoje"]
+    total_clientes = indicadores_db["total_clientes"]
+    total_produtos = indicadores_db["total_produtos"]
 
     indicadores = ft.Row([
         ft.Container(
@@ -159,6 +154,18 @@ def View(page: ft.Page):
             border_radius=10,
             expand=True
         ),
+        ft.Container(
+            content=ft.Column([
+                ft.Icon(ft.Icons.TODAY, color=ft.Colors.TEAL_500),
+                ft.Text("Vendas de Hoje", size=16, weight="bold", color=ft.Colors.BLACK),
+                ft.Text(f"R$ {vendas_hoje:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+                        size=20, color=ft.Colors.TEAL_500)
+            ]),
+            padding=10,
+            bgcolor=ft.Colors.TEAL_100,
+            border_radius=10,
+            expand=True
+        ),
         ft.Container(
             content=ft.Column([
                 ft.Icon(ft.Icons.SHOPPING_CART, color=ft.Colors.BLUE_500),
@@ -256,8 +263,6 @@ def View(page: ft.Page):
     ]
 )
 
-    page.run_task(atualiza_tempo)
-
     return ft.View(
         route="/home",
         appbar=appbar,
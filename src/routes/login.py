@@ -1,5 +1,6 @@
 import flet as ft
-from storage_manager import verify_user, get_user_data
+from autenticacao import obter_servico
+from componentes.cache_views import obter_cache_views
 
 def View(page: ft.Page):
     """Tela de login do sistema
@@ -10,26 +11,34 @@ def View(page: ft.Page):
     if not page.client_storage.get("usuario_logado"):
         page.go("/login")
 
-    def VaiPraHome(e):
+    async def VaiPraHome(e):
         """Chama a tela de Home se o login for realizado com sucesso
-        Senão, exibe uma mensagem de erro na tela de login."""
+        Senão, exibe uma mensagem de erro na tela de login.
+        A verificação da senha roda fora do loop de eventos."""
         usuario = txtLogin.value.strip()
         senha = txtSenha.value.strip()
-        
-        db_name = verify_user(usuario, senha)
-        if db_name:
-            mensagem_erro.visible = False
-            mensagem_erro.value = ""
 
+        mensagem_erro.visible = False
+        mensagem_erro.value = ""
+        btnEntrar.disabled = True
+        progresso.visible = True
+        page.update()
+
+        try:
+            sessao = await obter_servico().entrar(usuario, senha)
+        finally:
+            btnEntrar.disabled = False
+            progresso.visible = False
+
+        if sessao:
             # Armazena os dados do usuário no client_storage
-            user_data = get_user_data(usuario)
-            if user_data:
-                nome, email, empresa = user_data
-                page.client_storage.set("usuario_logado", usuario)
-                page.client_storage.set("empresa_logada", empresa)
-                page.client_storage.set("nome_usuario", nome)
-                page.client_storage.set("email_usuario", email)
-                page.client_storage.set("user_db", db_name)
+            await page.client_storage.set_async("usuario_logado", sessao["usuario"])
+            await page.client_storage.set_async("empresa_logada", sessao["empresa"])
+            await page.client_storage.set_async("nome_usuario", sessao["nome"])
+            await page.client_storage.set_async("email_usuario", sessao["email"])
+            await page.client_storage.set_async("user_db", sessao["db_name"])
+            # As telas guardadas passam a acompanhar as alterações desse banco
+            obter_cache_views(page).entrar(sessao["db_name"])
 
             page.go("/home")
         else:
@@ -76,6 +85,8 @@ def View(page: ft.Page):
         )
     )
 
+    progresso = ft.ProgressRing(width=24, height=24, stroke_width=3, visible=False)
+
     mensagem_erro = ft.Text(
         value="",
         color=ft.Colors.RED_700,
@@ -98,6 +109,7 @@ def View(page: ft.Page):
                 txtLogin,
                 txtSenha,
                 mensagem_erro,
+                progresso,
                 btnEntrar,
                 row_buttons,
             ],
@@ -1,12 +1,18 @@
 import flet as ft
 import datetime
 from database.produtos_controller import ProdutosController
+from componentes.paginacao import CarregadorPaginas
+from componentes.busca import BuscaAdiada, avisar_truncamento
+from componentes.tabela import TabelaChaveada
+from componentes.cache_views import obter_cache_views
+
+# Produtos com o nome do fornecedor, e a lista de fornecedores do formulário
+TABELAS = ("produtos", "fornecedores")
 
 def View(page: ft.Page):
-    produtos = []
     db_produtos = ProdutosController(page.client_storage.get("user_db"))
-    produto_para_excluir = {"index": None}
-    produto_para_edicao = {"index": None}
+    produto_para_excluir = {"id": None}
+    produto_para_edicao = {"id": None}
     
     fornecedores_dados = db_produtos.listar_id_e_fornecedores()
     fornecedores = [f['nome_fantasia'] for f in fornecedores_dados]
@@ -16,7 +22,7 @@ def View(page: ft.Page):
     def voltar_home(e):
         page.go("/home")
 
-    def criar_linha_tabela(i, p):
+    def criar_linha_tabela(p):
         preco_display = f"R$ {p['preco']}"
         if p.get('preco_promocional'):
             preco_display = f"R$ {p['preco_promocional']} (Promo)"
@@ -48,33 +54,33 @@ def View(page: ft.Page):
                                 icon=ft.Icons.EDIT,
                                 tooltip="Clique aqui para editar produto",
                                 icon_color=ft.Colors.BLUE,
-                                on_click=lambda e, idx=i: editar_produto(idx)(e)
+                                on_click=lambda e, pid=p["id"]: editar_produto(pid)(e)
                             ),
                             ft.IconButton(
                                 icon=ft.Icons.DELETE,
                                 tooltip="Clique aqui para excluir produto",
                                 icon_color=ft.Colors.RED,
-                                on_click=lambda e, idx=i: excluir_produto(idx)(e)
+                                on_click=lambda e, pid=p["id"]: excluir_produto(pid)(e)
                             ),
                         ], spacing=5)
                     ),
                 ]
             )
 
-    def atualizar_lista():
-        tabela.rows.clear()
-        produtos.clear()
-        produtos.extend(db_produtos.listar_produtos())
+    def adicionar_pagina(novos):
+        linhas.acrescentar(novos)
 
-        tabela.rows.clear()
-        for i, p in enumerate(produtos):
-            tabela.rows.append(criar_linha_tabela(i, p))
-        page.update()
+    paginas = CarregadorPaginas(db_produtos.listar_produtos_paginado, adicionar_pagina)
+
+    def atualizar_lista():
+        linhas.limpar()
+        if not paginas.reiniciar():
+            page.update()
 
-    def editar_produto(index):
+    def editar_produto(produto_id):
         def handler(e):
-            produto_para_edicao["index"] = index
-            p = produtos[index]
+            produto_para_edicao["id"] = produto_id
+            p = linhas.get(produto_id)
 
             print(f"Produto para edição: {p}")
             print(f"Chaves disponíveis: {list(p.keys())}")
@@ -82,6 +88,7 @@ def View(page: ft.Page):
             # Campos simples
             id_field.value = str(p["id"])
             nome_field.value = p["nome"]
+            codigo_barras_field.value = p.get("codigo_barras") or ""
             descricao_field.value = p["descricao"]
             preco_field.value = str(p["preco"])
             preco_promocional_field.value = str(p.get("preco_promocional") or "")
@@ -111,21 +118,18 @@ def View(page: ft.Page):
             page.update()
         return handler
 
-    def excluir_produto(index):
+    def excluir_produto(produto_id):
         def handler(e):
-            produto_para_excluir["index"] = index
+            produto_para_excluir["id"] = produto_id
             confirm_dialog.open = True
             page.update()
         return handler
 
     def confirmar_exclusao(e):
-        index = produto_para_excluir["index"]
-        if index is not None:
+        produto_id = produto_para_excluir["id"]
+        if produto_id is not None:
             try:
-                produto_id = produtos[index]["id"]
                 if db_produtos.excluir_produto(produto_id):
-                    produtos.pop(index)
-                    atualizar_lista()
                     page.open(
                         ft.SnackBar(
                             content=ft.Text("Produto excluído com sucesso!"),
@@ -154,8 +158,9 @@ def View(page: ft.Page):
         page.update()
 
     def limpar_campos():
-        id_field.value = str(max([p["id"] for p in produtos], default=0) + 1)
+        id_field.value = str(max(linhas.registros, default=0) + 1)
         nome_field.value = ""
+        codigo_barras_field.value = ""
         descricao_field.value = ""
         preco_field.value = ""
         preco_promocional_field.value = ""
@@ -164,7 +169,7 @@ def View(page: ft.Page):
         fornecedor_dropdown.value = None
         categoria_dropdown.value = None
         data_field.value = datetime.date.today().strftime("%d/%m/%Y")
-        produto_para_edicao["index"] = None
+        produto_para_edicao["id"] = None
         for f in [nome_field, preco_field, custo_field, estoque_field, categoria_dropdown]:
             f.error_text = None
 
@@ -253,18 +258,17 @@ def View(page: ft.Page):
                 "estoque_maximo": estoque_maximo_int,
                 "fornecedor_id": int(nome_para_id_fornecedor(fornecedor_dropdown.value)),
                 "categoria": categoria_dropdown.value,
-                "data_cadastro": data_field.value
+                "data_cadastro": data_field.value,
+                "codigo_barras": codigo_barras_field.value
             }
 
             print(novo_produto)
 
             try:
-                if produto_para_edicao["index"] is None:
+                if produto_para_edicao["id"] is None:
                     # CADASTRO NOVO
                     produto_id = db_produtos.cadastrar_produto(novo_produto)
                     if produto_id is not None:
-                        novo_produto["id"] = produto_id
-                        produtos.append(novo_produto)
                         page.open(
                             ft.SnackBar(
                                 content=ft.Text("Produto cadastrado com sucesso!"),
@@ -275,12 +279,9 @@ def View(page: ft.Page):
                         raise Exception("Erro ao cadastrar produto")
                 else:
                     # EDIÇÃO
-                    index = produto_para_edicao["index"]
-                    produto_id = produtos[index]["id"]
+                    produto_id = produto_para_edicao["id"]
 
                     if db_produtos.atualizar_produto(produto_id, novo_produto):
-                        novo_produto["id"] = produto_id
-                        produtos[index] = novo_produto
                         page.open(
                             ft.SnackBar(
                                 content=ft.Text("Produto atualizado com sucesso!"),
@@ -290,8 +291,6 @@ def View(page: ft.Page):
                     else:
                         raise Exception("Erro ao atualizar produto")
 
-
-                atualizar_lista()
                 dialog.open = False
                 page.update()
             except Exception as e:
@@ -315,6 +314,7 @@ def View(page: ft.Page):
     )
 
     nome_field = ft.TextField(label="* Nome", width=180)
+    codigo_barras_field = ft.TextField(label="Código de Barras", width=300)
     descricao_field = ft.TextField(label="Descrição", width=300)
     preco_field = ft.TextField(label="* Preço", keyboard_type=ft.KeyboardType.NUMBER, width=300)
     preco_promocional_field = ft.TextField(label="Preço Promocional", keyboard_type=ft.KeyboardType.NUMBER, width=300)
@@ -370,6 +370,7 @@ def View(page: ft.Page):
         content=ft.Container(
             content=ft.Column([
                 ft.Row([id_field, nome_field], spacing=10),
+                codigo_barras_field,
                 descricao_field,
                 preco_field,
                 preco_promocional_field,
@@ -407,24 +408,25 @@ def View(page: ft.Page):
     page.overlay.append(confirm_dialog)
 
     campo_pesquisa = ft.TextField(
-        label="Pesquisar produto (por nome, categoria, fornecedor ou ID)",
+        label="Pesquisar produto (por ID, nome, categoria ou descrição)",
         visible=True,
-        on_change=lambda e: filtrar_produtos(e.control.value),
+        on_change=lambda e: busca.ao_digitar(e),
         prefix_icon=ft.Icons.SEARCH,
         width=500
     )
 
-    def filtrar_produtos(query):
-        tabela.rows.clear()
-        for i, p in enumerate(produtos):
-            if (
-                query.lower() in p["nome"].lower()
-                or query.lower() in p["categoria"].lower()
-                or query.lower() in (p["fornecedor"] or "").lower()
-                or query == str(p["id"])
-            ):
-                tabela.rows.append(criar_linha_tabela(i, p))
-        page.update()
+    def buscar_produtos(query):
+        # Roda fora do loop de eventos; texto vazio volta para a listagem paginada
+        return db_produtos.buscar(query) if query.strip() else None
+
+    def filtrar_produtos(query, resultados):
+        avisar_truncamento(campo_pesquisa, resultados)
+        if resultados is None:
+            atualizar_lista()
+            return
+        linhas.sincronizar(resultados["itens"])
+
+    busca = BuscaAdiada(page, buscar_produtos, filtrar_produtos)
 
     # Tabela que lista todos os produtos
     tabela = ft.DataTable(
@@ -444,13 +446,19 @@ def View(page: ft.Page):
         ],
         rows=[]
     )
+    linhas = TabelaChaveada(tabela, criar_linha_tabela)
+    # Cadastros e edições são relidos do banco (com o nome do fornecedor); o
+    # estoque baixado pelas vendas também chega por aqui
+    obter_cache_views(page).assinar(
+        ("produtos",), lambda alteracao: linhas.aplicar(alteracao, db_produtos.buscar_por_ids)
+    )
 
     # Atualiza a tabela ao carregar a tela
     atualizar_lista()
 
     # Função separada para abrir o diálogo de cadastro
     def abrir_dialogo_cadastro(e):
-        produto_para_edicao["index"] = None
+        produto_para_edicao["id"] = None
         limpar_campos()
         dialog.open = True
         page.update()
@@ -475,6 +483,8 @@ def View(page: ft.Page):
                             tabela, ft.Divider()
                         ],
                         scroll=ft.ScrollMode.AUTO,
+                        # Carrega a próxima página ao chegar perto do fim (exceto durante a pesquisa)
+                        on_scroll=lambda e: None if campo_pesquisa.value else paginas.ao_rolar(e),
                         expand=True
                     ),
                     ft.Container(
@@ -1,31 +1,13 @@
 import flet as ft
-from database import vendas_controller, clientes_controller, produtos_controller
+from database.relatorios_controller import RelatoriosController
 
+# Os relatórios agregam vendas e contam os cadastros
+TABELAS = ("vendas", "itens_venda", "produtos", "clientes")
 
-def gerar_relatorios(vendas, clientes, itens, produtos):
-    vendas_por_cliente = {}
-    vendas_por_produto = {}
-    total_geral = 0
 
-    # Agrupar vendas por cliente
-    for venda in vendas:
-        cliente_id = venda['cliente_id']
-        cliente_nome = next((c['nome'] for c in clientes if c['id'] == cliente_id), "Desconhecido")
-        vendas_por_cliente[cliente_nome] = vendas_por_cliente.get(cliente_nome, 0) + 1
-        total_geral += venda['total']
-
-        # Agrupar vendas por produto
-        for item in itens:
-            if item['venda_id'] == venda['id']:
-                produto_id = item['produto_id']
-                produto_nome = next((p['nome'] for p in produtos if p['id'] == produto_id), "Desconhecido")
-                vendas_por_produto[produto_nome] = vendas_por_produto.get(produto_nome, 0) + item['quantidade']
-
-    vendas_por_cliente = dict(sorted(vendas_por_cliente.items(), key=lambda item: item[1], reverse=True))
-    vendas_por_produto = dict(sorted(vendas_por_produto.items(), key=lambda item: item[1], reverse=True))
-    
-
-    return vendas_por_cliente, vendas_por_produto, total_geral
+def gerar_relatorios(db_relatorios):
+    """Agrega vendas por cliente, quantidade por produto e o total geral no banco (GROUP BY)."""
+    return db_relatorios.gerar_relatorios()
 
 
 def formatar_moeda(valor):
@@ -82,25 +64,19 @@ def criar_tabela(titulo, dados, col1, col2):
 
 
 def View(page: ft.Page):
-    db = page.client_storage.get("user_db")
-    db_vendas = vendas_controller.VendasController(db)
-    db_clientes = clientes_controller.ClientesController(db)
-    db_produtos = produtos_controller.ProdutosController(db)
-    produtos = db_produtos.listar_produtos()
-    vendas = db_vendas.listar_vendas()
-    clientes = db_clientes.listar_clientes()
-    itens = db_vendas.listar_itens_venda()
+    db_relatorios = RelatoriosController(page.client_storage.get("user_db"))
     def VaiPraHome(e):
         page.go("/home")
 
-    vendas_por_cliente, vendas_por_produto, total_geral = gerar_relatorios(vendas, clientes, itens, produtos)
+    vendas_por_cliente, vendas_por_produto, total_geral = gerar_relatorios(db_relatorios)
+    cadastros = db_relatorios.contar_cadastros()
 
     cards = ft.Row([
         criar_card("Total de Vendas", formatar_moeda(total_geral), ft.Icons.ATTACH_MONEY,
                    ft.Colors.GREEN_500, ft.Colors.GREEN_50),
-        criar_card("Produtos", str(len(produtos)), ft.Icons.INVENTORY_2,
+        criar_card("Produtos", str(cadastros["produtos"]), ft.Icons.INVENTORY_2,
                    ft.Colors.BLUE_500, ft.Colors.BLUE_50),
-        criar_card("Clientes", str(len(clientes)), ft.Icons.PEOPLE,
+        criar_card("Clientes", str(cadastros["clientes"]), ft.Icons.PEOPLE,
                    ft.Colors.ORANGE_500, ft.Colors.ORANGE_50),
     ], spacing=15)
 
@@ -1,26 +1,78 @@
 import flet as ft
 import globals
 import datetime
-import pandas as pd
 import os
-from database.vendas_controller import VendasController
-
-_clock_task_vendas = None
+import threading
+from database.vendas_controller import VendasController, intervalo_do_periodo
+from utils import formatar_data_hora, ExportacaoCancelada
+from componentes.paginacao import CarregadorPaginas
+from componentes.busca import BuscaAdiada
+from componentes.lista_virtual import ListaVirtual
+from componentes.relogio import obter_relogio
+from componentes.cache_views import obter_cache_views
+from database.eventos import EXCLUSAO
+
+# Tabelas exibidas na lista de vendas
+TABELAS = ("vendas", "clientes", "funcionarios")
+
+# Alturas fixas (em pixels) dos itens da lista virtualizada de vendas
+ALTURA_CABECALHO = 50
+ALTURA_CARTAO = 120
 
 def View(page: ft.Page):
     db_vendas = VendasController(page.client_storage.get("user_db"))
-    global _clock_task_vendas
     venda_para_excluir = {'index': None}
 
-    vendas = db_vendas.listar_vendas() 
-    print("Vendas carregadas:", vendas) # Para depuração
+    # Vendas carregadas até agora, da mais recente para a mais antiga (página a página)
+    vendas = []
+
+    def adicionar_pagina(novas):
+        vendas.extend(novas)
+        atualizar_lista()
+
+    paginas = CarregadorPaginas(db_vendas.listar_vendas_paginado, adicionar_pagina)
+
+    # Resultado da pesquisa, também paginado, vindo do banco (não só das páginas carregadas)
+    pesquisa_atual = {"termo": ""}
+    resultados = []
+
+    def adicionar_resultados(novos):
+        resultados.extend(novos)
+        atualizar_lista()
+
+    paginas_pesquisa = CarregadorPaginas(
+        lambda apos, limite: db_vendas.pesquisar_vendas_paginado(pesquisa_atual["termo"], apos, limite),
+        adicionar_resultados
+    )
+
+    def recarregar_vendas():
+        vendas.clear()
+        if not paginas.reiniciar():
+            atualizar_lista()
+
+    def aplicar_alteracao(alteracao):
+        # Vendas gravadas, editadas ou excluídas (aqui ou no cadastro de vendas)
+        # entram ou saem da lista sem recarregar as páginas já exibidas
+        if not alteracao.ids:
+            recarregar_vendas()
+            return
+        ids = set(alteracao.ids)
+        vendas[:] = [v for v in vendas if v["id"] not in ids]
+        if alteracao.operacao != EXCLUSAO:
+            for venda in db_vendas.buscar_por_ids(ids):
+                # Mais antiga que a última carregada: aparece ao rolar até a sua página
+                if paginas.esgotado or not vendas or (venda["data_venda"] or "") >= (vendas[-1]["data_venda"] or ""):
+                    vendas.append(venda)
+            vendas.sort(key=lambda v: (v["data_venda"] or "", v["id"]), reverse=True)
+        atualizar_lista()
+        if pesquisa_atual["termo"]:
+            # A venda alterada pode ter entrado ou saído do resultado da pesquisa
+            busca.agendar(pesquisa.value or "")
+
+    obter_cache_views(page).assinar(("vendas",), aplicar_alteracao)
     
 
     def voltar_home(e):
-        # Ao sair da View, cancela a tarefa do relógio (se estiver rodando)
-        if _clock_task_vendas and not _clock_task_vendas.done():
-            _clock_task_vendas.cancel()
-            print("Tarefa atualiza_tempo cancelada (Vendas).") # Para depuração
         page.go("/home")
 
     def ir_para_cadastro_vendas(e):
@@ -50,7 +102,6 @@ def View(page: ft.Page):
                     ft.Text(f"Venda {venda_id} excluída com sucesso!", color=ft.Colors.WHITE),
                     bgcolor=ft.Colors.GREEN_700
                 )
-                atualizar_lista() # Atualiza a lista de vendas
             except Exception as ex:
                 page.open = ft.SnackBar(
                     ft.Text(f"Erro ao excluir venda: {ex}", color=ft.Colors.WHITE),
@@ -68,122 +119,141 @@ def View(page: ft.Page):
     pesquisa = ft.TextField(
         hint_text="Pesquisar vendas (Cliente, Data, Status, Vendedor)...",
         prefix_icon=ft.Icons.SEARCH,
-        on_change=lambda e: atualizar_lista(),
+        on_change=lambda e: busca.ao_digitar(e),
         expand=True,
         filled=True, # Adiciona estilo preenchido
         fill_color=ft.Colors.GREY_100, # Cor de preenchimento
     )
 
+    def ao_rolar_lista(e):
+        lista_virtual.ao_rolar(e)
+        # Carrega a próxima página (da listagem ou da pesquisa) ao chegar perto do fim
+        if pesquisa_atual["termo"]:
+            paginas_pesquisa.ao_rolar(e)
+        else:
+            paginas.ao_rolar(e)
+
     lista_vendas = ft.Column(
         scroll=ft.ScrollMode.AUTO, # Permite rolagem dentro da coluna
         expand=True, # Permite que a coluna se expanda
+        spacing=0, # As alturas dos itens já incluem o espaçamento
+        on_scroll=ao_rolar_lista,
     )
 
 
     # Relógio na AppBar
     hora_atual = ft.Text("", color=ft.Colors.WHITE)
-    def atualizar_hora_vendas():
-        hora_atual.value = f"Hoje: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"
-        page.update()
-
-    async def atualiza_tempo_vendas():
-        while True:
-            atualizar_hora_vendas()
-            await asyncio.sleep(1)
+    obter_relogio(page).registrar(hora_atual, "/vendas")
 
     # --- Lógica de Agrupamento e Listagem ---
+    def titulo_do_dia(dia_iso):
+        try:
+            return datetime.date.fromisoformat(dia_iso).strftime('%A, %d/%m/%Y') # Dia da semana e data
+        except ValueError:
+            return "Data não informada"
+
+    def pesquisar_vendas(termo):
+        # Primeira página da pesquisa no banco (cliente, data, status, vendedor ou ID)
+        termo = termo.strip()
+        return db_vendas.pesquisar_vendas_paginado(termo) if termo else None
+
+    def aplicar_pesquisa(termo, pagina):
+        if pagina is None:
+            pesquisa_atual["termo"] = ""
+            resultados.clear()
+        else:
+            pesquisa_atual["termo"] = termo.strip()
+            resultados[:] = pagina["itens"]
+            paginas_pesquisa.continuar(pagina)
+        exibir_vendas(resultados if pesquisa_atual["termo"] else vendas, manter_posicao=False)
+
     def atualizar_lista():
-        lista_vendas.controls.clear()
+        exibir_vendas(resultados if pesquisa_atual["termo"] else vendas)
 
-        termo = pesquisa.value.lower() if pesquisa.value else "" # Termo de pesquisa
-        
-        # Filtra as vendas com base no termo de pesquisa
-        vendas_filtradas = [
-            v for v in vendas
-            if termo in v["cliente_nome"].lower()
-            or termo in v["data_venda"].lower()
-            or termo in v["status"].lower()
-            or termo in v["funcionario_nome"].lower()
-            or termo in str(v["id"]) # Permite pesquisar pelo ID da venda
-        ]
+    def exibir_vendas(vendas_filtradas, manter_posicao=True):
+        lista_virtual.definir(indexar_por_dia(vendas_filtradas), manter_posicao)
 
-        # Agrupar vendas
-        vendas_agrupadas = {}
+    def indexar_por_dia(vendas_filtradas):
+        # As vendas já vêm ordenadas por data_venda (ISO) decrescente, então
+        # basta emitir um cabeçalho sempre que o dia muda. Só tuplas leves são
+        # criadas aqui; os cards são montados pela lista virtual sob demanda
+        entradas = []
+        dia_atual = None
         for v in vendas_filtradas:
-            try:
-                # Tenta converter a data para o formato desejado
-                data_venda = datetime.datetime.strptime(v["data_venda"], "%d/%m/%Y %H:%M:%S")
-            except:
-                data_venda = datetime.datetime.now() # Se falhar, usa a data atual
-
-            titulo_dia = f"{data_venda.strftime('%A, %d/%m/%Y')}" # Agrupa por dia da semana e data
-
-            # Adiciona ao agrupamento (pode ser ajustado para só um tipo de agrupamento se preferir)
-            if titulo_dia not in vendas_agrupadas:
-                vendas_agrupadas[titulo_dia] = []
-            vendas_agrupadas[titulo_dia].append(v) # Guarda o índice original e a venda
-
-        # Ordena os grupos por data (do mais recente para o mais antigo)
-        dias_ordenados = sorted(vendas_agrupadas.keys(),
-                                key=lambda x: datetime.datetime.strptime(x.split(", ")[1],
-                                                                         "%d/%m/%Y"), reverse=True)
-
-        # Adiciona os grupos e as vendas à lista_vendas
-        if not vendas_agrupadas:
-            lista_vendas.controls.append(ft.Text("Nenhuma venda encontrada.", italic=True, color=ft.Colors.GREY))
-        else:
-            for dia in dias_ordenados:
-                lista_vendas.controls.append(
-                    ft.Container(
-                        content=ft.Text(dia, size=18, weight=ft.FontWeight.BOLD, color=ft.Colors.BLACK87),
-                        padding=ft.padding.only(top=15, bottom=5)
-                    )
-                )
-                for v in vendas_agrupadas[dia]:
-                    print(f"Adicionando venda para o dia {dia}: {v}") # Para depuração
-                    status_color = ft.Colors.GREEN_500 if v["status"] == "Concluída" else \
-                                   ft.Colors.ORANGE_500 if v["status"] == "Pendente" else \
-                                   ft.Colors.RED_500
-                    
-                    # Usar replace para formatação de moeda brasileira
-                    total_formatado = f"R$ {v['total']:.2f}".replace(".", "X").replace(",", ".").replace("X", ",")
-
-                    linha = ft.Card(
-                        content=ft.Container(
-                            padding=10,
-                            content=ft.Column([
-                                ft.Row([
-                                    ft.Text(f"ID: {v['id']}", size=14, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_800), # Adiciona o ID
-                                    ft.Text(f"Cliente: {v['cliente_nome']}", size=14, weight=ft.FontWeight.BOLD),
-                                    ft.Text(f"Total: {total_formatado}", size=14, weight=ft.FontWeight.BOLD, color=ft.Colors.DEEP_PURPLE_500),
-                                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                                ft.Row([
-                                    ft.Text(f"Status: {v['status']}", color=status_color),
-                                    ft.Text(f"Vendedor: {v['funcionario_nome']}", size=14, weight=ft.FontWeight.BOLD),
-                                    ft.Text(f"Data: {v['data_venda']}"), # Mantém a data completa aqui
-                                    ft.Row([
-                                        ft.IconButton(
-                                            icon=ft.Icons.EDIT,
-                                            icon_color=ft.Colors.BLUE,
-                                            tooltip="Editar venda",
-                                            on_click=editar_venda(v['id']) # Passa o índice da venda
-                                        ),
-                                        ft.IconButton(
-                                            icon=ft.Icons.DELETE,
-                                            icon_color=ft.Colors.RED,
-                                            tooltip="Excluir venda",
-                                            on_click=excluir_venda(v['id']) # Passa o índice da venda
-                                        ),
-                                    ])
-                                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                            ])
-                        ),
-                        elevation=2, # Sombra para destacar o card
-                        color=ft.Colors.WHITE, # Fundo do card
-                    )
-                    lista_vendas.controls.append(linha)
-                    lista_vendas.controls.append(ft.Divider(height=5, color=ft.Colors.TRANSPARENT)) # Espaçamento entre cards
-        page.update()
+            dia = (v["data_venda"] or "")[:10]
+            if dia != dia_atual:
+                entradas.append(("dia", dia))
+                dia_atual = dia
+            entradas.append(("venda", v))
+        return entradas or [("vazio", None)]
+
+    def altura_item(entrada):
+        return ALTURA_CARTAO if entrada[0] == "venda" else ALTURA_CABECALHO
+
+    def criar_item(entrada):
+        tipo, valor = entrada
+        if tipo == "vazio":
+            return ft.Container(
+                content=ft.Text("Nenhuma venda encontrada.", italic=True, color=ft.Colors.GREY),
+                height=ALTURA_CABECALHO
+            )
+        if tipo == "dia":
+            return ft.Container(
+                content=ft.Text(titulo_do_dia(valor), size=18, weight=ft.FontWeight.BOLD, color=ft.Colors.BLACK87),
+                padding=ft.padding.only(top=15, bottom=5),
+                height=ALTURA_CABECALHO
+            )
+        return criar_card_venda(valor)
+
+    def criar_card_venda(v):
+        status_color = ft.Colors.GREEN_500 if v["status"] == "Concluída" else \
+                       ft.Colors.ORANGE_500 if v["status"] == "Pendente" else \
+                       ft.Colors.RED_500
+        
+        # Usar replace para formatação de moeda brasileira
+        total_formatado = f"R$ {v['total']:.2f}".replace(".", "X").replace(",", ".").replace("X", ",")
+
+        card = ft.Card(
+            content=ft.Container(
+                padding=10,
+                content=ft.Column([
+                    ft.Row([
+                        ft.Text(f"ID: {v['id']}", size=14, weight=ft.FontWeight.BOLD, color=ft.Colors.BLUE_800), # Adiciona o ID
+                        ft.Text(f"Cliente: {v['cliente_nome']}", size=14, weight=ft.FontWeight.BOLD, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+                        ft.Text(f"Total: {total_formatado}", size=14, weight=ft.FontWeight.BOLD, color=ft.Colors.DEEP_PURPLE_500),
+                    ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                    ft.Row([
+                        ft.Text(f"Status: {v['status']}", color=status_color),
+                        ft.Text(f"Vendedor: {v['funcionario_nome']}", size=14, weight=ft.FontWeight.BOLD, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
+                        ft.Text(f"Data: {formatar_data_hora(v['data_venda'])}"), # Mantém a data completa aqui
+                        ft.Row([
+                            ft.IconButton(
+                                icon=ft.Icons.EDIT,
+                                icon_color=ft.Colors.BLUE,
+                                tooltip="Editar venda",
+                                on_click=editar_venda(v['id']) # Passa o ID da venda
+                            ),
+                            ft.IconButton(
+                                icon=ft.Icons.DELETE,
+                                icon_color=ft.Colors.RED,
+                                tooltip="Excluir venda",
+                                on_click=excluir_venda(v['id']) # Passa o ID da venda
+                            ),
+                        ])
+                    ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                ])
+            ),
+            elevation=2, # Sombra para destacar o card
+            color=ft.Colors.WHITE, # Fundo do card
+        )
+        # Altura fixa (com o espaçamento entre cards) para a lista virtual
+        # calcular a posição de cada item sem montá-lo
+        return ft.Container(content=card, height=ALTURA_CARTAO, padding=ft.padding.only(bottom=5))
+
+    lista_virtual = ListaVirtual(lista_vendas, criar_item, altura_item)
+
+    # A pesquisa roda fora do loop e só o resultado da última tecla é exibido
+    busca = BuscaAdiada(page, pesquisar_vendas, aplicar_pesquisa)
 
     confirm_dialog = ft.AlertDialog(
         modal=True,
@@ -196,73 +266,86 @@ def View(page: ft.Page):
     )
     page.overlay.append(confirm_dialog)
 
-    # --- Função de Download ---
-    def _pick_folder_result(e: ft.FilePickerResultEvent):
-        if e.path:
-            folder_path.value = e.path
-            folder_path.update()
-            
-            # Obtém o tipo de relatório selecionado
-            report_type = report_type_dropdown.value
-
-            df = pd.DataFrame(vendas)
-            
-            # Converte a coluna 'data' para datetime
-            df['data_dt'] = pd.to_datetime(df['data'].str.split(' ').str[0], format='%d/%m/%Y')
-            
-            current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"relatorio_vendas_{report_type.lower()}_{current_time}.csv"
-            full_path = os.path.join(e.path, filename)
-
-            if report_type == "Diário":
-                today = datetime.date.today()
-                df_filtered = df[df['data_dt'].dt.date == today]
-            elif report_type == "Semanal":
-                # Pega o início da semana atual (segunda-feira)
-                today = datetime.date.today()
-                start_of_week = today - datetime.timedelta(days=today.weekday())
-                end_of_week = start_of_week + datetime.timedelta(days=6)
-                df_filtered = df[(df['data_dt'].dt.date >= start_of_week) & (df['data_dt'].dt.date <= end_of_week)]
-            elif report_type == "Mensal":
-                today = datetime.date.today()
-                start_of_month = datetime.date(today.year, today.month, 1)
-                # Calcula o último dia do mês
-                if today.month == 12:
-                    end_of_month = datetime.date(today.year + 1, 1, 1) - datetime.timedelta(days=1)
-                else:
-                    end_of_month = datetime.date(today.year, today.month + 1, 1) - datetime.timedelta(days=1)
-                df_filtered = df[(df['data_dt'].dt.date >= start_of_month) & (df['data_dt'].dt.date <= end_of_month)]
-            else: # Todos
-                df_filtered = df.copy()
-                filename = f"relatorio_vendas_completo_{current_time}.csv"
-                full_path = os.path.join(e.path, filename)
-
-            # Remove a coluna temporária de data
-            df_filtered = df_filtered.drop(columns=['data_dt'])
-            
-            if not df_filtered.empty:
-                try:
-                    df_filtered.to_csv(full_path, index=False, sep=';', decimal=',') # Separador ; e decimal ,
-                    page.snack_bar = ft.SnackBar(
-                        ft.Text(f"Relatório '{report_type}' exportado para: {full_path}", color=ft.Colors.WHITE),
-                        bgcolor=ft.Colors.GREEN_700
-                    )
-                except Exception as ex:
-                    page.snack_bar = ft.SnackBar(
-                        ft.Text(f"Erro ao exportar relatório: {ex}", color=ft.Colors.WHITE),
-                        bgcolor=ft.Colors.RED_700
-                    )
+    # --- Exportação do Relatório (CSV) ---
+    # Tipo de relatório -> período de intervalo_do_periodo (None = todas as vendas)
+    periodos_relatorio = {"Diário": "dia", "Semanal": "semana", "Mensal": "mes", "Todos": None}
+    exportacao = {"pasta": None, "cancelar": None}
+
+    def mostrar_aviso(mensagem, cor):
+        page.snack_bar = ft.SnackBar(ft.Text(mensagem, color=ft.Colors.WHITE), bgcolor=cor)
+        page.snack_bar.open = True
+
+    def iniciar_exportacao(pasta):
+        if exportacao["cancelar"] is not None:
+            return # Já existe uma exportação em andamento
+        if not pasta:
+            mostrar_aviso("Selecione a pasta de destino.", ft.Colors.ORANGE_700)
+            page.update()
+            return
+
+        report_type = report_type_dropdown.value
+        periodo = periodos_relatorio.get(report_type)
+        # O filtro por período é feito no banco, pelo índice de data_venda
+        inicio, fim = intervalo_do_periodo(periodo) if periodo else (None, None)
+        total = db_vendas.contar_vendas(inicio, fim)
+        if total == 0:
+            mostrar_aviso(f"Não há vendas para o período '{report_type}'.", ft.Colors.ORANGE_700)
+            page.update()
+            return
+
+        current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        sufixo = report_type.lower() if periodo else "completo"
+        full_path = os.path.join(pasta, f"relatorio_vendas_{sufixo}_{current_time}.csv")
+
+        exportacao["cancelar"] = threading.Event()
+        progresso.value = 0
+        progresso_texto.value = f"0 de {total} vendas"
+        progresso_area.visible = True
+        botao_baixar.disabled = True
+        download_dialog.update()
+        # A gravação roda numa thread própria; a tela continua respondendo
+        page.run_thread(exportar_relatorio, full_path, inicio, fim, total, report_type)
+
+    def exportar_relatorio(full_path, inicio, fim, total, report_type):
+        cancelar = exportacao["cancelar"]
+
+        def ao_progredir(gravadas):
+            progresso.value = min(gravadas / total, 1)
+            progresso_texto.value = f"{gravadas} de {total} vendas"
+            progresso.update()
+            progresso_texto.update()
+
+        try:
+            exportadas = db_vendas.exportar_vendas_csv(full_path, inicio, fim, ao_progredir, cancelar.is_set)
+            if exportadas is None:
+                mostrar_aviso("Erro ao exportar relatório.", ft.Colors.RED_700)
             else:
-                page.snack_bar = ft.SnackBar(
-                    ft.Text(f"Não há vendas para o período '{report_type}'.", color=ft.Colors.WHITE),
-                    bgcolor=ft.Colors.ORANGE_700
-                )
-            page.snack_bar.open = True
+                mostrar_aviso(f"Relatório '{report_type}' ({exportadas} vendas) exportado para: {full_path}",
+                              ft.Colors.GREEN_700)
+        except ExportacaoCancelada:
+            mostrar_aviso("Exportação cancelada.", ft.Colors.ORANGE_700)
+        finally:
+            exportacao["cancelar"] = None
+            progresso_area.visible = False
+            botao_baixar.disabled = False
+            download_dialog.open = False
             page.update()
 
+    def cancelar_download(e):
+        if exportacao["cancelar"] is not None:
+            # A thread para no próximo lote e fecha o diálogo
+            exportacao["cancelar"].set()
+            return
         download_dialog.open = False
         page.update()
 
+    def _pick_folder_result(e: ft.FilePickerResultEvent):
+        if e.path:
+            exportacao["pasta"] = e.path
+            folder_path.value = e.path
+            folder_path.update()
+            iniciar_exportacao(e.path)
+
     folder_path = ft.Text("Nenhuma pasta selecionada")
     file_picker = ft.FilePicker(on_result=_pick_folder_result)
     page.overlay.append(file_picker)
@@ -278,6 +361,11 @@ def View(page: ft.Page):
         width=200
     )
 
+    progresso = ft.ProgressBar(value=0, width=300)
+    progresso_texto = ft.Text("")
+    progresso_area = ft.Column([progresso, progresso_texto], visible=False, tight=True)
+    botao_baixar = ft.TextButton("Baixar", on_click=lambda e: iniciar_exportacao(exportacao["pasta"]))
+
     download_dialog = ft.AlertDialog(
         modal=True,
             title=ft.Text("Baixar Relatório de Vendas"),
@@ -292,10 +380,11 @@ def View(page: ft.Page):
                     ),
                     folder_path,
                 ]),
+                progresso_area,
             ], tight=True),
             actions=[
-                ft.TextButton("Baixar", on_click=lambda e: _pick_folder_result(ft.FilePickerResultEvent(path=folder_path.value))),
-                ft.TextButton("Cancelar", on_click=lambda e: (setattr(download_dialog, 'open', False), page.update())),
+                botao_baixar,
+                ft.TextButton("Cancelar", on_click=cancelar_download),
             ],
             actions_alignment=ft.MainAxisAlignment.END,
         )
@@ -307,14 +396,8 @@ def View(page: ft.Page):
         page.update()
 
     # --- Inicialização da View ---
-    # Inicia a tarefa do relógio apenas uma vez por View
-    import asyncio # Garante que asyncio esteja importado
-    if not _clock_task_vendas or _clock_task_vendas.done():
-        _clock_task_vendas = page.run_task(atualiza_tempo_vendas)
-        print("Tarefa atualiza_tempo iniciada (Vendas).")
-
-    # Garante que a lista é atualizada ao entrar na página
-    page.on_ready = lambda: atualizar_lista()
+    # Carrega a primeira página de vendas ao entrar na página
+    recarregar_vendas()
 
     return ft.View(
         route="/vendas",
@@ -1,18 +1,39 @@
 import sqlite3
 import hashlib
+import hmac
+import threading
 from contextlib import contextmanager
 import os
 from typing import Optional
+from database.migracoes import aplicar_migracoes
 
 MAIN_DATABASE = "users.db"
 
+# Fator de trabalho do PBKDF2 para novas senhas. Pode ser ajustado pela
+# variável de ambiente PBKDF2_ITERACOES; use benchmarks/bench_pbkdf2.py para
+# medir o custo na máquina de produção. Cada usuário guarda o fator usado no
+# seu hash, e o hash é refeito no próximo login quando o fator muda.
+ITERACOES_PBKDF2 = int(os.environ.get("PBKDF2_ITERACOES", "100000"))
+
+# Fator usado pelos hashes gravados antes da coluna usuarios.iteracoes existir
+ITERACOES_LEGADO = 100000
+
+_conexao = None
+_conexao_lock = threading.RLock()
+
 @contextmanager
 def get_db_connection():
-    conn = sqlite3.connect(MAIN_DATABASE)
-    try:
-        yield conn
-    finally:
-        conn.close()
+    """Empresta a conexão compartilhada com users.db, uma thread por vez"""
+    global _conexao
+    with _conexao_lock:
+        if _conexao is None:
+            _conexao = sqlite3.connect(MAIN_DATABASE, check_same_thread=False)
+        try:
+            yield _conexao
+        finally:
+            # Não deixa transação aberta para o próximo uso da conexão
+            if _conexao.in_transaction:
+                _conexao.rollback()
 
 def init_db():
     """Inicializa o banco de dados principal de usuários"""
@@ -31,51 +52,58 @@ def init_db():
             usuario TEXT NOT NULL UNIQUE,
             senha_hash TEXT NOT NULL,
             salt TEXT NOT NULL,
-            db_name TEXT UNIQUE NOT NULL
+            db_name TEXT UNIQUE NOT NULL,
+            iteracoes INTEGER NOT NULL DEFAULT 100000
         )
         """)
+        colunas = [row[1] for row in cursor.execute("PRAGMA table_info(usuarios)")]
+        if "iteracoes" not in colunas:
+            cursor.execute(
+                f"ALTER TABLE usuarios ADD COLUMN iteracoes INTEGER NOT NULL DEFAULT {ITERACOES_LEGADO}"
+            )
         conn.commit()
-        conn.close()
 
-def hash_password(password: str, salt: Optional[bytes] = None) -> tuple:
-    """Gera um hash seguro da senha usando PBKDF2"""
+def hash_password(password: str, salt: Optional[bytes] = None, iteracoes: Optional[int] = None) -> tuple:
+    """Gera um hash seguro da senha usando PBKDF2 (padrão: ITERACOES_PBKDF2 iterações)"""
     if salt is None:
         salt = os.urandom(16)
+    if iteracoes is None:
+        iteracoes = ITERACOES_PBKDF2
     
     password_hash = hashlib.pbkdf2_hmac(
         'sha256',
         password.encode('utf-8'),
         salt,
-        100000
+        iteracoes
     )
     
     return password_hash, salt
 
 def create_user(nome, email, empresa, usuario, senha):
     """Cria um novo usuário no banco de dados"""
-    with get_db_connection() as conn:
-        try:
-            senha_hash, salt = hash_password(senha)
-            db_name = f"user_{usuario.lower()}.db"
-            
+    try:
+        # O hash é calculado fora do lock da conexão compartilhada
+        senha_hash, salt = hash_password(senha)
+        db_name = f"user_{usuario.lower()}.db"
+
+        with get_db_connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute(
-                "INSERT INTO usuarios (nome, email, empresa, usuario, senha_hash, salt, db_name) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (nome, email, empresa, usuario, senha_hash.hex(), salt.hex(), db_name)
+                "INSERT INTO usuarios (nome, email, empresa, usuario, senha_hash, salt, db_name, iteracoes) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (nome, email, empresa, usuario, senha_hash.hex(), salt.hex(), db_name, ITERACOES_PBKDF2)
             )
             
             conn.commit()
-            conn.close()
             
-            # Cria o banco de dados específico do usuário
-            init_user_db(db_name)
-            return True
-        except sqlite3.IntegrityError:
-            return False
-        except Exception as e:
-            print(f"Erro ao criar usuário: {e}")
-            return False
+        # Cria o banco de dados específico do usuário
+        init_user_db(db_name)
+        return True
+    except sqlite3.IntegrityError:
+        return False
+    except Exception as e:
+        print(f"Erro ao criar usuário: {e}")
+        return False
 
 def init_user_db(db_name: str):
     """Inicializa o banco de dados específico do usuário"""
@@ -185,164 +213,8 @@ def init_user_db(db_name: str):
                 FOREIGN KEY (funcionario_id) REFERENCES funcionarios(id) ON DELETE SET NULL
             );""",
 
-            """CREATE TRIGGER IF NOT EXISTS trigger_baixa_estoque_venda
-            AFTER INSERT ON itens_venda
-            WHEN (SELECT status FROM vendas WHERE id = NEW.venda_id) = 'Concluída'
-            BEGIN
-                UPDATE produtos 
-                SET estoque_atual = estoque_atual - NEW.quantidade,
-                    data_atualizacao = datetime('now')
-                WHERE id = NEW.produto_id 
-                AND estoque_atual >= NEW.quantidade;
-                INSERT INTO movimentacao_estoque (
-                    produto_id, tipo_movimentacao, quantidade, 
-                    estoque_anterior, estoque_atual, motivo,
-                    referencia_id, referencia_tipo, funcionario_id
-                )
-                SELECT 
-                    NEW.produto_id, 'SAIDA', NEW.quantidade,
-                    p.estoque_atual + NEW.quantidade, p.estoque_atual,
-                    'Venda de produto', NEW.venda_id, 'VENDA',
-                    (SELECT funcionario_id FROM vendas WHERE id = NEW.venda_id)
-                FROM produtos p WHERE p.id = NEW.produto_id;
-            END;""",
-
-            """CREATE TRIGGER IF NOT EXISTS trigger_venda_pendente
-            AFTER INSERT ON vendas
-            WHEN NEW.status = 'Pendente'
-            BEGIN
-                UPDATE produtos 
-                SET estoque_atual = estoque_atual - (
-                    SELECT quantidade FROM itens_venda
-                    WHERE venda_id = NEW.id AND produto_id = produtos.id
-                ),
-                data_atualizacao = datetime('now')
-                WHERE id IN (SELECT produto_id FROM itens_venda WHERE venda_id = NEW.id)
-                AND estoque_atual >= (
-                    SELECT quantidade FROM itens_venda 
-                    WHERE venda_id = NEW.id AND produto_id = produtos.id
-                );
-                INSERT INTO movimentacao_estoque (
-                    produto_id, tipo_movimentacao, quantidade,
-                    estoque_anterior, estoque_atual, motivo,
-                    referencia_id, referencia_tipo, funcionario_id
-                )
-                SELECT 
-                    iv.produto_id, 'SAIDA', iv.quantidade,
-                    p.estoque_atual + iv.quantidade, p.estoque_atual,
-                    'Venda pendente', NEW.id, 'VENDA', NEW.funcionario_id
-                FROM itens_venda iv
-                JOIN produtos p ON p.id = iv.produto_id
-                WHERE iv.venda_id = NEW.id;
-            END;
-            """,
-
-        """CREATE TRIGGER IF NOT EXISTS trg_movimentacao_estoque_status
-        AFTER UPDATE OF status ON vendas
-        WHEN OLD.status != NEW.status
-        BEGIN
-            INSERT INTO movimentacao_estoque (
-                produto_id, tipo_movimentacao, quantidade, 
-                estoque_anterior, estoque_atual, motivo,
-                referencia_id, referencia_tipo, funcionario_id,
-                observacoes
-            )
-            SELECT 
-                iv.produto_id,
-                'SAIDA',
-                iv.quantidade,
-                p.estoque_atual,
-                p.estoque_atual - iv.quantidade,
-                'Venda concluída',
-                NEW.id,
-                'VENDA',
-                NEW.funcionario_id,
-                'Status alterado de ' || OLD.status || ' para ' || NEW.status
-            FROM itens_venda iv
-            JOIN produtos p ON iv.produto_id = p.id
-            WHERE iv.venda_id = NEW.id 
-            AND NEW.status = 'Concluída'
-            AND OLD.status = 'Pendente';
-            
-            INSERT INTO movimentacao_estoque (
-                produto_id, tipo_movimentacao, quantidade, 
-                estoque_anterior, estoque_atual, motivo,
-                referencia_id, referencia_tipo, funcionario_id,
-                observacoes
-            )
-            SELECT 
-                iv.produto_id,
-                'DEVOLUCAO',
-                iv.quantidade,
-                p.estoque_atual,
-                p.estoque_atual + iv.quantidade,
-                'Venda cancelada',
-                NEW.id,
-                'VENDA',
-                NEW.funcionario_id,
-                'Status alterado de ' || OLD.status || ' para ' || NEW.status
-            FROM itens_venda iv
-            JOIN produtos p ON iv.produto_id = p.id
-            WHERE iv.venda_id = NEW.id 
-            AND NEW.status = 'Cancelada'
-            AND OLD.status = 'Concluída';
-            
-            INSERT INTO movimentacao_estoque (
-                produto_id, tipo_movimentacao, quantidade, 
-                estoque_anterior, estoque_atual, motivo,
-                referencia_id, referencia_tipo, funcionario_id,
-                observacoes
-            )
-            SELECT 
-                iv.produto_id,
-                'SAIDA',
-                iv.quantidade,
-                p.estoque_atual,
-                p.estoque_atual - iv.quantidade,
-                'Reativação de venda',
-                NEW.id,
-                'VENDA',
-                NEW.funcionario_id,
-                'Status alterado de ' || OLD.status || ' para ' || NEW.status
-            FROM itens_venda iv
-            JOIN produtos p ON iv.produto_id = p.id
-            WHERE iv.venda_id = NEW.id 
-            AND NEW.status = 'Pendente'
-            AND OLD.status = 'Cancelada';
-            
-            UPDATE produtos 
-            SET estoque_atual = estoque_atual - (
-                SELECT iv.quantidade 
-                FROM itens_venda iv 
-                WHERE iv.produto_id = produtos.id 
-                AND iv.venda_id = NEW.id
-            ),
-            data_atualizacao = datetime('now')
-            WHERE id IN (
-                SELECT iv.produto_id 
-                FROM itens_venda iv 
-                WHERE iv.venda_id = NEW.id
-            )
-            AND ((NEW.status = 'Concluída' AND OLD.status = 'Pendente') 
-                OR (NEW.status = 'Pendente' AND OLD.status = 'Cancelada'));
-            
-            UPDATE produtos 
-            SET estoque_atual = estoque_atual + (
-                SELECT iv.quantidade 
-                FROM itens_venda iv 
-                WHERE iv.produto_id = produtos.id 
-                AND iv.venda_id = NEW.id
-            ),
-            data_atualizacao = datetime('now')
-            WHERE id IN (
-                SELECT iv.produto_id 
-                FROM itens_venda iv 
-                WHERE iv.venda_id = NEW.id
-            )
-            AND NEW.status = 'Cancelada' 
-            AND OLD.status = 'Concluída';
-            
-        END;""",
+            # Os gatilhos de estoque das vendas são criados pelas migrações
+            # (database/migracoes.py, GATILHOS_ESTOQUE)
 
         """CREATE TRIGGER IF NOT EXISTS trg_produto_adicionado
         AFTER INSERT ON produtos
@@ -380,6 +252,7 @@ def init_user_db(db_name: str):
             cursor.execute(tabela)
         conn.commit()
         print("Todas as tabelas foram criadas com sucesso!")
+        aplicar_migracoes(conn)
         conn.close()
     except sqlite3.Error as e:
         print(f"Erro ao criar tabelas: {e}")
@@ -387,31 +260,45 @@ def init_user_db(db_name: str):
 
 def verify_user(usuario, senha):
     """Verifica o usuário e retorna seus dados se válido"""
-    with get_db_connection() as conn:
-        try:
+    try:
+        with get_db_connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute(
-                "SELECT senha_hash, salt, db_name FROM usuarios WHERE usuario = ?",
+                "SELECT senha_hash, salt, db_name, iteracoes FROM usuarios WHERE usuario = ?",
                 (usuario,)
             )
             
             result = cursor.fetchone()
             
-            if not result:
-                return None
-                
-            stored_hash_hex, salt_hex, db_name = result
-            stored_hash = bytes.fromhex(stored_hash_hex)
-            salt = bytes.fromhex(salt_hex)
+        if not result:
+            return None
             
-            new_hash, _ = hash_password(senha, salt)
-            return db_name if new_hash == stored_hash else None
-        except Exception as e:
-            print(f"Erro ao verificar usuário: {e}")
+        stored_hash_hex, salt_hex, db_name, iteracoes = result
+        stored_hash = bytes.fromhex(stored_hash_hex)
+        salt = bytes.fromhex(salt_hex)
+        
+        # O hash (a parte cara) roda fora do lock, para logins simultâneos não se enfileirarem
+        new_hash, _ = hash_password(senha, salt, iteracoes)
+        if not hmac.compare_digest(new_hash, stored_hash):
             return None
-        finally:
-            conn.close()
+
+        if iteracoes != ITERACOES_PBKDF2:
+            atualizar_hash_senha(usuario, senha)
+        return db_name
+    except Exception as e:
+        print(f"Erro ao verificar usuário: {e}")
+        return None
+
+def atualizar_hash_senha(usuario, senha):
+    """Refaz o hash da senha com o fator de trabalho atual (ITERACOES_PBKDF2)"""
+    senha_hash, salt = hash_password(senha)
+    with get_db_connection() as conn:
+        conn.execute(
+            "UPDATE usuarios SET senha_hash = ?, salt = ?, iteracoes = ? WHERE usuario = ?",
+            (senha_hash.hex(), salt.hex(), ITERACOES_PBKDF2, usuario)
+        )
+        conn.commit()
 
 def get_user_data(usuario):
     """Obtém os dados do usuário a partir do nome de usuário"""
@@ -2,12 +2,78 @@
 import csv
 import os
 
-def exportar_para_csv(lista_produtos, caminho):
-    campos = lista_produtos[0].keys() if lista_produtos else []
+# Linhas lidas do cursor e gravadas no arquivo por vez nas exportações
+TAMANHO_LOTE_CSV = 2000
+
+
+class ExportacaoCancelada(Exception):
+    """Exportação interrompida pelo usuário; o arquivo parcial é apagado."""
+
+
+def exportar_para_csv(registros, caminho):
+    # Aceita qualquer iterável de dicionários e grava um por vez
+    registros = iter(registros)
+    primeiro = next(registros, None)
+    campos = primeiro.keys() if primeiro else []
     with open(caminho, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=campos)
         writer.writeheader()
-        writer.writerows(lista_produtos)
+        if primeiro:
+            writer.writerow(primeiro)
+            for registro in registros:
+                writer.writerow(registro)
+
+
+def _celula_csv(valor):
+    # Padrão brasileiro: vírgula como separador decimal
+    if isinstance(valor, float):
+        # Duas casas fixas: repr daria 0,30000000000000004 ou 1e+16
+        return f"{valor:.2f}".replace(".", ",")
+    return valor
+
+
+def exportar_cursor_csv(cursor, caminho, ao_progredir=None, cancelado=None,
+                        separador=";", tamanho_lote=TAMANHO_LOTE_CSV):
+    """
+    Grava em CSV o resultado de uma consulta já executada, lote a lote.
+
+    Só um lote de linhas fica em memória, então o consumo não cresce com o
+    tamanho da exportação. O arquivo é escrito com um nome temporário e só
+    recebe o nome final quando termina; se houver erro ou cancelamento o
+    parcial é apagado.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor com a consulta executada
+        caminho (str): Arquivo de destino
+        ao_progredir (callable, opcional): Recebe a quantidade de linhas já gravadas
+        cancelado (callable, opcional): Retorna True para interromper (ExportacaoCancelada)
+        separador (str): Separador de campos
+        tamanho_lote (int): Linhas lidas por fetchmany
+
+    Returns:
+        int: Quantidade de linhas gravadas
+    """
+    parcial = f"{caminho}.parcial"
+    gravadas = 0
+    try:
+        with open(parcial, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, delimiter=separador)
+            writer.writerow([coluna[0] for coluna in cursor.description])
+            while True:
+                if cancelado is not None and cancelado():
+                    raise ExportacaoCancelada()
+                linhas = cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                writer.writerows([_celula_csv(valor) for valor in linha] for linha in linhas)
+                gravadas += len(linhas)
+                if ao_progredir is not None:
+                    ao_progredir(gravadas)
+        os.replace(parcial, caminho)
+        return gravadas
+    finally:
+        if os.path.exists(parcial):
+            os.remove(parcial)
 
 
 def formatar_cnpj(cnpj: str) -> str:
@@ -17,6 +83,12 @@ def formatar_cnpj(cnpj: str) -> str:
         return cnpj
     return f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}"
 
+def formatar_data_hora(data_iso: str) -> str:
+    # Converte YYYY-MM-DD HH:MM:SS (formato gravado) para dd/mm/YYYY HH:MM:SS
+    if not data_iso or len(data_iso) < 10 or data_iso[4] != "-":
+        return data_iso or ""
+    return f"{data_iso[8:10]}/{data_iso[5:7]}/{data_iso[:4]}{data_iso[10:]}"
+
 def formatar_telefone(telefone: str) -> str:
     # Formata telefone no padrão (00) 00000-0000
     telefone = ''.join(filter(str.isdigit, telefone))
@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from storage_manager import init_user_db
+from database.conexao import fechar_pool
+from database.migracoes import migrar_banco
+
+
+def _popular(caminho, estoques):
+    """
+    Cadastra o mínimo para registrar vendas: um fornecedor, um funcionário,
+    um cliente e um produto por estoque informado ("Produto A", "Produto B"...).
+    """
+    conn = sqlite3.connect(caminho)
+    with conn:
+        conn.execute("""INSERT INTO fornecedores (nome_fantasia, razao_social, cnpj, telefone)
+                        VALUES ('Fornecedor', 'Fornecedor Ltda', '00.000.000/0001-00', '(11) 0000-0000')""")
+        conn.execute("""INSERT INTO funcionarios (nome, cargo, data_admissao)
+                        VALUES ('Vendedor', 'Vendedor', '2024-01-01')""")
+        conn.execute("INSERT INTO clientes (nome, cpf_cnpj) VALUES ('Cliente', '000.000.000-00')")
+        conn.executemany(
+            """INSERT INTO produtos (nome, preco, custo_unitario, fornecedor_id, estoque_atual)
+               VALUES (?, 10, 5, 1, ?)""",
+            [(f"Produto {chr(ord('A') + i)}", estoque) for i, estoque in enumerate(estoques)]
+        )
+    conn.close()
+
+
+@pytest.fixture
+def popular():
+    """Função popular(caminho, estoques) que cadastra os dados mínimos de um banco."""
+    return _popular
+
+
+@pytest.fixture
+def tenant(tmp_path):
+    """Banco de tenant criado como no cadastro do usuário e migrado como no login."""
+    caminho = str(tmp_path / "user_teste.db")
+    init_user_db(caminho)
+    migrar_banco(caminho)
+    yield caminho
+    fechar_pool(caminho)
@@ -0,0 +1,293 @@
+-- Esquema de um banco de tenant criado pelo init_user_db original, antes das
+-- migrações (PRAGMA user_version = 0). Congelado: não altere.
+
+CREATE TABLE funcionarios (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL,
+                cargo TEXT NOT NULL,
+                telefone TEXT,
+                email TEXT,
+                data_admissao DATE NOT NULL,
+                observacoes TEXT
+            );
+
+CREATE TABLE usuarios (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                funcionario_id INTEGER NOT NULL,
+                username TEXT NOT NULL UNIQUE,
+                senha_hash TEXT NOT NULL,
+                nivel_acesso TEXT CHECK(nivel_acesso IN ('admin', 'gerente', 'vendedor')) NOT NULL,
+                FOREIGN KEY (funcionario_id) REFERENCES funcionarios(id) ON DELETE CASCADE
+            );
+
+CREATE TABLE fornecedores (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome_fantasia TEXT NOT NULL UNIQUE,
+                razao_social TEXT NOT NULL,
+                cnpj TEXT NOT NULL UNIQUE,
+                telefone TEXT NOT NULL,
+                email TEXT,
+                observacoes TEXT
+            );
+
+CREATE TABLE produtos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL,
+                descricao TEXT,
+                preco REAL NOT NULL CHECK(preco >= 0),
+                preco_promocional REAL CHECK(preco_promocional >= 0 AND preco_promocional <= preco),
+                custo_unitario REAL NOT NULL CHECK(custo_unitario >= 0),
+                estoque_atual INTEGER NOT NULL DEFAULT 0 CHECK(estoque_atual >= 0),
+                estoque_minimo INTEGER NOT NULL DEFAULT 0 CHECK(estoque_minimo >= 0),
+                estoque_maximo INTEGER DEFAULT NULL CHECK(estoque_maximo IS NULL OR estoque_maximo >= estoque_minimo),
+                fornecedor_id INTEGER NOT NULL,
+                categoria TEXT,
+                data_cadastro TEXT,
+                data_atualizacao TEXT DEFAULT (datetime('now')),
+                FOREIGN KEY (fornecedor_id) REFERENCES fornecedores(id) ON DELETE CASCADE
+            );
+
+CREATE TABLE clientes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL,
+                cpf_cnpj TEXT NOT NULL UNIQUE,
+                telefone TEXT,
+                email TEXT,
+                cep TEXT,
+                cidade TEXT,
+                estado TEXT,
+                bairro TEXT,
+                endereco TEXT,
+                numero TEXT,
+                complemento TEXT,
+                data_cadastro TEXT
+            );
+
+CREATE TABLE vendas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cliente_id INTEGER NOT NULL,
+                funcionario_id INTEGER NOT NULL,
+                desconto REAL CHECK(desconto >= 0) DEFAULT 0,
+                status TEXT CHECK(status IN ('Concluída', 'Pendente', 'Cancelada')) DEFAULT 'Pendente',
+                total REAL NOT NULL CHECK(total >= 0),
+                data_venda TEXT,
+                FOREIGN KEY (cliente_id) REFERENCES clientes(id) ON DELETE CASCADE,
+                FOREIGN KEY (funcionario_id) REFERENCES funcionarios(id) ON DELETE CASCADE
+            );
+
+CREATE TABLE itens_venda (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                venda_id INTEGER NOT NULL,
+                produto_id INTEGER NOT NULL,
+                quantidade REAL NOT NULL CHECK(quantidade > 0),
+                desconto REAL CHECK(desconto >= 0) DEFAULT 0,
+                preco_unitario REAL NOT NULL CHECK(preco_unitario >= 0),
+                subtotal REAL NOT NULL CHECK(subtotal >= 0),
+                FOREIGN KEY (venda_id) REFERENCES vendas(id) ON DELETE CASCADE,
+                FOREIGN KEY (produto_id) REFERENCES produtos(id) ON DELETE CASCADE
+            );
+
+CREATE TABLE movimentacao_estoque (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                produto_id INTEGER NOT NULL,
+                tipo_movimentacao TEXT NOT NULL CHECK(tipo_movimentacao IN ('ENTRADA', 'SAIDA', 'AJUSTE', 'PERDA', 'DEVOLUCAO')),
+                quantidade INTEGER NOT NULL,
+                estoque_anterior INTEGER NOT NULL,
+                estoque_atual INTEGER NOT NULL,
+                motivo TEXT,
+                referencia_id INTEGER,
+                referencia_tipo TEXT,
+                funcionario_id INTEGER,
+                data_movimentacao TEXT DEFAULT (datetime('now')),
+                observacoes TEXT,
+                FOREIGN KEY (produto_id) REFERENCES produtos(id) ON DELETE CASCADE,
+                FOREIGN KEY (funcionario_id) REFERENCES funcionarios(id) ON DELETE SET NULL
+            );
+
+CREATE TRIGGER trigger_baixa_estoque_venda
+            AFTER INSERT ON itens_venda
+            WHEN (SELECT status FROM vendas WHERE id = NEW.venda_id) = 'Concluída'
+            BEGIN
+                UPDATE produtos 
+                SET estoque_atual = estoque_atual - NEW.quantidade,
+                    data_atualizacao = datetime('now')
+                WHERE id = NEW.produto_id 
+                AND estoque_atual >= NEW.quantidade;
+                INSERT INTO movimentacao_estoque (
+                    produto_id, tipo_movimentacao, quantidade, 
+                    estoque_anterior, estoque_atual, motivo,
+                    referencia_id, referencia_tipo, funcionario_id
+                )
+                SELECT 
+                    NEW.produto_id, 'SAIDA', NEW.quantidade,
+                    p.estoque_atual + NEW.quantidade, p.estoque_atual,
+                    'Venda de produto', NEW.venda_id, 'VENDA',
+                    (SELECT funcionario_id FROM vendas WHERE id = NEW.venda_id)
+                FROM produtos p WHERE p.id = NEW.produto_id;
+            END;
+
+CREATE TRIGGER trigger_venda_pendente
+            AFTER INSERT ON vendas
+            WHEN NEW.status = 'Pendente'
+            BEGIN
+                UPDATE produtos 
+                SET estoque_atual = estoque_atual - (
+                    SELECT quantidade FROM itens_venda
+                    WHERE venda_id = NEW.id AND produto_id = produtos.id
+                ),
+                data_atualizacao = datetime('now')
+                WHERE id IN (SELECT produto_id FROM itens_venda WHERE venda_id = NEW.id)
+                AND estoque_atual >= (
+                    SELECT quantidade FROM itens_venda 
+                    WHERE venda_id = NEW.id AND produto_id = produtos.id
+                );
+                INSERT INTO movimentacao_estoque (
+                    produto_id, tipo_movimentacao, quantidade,
+                    estoque_anterior, estoque_atual, motivo,
+                    referencia_id, referencia_tipo, funcionario_id
+                )
+                SELECT 
+                    iv.produto_id, 'SAIDA', iv.quantidade,
+                    p.estoque_atual + iv.quantidade, p.estoque_atual,
+                    'Venda pendente', NEW.id, 'VENDA', NEW.funcionario_id
+                FROM itens_venda iv
+                JOIN produtos p ON p.id = iv.produto_id
+                WHERE iv.venda_id = NEW.id;
+            END;
+
+CREATE TRIGGER trg_movimentacao_estoque_status
+        AFTER UPDATE OF status ON vendas
+        WHEN OLD.status != NEW.status
+        BEGIN
+            INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade, 
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id,
+                observacoes
+            )
+            SELECT 
+                iv.produto_id,
+                'SAIDA',
+                iv.quantidade,
+                p.estoque_atual,
+                p.estoque_atual - iv.quantidade,
+                'Venda concluída',
+                NEW.id,
+                'VENDA',
+                NEW.funcionario_id,
+                'Status alterado de ' || OLD.status || ' para ' || NEW.status
+            FROM itens_venda iv
+            JOIN produtos p ON iv.produto_id = p.id
+            WHERE iv.venda_id = NEW.id 
+            AND NEW.status = 'Concluída'
+            AND OLD.status = 'Pendente';
+            
+            INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade, 
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id,
+                observacoes
+            )
+            SELECT 
+                iv.produto_id,
+                'DEVOLUCAO',
+                iv.quantidade,
+                p.estoque_atual,
+                p.estoque_atual + iv.quantidade,
+                'Venda cancelada',
+                NEW.id,
+                'VENDA',
+                NEW.funcionario_id,
+                'Status alterado de ' || OLD.status || ' para ' || NEW.status
+            FROM itens_venda iv
+            JOIN produtos p ON iv.produto_id = p.id
+            WHERE iv.venda_id = NEW.id 
+            AND NEW.status = 'Cancelada'
+            AND OLD.status = 'Concluída';
+            
+            INSERT INTO movimentacao_estoque (
+                produto_id, tipo_movimentacao, quantidade, 
+                estoque_anterior, estoque_atual, motivo,
+                referencia_id, referencia_tipo, funcionario_id,
+                observacoes
+            )
+            SELECT 
+                iv.produto_id,
+                'SAIDA',
+                iv.quantidade,
+                p.estoque_atual,
+                p.estoque_atual - iv.quantidade,
+                'Reativação de venda',
+                NEW.id,
+                'VENDA',
+                NEW.funcionario_id,
+                'Status alterado de ' || OLD.status || ' para ' || NEW.status
+            FROM itens_venda iv
+            JOIN produtos p ON iv.produto_id = p.id
+            WHERE iv.venda_id = NEW.id 
+            AND NEW.status = 'Pendente'
+            AND OLD.status = 'Cancelada';
+            
+            UPDATE produtos 
+            SET estoque_atual = estoque_atual - (
+                SELECT iv.quantidade 
+                FROM itens_venda iv 
+                WHERE iv.produto_id = produtos.id 
+                AND iv.venda_id = NEW.id
+            ),
+            data_atualizacao = datetime('now')
+            WHERE id IN (
+                SELECT iv.produto_id 
+                FROM itens_venda iv 
+                WHERE iv.venda_id = NEW.id
+            )
+            AND ((NEW.status = 'Concluída' AND OLD.status = 'Pendente') 
+                OR (NEW.status = 'Pendente' AND OLD.status = 'Cancelada'));
+            
+            UPDATE produtos 
+            SET estoque_atual = estoque_atual + (
+                SELECT iv.quantidade 
+                FROM itens_venda iv 
+                WHERE iv.produto_id = produtos.id 
+                AND iv.venda_id = NEW.id
+            ),
+            data_atualizacao = datetime('now')
+            WHERE id IN (
+                SELECT iv.produto_id 
+                FROM itens_venda iv 
+                WHERE iv.venda_id = NEW.id
+            )
+            AND NEW.status = 'Cancelada' 
+            AND OLD.status = 'Concluída';
+            
+        END;
+
+CREATE TRIGGER trg_produto_adicionado
+        AFTER INSERT ON produtos
+        BEGIN
+            INSERT INTO movimentacao_estoque (
+                produto_id,
+                tipo_movimentacao,
+                quantidade,
+                estoque_anterior,
+                estoque_atual,
+                motivo,
+                referencia_id,
+                referencia_tipo,
+                funcionario_id,
+                data_movimentacao,
+                observacoes
+            ) VALUES (
+                NEW.id,
+                'ENTRADA',
+                NEW.estoque_atual,
+                0,
+                NEW.estoque_atual,
+                'Estoque inicial do produto',
+                NEW.id,
+                'PRODUTO_NOVO',
+                NULL, -- funcionario_id pode ser NULL para cadastros automáticos
+                datetime('now'),
+                'Produto cadastrado: ' || NEW.nome || ' - Estoque inicial: ' || NEW.estoque_atual
+            );
+        END;
@@ -0,0 +1,205 @@
+"""
+Estoque e histórico de movimentações mantidos pelos gatilhos das vendas
+(migrações 7 e 8), gravando pelo VendasController como a interface faz.
+"""
+import pytest
+
+from database.vendas_controller import VendasController, EstoqueInsuficiente
+
+A, B = 1, 2
+
+
+@pytest.fixture
+def controller(tenant, popular):
+    popular(tenant, [10, 10])
+    return VendasController(tenant)
+
+
+def venda(status, *itens):
+    """Dados de venda com itens (produto_id, quantidade), a R$ 10 cada."""
+    return {
+        "cliente_id": 1,
+        "funcionario_id": 1,
+        "status": status,
+        "total": sum(quantidade * 10 for _, quantidade in itens),
+        "itens": [
+            {"produto_id": produto_id, "quantidade": quantidade, "preco_unitario": 10,
+             "subtotal": quantidade * 10}
+            for produto_id, quantidade in itens
+        ],
+    }
+
+
+def estoque(controller, produto_id):
+    return controller.conn.execute(
+        "SELECT estoque_atual FROM produtos WHERE id = ?", (produto_id,)
+    ).fetchone()[0]
+
+
+def movimentacoes(controller, venda_id):
+    """(produto, tipo, quantidade, estoque anterior, estoque atual) da venda, em ordem."""
+    return controller.conn.execute(
+        """SELECT produto_id, tipo_movimentacao, quantidade, estoque_anterior, estoque_atual
+           FROM movimentacao_estoque
+           WHERE referencia_tipo = 'VENDA' AND referencia_id = ?
+           ORDER BY id""",
+        (venda_id,)
+    ).fetchall()
+
+
+def itens(controller, venda_id):
+    return controller.conn.execute(
+        "SELECT produto_id, quantidade FROM itens_venda WHERE venda_id = ? ORDER BY id", (venda_id,)
+    ).fetchall()
+
+
+@pytest.mark.parametrize("status", ["Pendente", "Concluída"])
+def test_registrar_baixa_o_estoque(controller, status):
+    venda_id = controller.cadastrar_venda(venda(status, (A, 3), (B, 2)))
+
+    assert estoque(controller, A) == 7
+    assert estoque(controller, B) == 8
+    assert movimentacoes(controller, venda_id) == [
+        (A, "SAIDA", 3, 10, 7),
+        (B, "SAIDA", 2, 10, 8),
+    ]
+
+
+def test_registrar_cancelada_nao_movimenta(controller):
+    venda_id = controller.cadastrar_venda(venda("Cancelada", (A, 3)))
+
+    assert estoque(controller, A) == 10
+    assert movimentacoes(controller, venda_id) == []
+
+
+def test_alterar_quantidade_gera_so_a_diferenca(controller):
+    venda_id = controller.cadastrar_venda(venda("Concluída", (A, 3)))
+
+    assert controller.editar_venda(venda_id, venda("Concluída", (A, 5))) == {
+        "inseridos": 0, "atualizados": 1, "removidos": 0,
+    }
+    assert estoque(controller, A) == 5
+    controller.editar_venda(venda_id, venda("Concluída", (A, 1)))
+    assert estoque(controller, A) == 9
+
+    assert movimentacoes(controller, venda_id) == [
+        (A, "SAIDA", 3, 10, 7),
+        (A, "SAIDA", 2, 7, 5),
+        (A, "DEVOLUCAO", 4, 5, 9),
+    ]
+    assert itens(controller, venda_id) == [(A, 1)]
+
+
+def test_remover_linha_devolve_o_estoque(controller):
+    venda_id = controller.cadastrar_venda(venda("Pendente", (A, 3), (B, 2)))
+
+    controller.editar_venda(venda_id, venda("Pendente", (A, 3)))
+
+    assert estoque(controller, A) == 7
+    assert estoque(controller, B) == 10
+    assert movimentacoes(controller, venda_id)[-1] == (B, "DEVOLUCAO", 2, 8, 10)
+    assert itens(controller, venda_id) == [(A, 3)]
+
+
+def test_linhas_repetidas_do_mesmo_produto(controller):
+    venda_id = controller.cadastrar_venda(venda("Concluída", (A, 2), (A, 3)))
+    assert estoque(controller, A) == 5
+
+    # A edição junta as linhas do produto numa só, sem mudar o total vendido
+    controller.editar_venda(venda_id, venda("Concluída", (A, 5)))
+
+    assert estoque(controller, A) == 5
+    assert itens(controller, venda_id) == [(A, 5)]
+    saldo = sum(quantidade if tipo == "SAIDA" else -quantidade
+                for _, tipo, quantidade, _, _ in movimentacoes(controller, venda_id))
+    assert saldo == 5
+
+
+def test_cancelar_devolve_e_reativar_baixa(controller):
+    dados = venda("Concluída", (A, 3))
+    venda_id = controller.cadastrar_venda(dados)
+
+    assert controller.atualizar_venda(venda_id, {**dados, "status": "Cancelada"})
+    assert estoque(controller, A) == 10
+    assert controller.atualizar_venda(venda_id, {**dados, "status": "Pendente"})
+    assert estoque(controller, A) == 7
+
+    assert movimentacoes(controller, venda_id) == [
+        (A, "SAIDA", 3, 10, 7),
+        (A, "DEVOLUCAO", 3, 7, 10),
+        (A, "SAIDA", 3, 10, 7),
+    ]
+
+
+def test_concluir_venda_pendente_nao_baixa_de_novo(controller):
+    dados = venda("Pendente", (A, 3))
+    venda_id = controller.cadastrar_venda(dados)
+
+    controller.atualizar_venda(venda_id, {**dados, "status": "Concluída"})
+
+    assert estoque(controller, A) == 7
+    assert len(movimentacoes(controller, venda_id)) == 1
+
+
+def test_excluir_venda_ativa_devolve_o_estoque(controller):
+    venda_id = controller.cadastrar_venda(venda("Pendente", (A, 3)))
+
+    assert controller.excluir_venda(venda_id)
+
+    assert estoque(controller, A) == 10
+    assert movimentacoes(controller, venda_id)[-1] == (A, "DEVOLUCAO", 3, 7, 10)
+
+
+def test_excluir_venda_cancelada_nao_movimenta(controller):
+    dados = venda("Concluída", (A, 3))
+    venda_id = controller.cadastrar_venda(dados)
+    controller.atualizar_venda(venda_id, {**dados, "status": "Cancelada"})
+    antes = movimentacoes(controller, venda_id)
+
+    assert controller.excluir_venda(venda_id)
+
+    assert estoque(controller, A) == 10
+    assert movimentacoes(controller, venda_id) == antes
+
+
+def test_estoque_insuficiente_desfaz_o_registro(controller):
+    with pytest.raises(EstoqueInsuficiente) as erro:
+        controller.cadastrar_venda(venda("Concluída", (B, 2), (A, 11)))
+
+    assert erro.value.faltas == [("Produto A", 10, 11)]
+    assert estoque(controller, A) == 10
+    assert estoque(controller, B) == 10
+    assert controller.conn.execute("SELECT COUNT(*) FROM vendas").fetchone()[0] == 0
+    assert controller.conn.execute("SELECT COUNT(*) FROM itens_venda").fetchone()[0] == 0
+    assert controller.conn.execute(
+        "SELECT COUNT(*) FROM movimentacao_estoque WHERE referencia_tipo = 'VENDA'"
+    ).fetchone()[0] == 0
+
+
+def test_estoque_insuficiente_desfaz_a_edicao(controller):
+    venda_id = controller.cadastrar_venda(venda("Pendente", (A, 3)))
+
+    with pytest.raises(EstoqueInsuficiente) as erro:
+        controller.editar_venda(venda_id, venda("Pendente", (A, 14), (B, 1)))
+
+    # O que a própria venda já segura conta como disponível
+    assert erro.value.faltas == [("Produto A", 10, 14)]
+    assert estoque(controller, A) == 7
+    assert estoque(controller, B) == 10
+    assert itens(controller, venda_id) == [(A, 3)]
+    assert movimentacoes(controller, venda_id) == [(A, "SAIDA", 3, 10, 7)]
+
+
+def test_estoque_insuficiente_desfaz_a_reativacao(controller):
+    dados = venda("Concluída", (A, 3))
+    venda_id = controller.cadastrar_venda(dados)
+    controller.atualizar_venda(venda_id, {**dados, "status": "Cancelada"})
+    controller.conn.execute("UPDATE produtos SET estoque_atual = 1 WHERE id = ?", (A,))
+    controller.conn.commit()
+
+    with pytest.raises(EstoqueInsuficiente) as erro:
+        controller.atualizar_venda(venda_id, {**dados, "status": "Pendente"})
+
+    assert erro.value.faltas == [("Produto A", 1, 3)]
+    assert estoque(controller, A) == 1
+    assert controller.buscar_venda_por_id(venda_id)["status"] == "Cancelada"
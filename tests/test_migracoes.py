@@ -0,0 +1,113 @@
+"""
+Migrações de um banco criado pela versão original do aplicativo
+(tests/esquema_base.sql), com datas dd/mm/YYYY e uma venda pendente
+gravada pelos gatilhos antigos, que não reservavam o estoque.
+"""
+import os
+import sqlite3
+
+import pytest
+
+from database.conexao import fechar_pool
+from database.migracoes import MIGRACOES, migrar_banco, versao_atual
+from database.vendas_controller import VendasController
+
+ESQUEMA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "esquema_base.sql")
+
+
+@pytest.fixture
+def banco_antigo(tmp_path, popular):
+    caminho = str(tmp_path / "user_antigo.db")
+    conn = sqlite3.connect(caminho)
+    with open(ESQUEMA_BASE, encoding="utf-8") as f:
+        conn.executescript(f.read())
+    conn.close()
+    popular(caminho, [10])
+
+    # Como a versão original gravava: cabeçalho e depois os itens
+    conn = sqlite3.connect(caminho)
+    with conn:
+        for venda_id, status, data, quantidade in (
+            (1, "Concluída", "05/03/2024 14:30:00", 2),
+            (2, "Pendente", "06/03/2024 09:00:00", 3),
+        ):
+            conn.execute(
+                """INSERT INTO vendas (id, cliente_id, funcionario_id, status, total, data_venda)
+                   VALUES (?, 1, 1, ?, ?, ?)""",
+                (venda_id, status, quantidade * 10, data)
+            )
+            conn.execute(
+                """INSERT INTO itens_venda (venda_id, produto_id, quantidade, preco_unitario, subtotal)
+                   VALUES (?, 1, ?, 10, ?)""",
+                (venda_id, quantidade, quantidade * 10)
+            )
+    conn.close()
+    yield caminho
+    fechar_pool(caminho)
+
+
+def estoque(conn):
+    return conn.execute("SELECT estoque_atual FROM produtos WHERE id = 1").fetchone()[0]
+
+
+def test_banco_antigo_nao_reserva_a_venda_pendente(banco_antigo):
+    conn = sqlite3.connect(banco_antigo)
+    assert versao_atual(conn) == 0
+    # Só a concluída baixou o estoque
+    assert estoque(conn) == 8
+    conn.close()
+
+
+def test_migrar_banco_antigo(banco_antigo):
+    assert migrar_banco(banco_antigo) == len(MIGRACOES)
+
+    conn = sqlite3.connect(banco_antigo)
+    assert conn.execute("SELECT id, data_venda FROM vendas ORDER BY id").fetchall() == [
+        (1, "2024-03-05 14:30:00"),
+        (2, "2024-03-06 09:00:00"),
+    ]
+    # A migração 9 reserva o que a venda pendente não tinha tirado do estoque
+    assert estoque(conn) == 5
+    assert conn.execute(
+        """SELECT tipo_movimentacao, quantidade, estoque_anterior, estoque_atual, motivo
+           FROM movimentacao_estoque WHERE referencia_tipo = 'VENDA' AND referencia_id = 2"""
+    ).fetchall() == [("SAIDA", 3, 8, 5, "Reserva de venda pendente")]
+    conn.close()
+
+
+def test_migrar_de_novo_nao_altera_nada(banco_antigo):
+    migrar_banco(banco_antigo)
+    conn = sqlite3.connect(banco_antigo)
+    movimentacoes = conn.execute("SELECT COUNT(*) FROM movimentacao_estoque").fetchone()[0]
+    conn.close()
+
+    assert migrar_banco(banco_antigo) == len(MIGRACOES)
+
+    conn = sqlite3.connect(banco_antigo)
+    assert estoque(conn) == 5
+    assert conn.execute("SELECT COUNT(*) FROM movimentacao_estoque").fetchone()[0] == movimentacoes
+    conn.close()
+
+
+def test_venda_reservada_pela_migracao_segue_os_gatilhos_novos(banco_antigo):
+    migrar_banco(banco_antigo)
+    controller = VendasController(banco_antigo)
+    dados = controller.buscar_venda_por_id(2)
+    venda = {
+        "cliente_id": dados["cliente_id"],
+        "funcionario_id": dados["funcionario_id"],
+        "status": "Cancelada",
+        "total": dados["total"],
+        "data_venda": dados["data_venda"],
+    }
+
+    assert controller.atualizar_venda(2, venda)
+    assert estoque(controller.conn) == 8
+    assert controller.atualizar_venda(2, {**venda, "status": "Concluída"})
+    assert estoque(controller.conn) == 5
+
+
+def test_banco_novo_ja_nasce_na_ultima_versao(tenant):
+    conn = sqlite3.connect(tenant)
+    assert versao_atual(conn) == len(MIGRACOES)
+    conn.close()